@@ -6,6 +6,12 @@ from models.user import User
 from schemas.user import UserResponse, UserCreate, UserUpdate
 from utils.dependencies import require_admin
 from services.auth_service import hash_password
+from services.stt_service import get_stt_status
+from services.stt_scheduler import get_stt_scheduler
+from services.tts_cache import get_tts_cache
+from services.transcript_writer import get_transcript_writer
+from services.session_registry import session_registry
+from api.websocket import manager
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -164,3 +170,49 @@ def delete_user(
     db.commit()
     
     return None
+
+
+@router.get("/stt/status")
+def get_stt_service_status(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get speech-to-text model residency, memory usage and queue/shedding stats (admin only)
+    """
+    try:
+        stt_status = get_stt_status()
+        stt_status["scheduler"] = get_stt_scheduler().stats()
+        return stt_status
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"STT service unavailable: {str(e)}"
+        )
+
+
+@router.get("/tts/status")
+def get_tts_cache_status(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get text-to-speech cache size and hit rate (admin only)
+    """
+    return get_tts_cache().stats()
+
+
+@router.get("/ws/status")
+def get_websocket_status(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get per-connection send queue depth, dropped messages and lag for live meetings,
+    meeting bus traffic, resume journals, the session registry and the transcript
+    write-behind queue (admin only)
+    """
+    return {
+        "sessions": manager.stats(),
+        "bus": manager.bus.stats(),
+        "journal": manager.journal.stats(),
+        "registry": session_registry.stats(),
+        "transcripts": get_transcript_writer().stats()
+    }
@@ -7,6 +7,7 @@ from models.glossary import Glossary
 from models.project import Project, ProjectUser
 from schemas.glossary import GlossaryCreate, GlossaryUpdate, GlossaryResponse
 from database import get_db
+from api.websocket import manager
 
 router = APIRouter(prefix="/api/glossary", tags=["Glossary"])
 
@@ -96,6 +97,7 @@ async def create_glossary_entry(
     db.add(new_glossary)
     db.commit()
     db.refresh(new_glossary)
+    await manager.project_changed(project_id)  # Live meetings, on every process, reload the glossary
     
     return new_glossary
 
@@ -138,6 +140,7 @@ async def update_glossary_entry(
     
     db.commit()
     db.refresh(glossary)
+    await manager.project_changed(glossary.project_id)
     
     return glossary
 
@@ -155,7 +158,9 @@ async def delete_glossary_entry(
     
     check_project_access(glossary.project_id, current_user, db)
     
+    project_id = glossary.project_id
     db.delete(glossary)
     db.commit()
+    await manager.project_changed(project_id)
     
     return {"message": "Glossary entry deleted successfully"}
@@ -0,0 +1,159 @@
+"""
+Recording API endpoints for batch transcription of recorded meetings.
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile, status
+from sqlalchemy.orm import Session
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import os
+import uuid
+
+from database import get_db
+from models.session import MeetingSession
+from models.user import User
+from services.recording_service import recording_service
+from utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/sessions", tags=["recordings"])
+
+# Largest accepted upload (roughly two hours of compressed speech)
+MAX_RECORDING_BYTES = 500 * 1024 * 1024
+
+# Uploads wait here (deleted when their job finishes) instead of in memory
+RECORDING_SPOOL_DIR = Path(__file__).parent.parent / "uploads" / "recordings"
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="Recording is too large"
+    )
+
+
+async def spool_upload(file: UploadFile) -> Path:
+    """
+    Copy an upload to the spool directory chunk by chunk
+
+    Raises:
+        HTTPException: 413 as soon as it exceeds MAX_RECORDING_BYTES,
+            400 if it is empty (nothing is left on disk either way)
+    """
+    RECORDING_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = RECORDING_SPOOL_DIR / f"{uuid.uuid4().hex}{Path(file.filename or '').suffix[:16]}"
+    size = 0
+    try:
+        with open(path, "wb") as spool:
+            while chunk := await file.read(SPOOL_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_RECORDING_BYTES:
+                    raise too_large()
+                spool.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty recording")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def get_owned_session(session_code: str, db: Session, current_user: User) -> MeetingSession:
+    """Look up a session that the current user created"""
+    session = db.query(MeetingSession).filter(
+        MeetingSession.session_code == session_code
+    ).first()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if session.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only session creator can upload recordings"
+        )
+
+    return session
+
+
+@router.post("/{session_code}/recordings", status_code=status.HTTP_202_ACCEPTED)
+async def upload_recording(
+    session_code: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    language: Optional[str] = None,
+    speaker_name: Optional[str] = None,
+    recorded_at: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a meeting recording for batch transcription
+
+    The recording is split at pauses, transcribed in parallel, translated
+    and stored as session transcripts. Poll the returned job for progress.
+
+    Query Parameters:
+    - language: Spoken language (ko, bn, en) if known; detected per chunk otherwise
+    - speaker_name: Speaker label stored on every transcript
+    - recorded_at: When the recording started (defaults to the session start)
+    """
+    session = get_owned_session(session_code, db, current_user)
+
+    if language is not None and language not in ("ko", "bn", "en"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid language code. Must be one of: ko, bn, en"
+        )
+
+    # Refuse oversized uploads from their declared size before copying anything
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_RECORDING_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise too_large()
+    if file.size is not None and file.size > MAX_RECORDING_BYTES:
+        raise too_large()
+    audio_path = await spool_upload(file)
+
+    job = recording_service.create_job(
+        session_id=session.id,
+        filename=file.filename or "recording",
+        speaker_name=speaker_name or "Recording",
+        language=language
+    )
+    background_tasks.add_task(
+        recording_service.run_job,
+        job,
+        audio_path,
+        recorded_at or session.created_at,
+        current_user.id
+    )
+
+    return job.to_dict()
+
+
+@router.get("/{session_code}/recordings/{job_id}")
+async def get_recording_job(
+    session_code: str,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the progress of a recording transcription job"""
+    session = get_owned_session(session_code, db, current_user)
+
+    job = recording_service.get_job(job_id)
+    if not job or job.session_id != session.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording job not found"
+        )
+
+    return job.to_dict()
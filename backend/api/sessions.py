@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import random
 import string
 
 from database import get_db
 from models.session import MeetingSession, SessionStatus
+from models.transcript import Transcript
 from models.user import User
 from schemas.session import SessionCreate, SessionResponse, SessionJoin, TranscriptResponse
+from services.session_registry import session_registry
+from services.transcript_writer import get_transcript_writer
+from api.websocket import manager
 from utils.dependencies import get_current_user
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
@@ -47,12 +51,14 @@ async def create_session(
         project_id=session_data.project_id,
         created_by=current_user.id,
         module_type=session_data.module_type,
-        status=SessionStatus.active
+        status=SessionStatus.active,
+        retain_audio=session_data.retain_audio
     )
     
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    session_registry.put(new_session, db)  # Joins and connects find it without a query
     
     return new_session
 
@@ -64,9 +70,7 @@ async def get_session(
 ):
     """Get session details by code"""
     
-    session = db.query(MeetingSession).filter(
-        MeetingSession.session_code == session_code
-    ).first()
+    session = session_registry.lookup(session_code, db)
     
     if not session:
         raise HTTPException(
@@ -85,9 +89,7 @@ async def join_session(
 ):
     """Join an existing session"""
     
-    session = db.query(MeetingSession).filter(
-        MeetingSession.session_code == session_code
-    ).first()
+    session = session_registry.lookup(session_code, db)
     
     if not session:
         raise HTTPException(
@@ -133,25 +135,42 @@ async def end_session(
             detail="Only session creator can end the session"
         )
     
+    # The meeting's last transcripts go in before it ends. Only this process's writer:
+    # with several API processes, rows another one still has queued are written within
+    # its TRANSCRIPT_FLUSH_INTERVAL_MS, after this
+    await get_transcript_writer().flush()
     session.status = SessionStatus.completed
     from datetime import datetime
     session.ended_at = datetime.utcnow()
     
     db.commit()
     
+    # Drop it from every process's registry and close its WebSockets
+    await manager.end_session(session_code)
+    
     return {"message": "Session ended successfully"}
 
 
 @router.get("/{session_code}/transcripts", response_model=List[TranscriptResponse])
 async def get_session_transcripts(
     session_code: str,
+    after_id: Optional[int] = Query(None, description="Only transcripts with a higher ID"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: all)"),
     db: Session = Depends(get_db)
 ):
-    """Get all transcripts for a session"""
+    """
+    Get a session's transcripts in ID order
     
-    session = db.query(MeetingSession).filter(
-        MeetingSession.session_code == session_code
-    ).first()
+    Page with after_id set to the last ID received, e.g. when a reconnecting
+    client is told to resync.
+    """
+    
+    # Include transcripts still queued for writing in this process. Only this one: with
+    # several API processes, rows another one has queued show up within its
+    # TRANSCRIPT_FLUSH_INTERVAL_MS, so a page fetched right away can miss them
+    await get_transcript_writer().flush()
+    
+    session = session_registry.lookup(session_code, db)
     
     if not session:
         raise HTTPException(
@@ -159,7 +178,13 @@ async def get_session_transcripts(
             detail="Session not found"
         )
     
-    return session.transcripts
+    query = db.query(Transcript).filter(Transcript.session_id == session.id)
+    if after_id is not None:
+        query = query.filter(Transcript.id > after_id)
+    query = query.order_by(Transcript.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
 @router.get("/user/my-sessions", response_model=List[SessionResponse])
@@ -0,0 +1,37 @@
+"""
+Text-to-Speech audio endpoints serving the content-addressed TTS cache.
+"""
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from services.tts_cache import KEY_PATTERN, get_tts_cache
+
+router = APIRouter(prefix="/api/tts", tags=["tts"])
+
+# Content-addressed: the bytes behind a key never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{key}.mp3")
+async def get_tts_audio(key: str, request: Request):
+    """
+    Get synthesized speech by cache key
+
+    No authentication: audio elements can't send bearer tokens. Keys are
+    HMACs of the spoken text under the server's secret, so only session
+    members, who were sent them, know them.
+    """
+    if not KEY_PATTERN.match(key):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+
+    # A client holding the ETag already has the bytes (they never change), even if evicted here
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = get_tts_cache().lookup(key)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
+
+    return FileResponse(path, media_type="audio/mpeg", headers=headers)
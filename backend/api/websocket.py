@@ -1,63 +1,738 @@
-from fastapi import WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, List
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+import asyncio
 import json
 import base64
+import time
+import uuid
 from datetime import datetime
 
-from database import get_db
-from models.session import MeetingSession, SessionStatus
-from models.transcript import Transcript
-from services.stt_service import get_stt_service
+from config import settings
+from models.session import SessionStatus
+from services.stt_scheduler import STTOverloaded, get_stt_scheduler
 from services.tts_service import get_tts_service
 from services.translation_service import TranslationService
+from services.vad_service import StreamingSegmenter
+from services.audio_preprocessing import TARGET_SAMPLE_RATE, StreamResampler, to_mono
+from services.language_hint_cache import language_hints, transcribe_with_hint
+from services.audio_archive import save_utterance
+from services.tts_cache import audio_url, get_tts_cache
+from services.ws_frames import MAGIC, FrameError, FrameType, decode_frame, encode_frame
+from services.ws_outbox import Outbox, encode_message
+from services.ws_codec import JSON, Codec, Encoded, negotiate
+from services.session_pipeline import SessionPipeline, Stage
+from services.pubsub import CONTROL, MessageBus, create_bus, pack, unpack
+from services.transcript_writer import get_transcript_writer
+from services.session_journal import SessionJournal
+from services.session_registry import ActiveSession, session_registry
+
+# Meeting languages: code -> name accepted by the translator
+LANGUAGE_NAMES = {"ko": "korean", "bn": "bengali", "en": "english"}
+LANGUAGE_CODES = {name: code for code, name in LANGUAGE_NAMES.items()}
+
+# Languages clients can ask to hear
+TTS_LANGUAGES = ("ko", "bn", "en")
+
+# Close code for the clients of a meeting that was ended
+SESSION_ENDED_CLOSE_CODE = 4000
+
+# First byte of binary audio frames, which MessagePack messages never start with
+MAGIC_BYTE = bytes([MAGIC])
+
+
+class ClientState:
+    """What a connected client has told us about itself"""
+    
+    def __init__(self, outbox: Outbox):
+        self.outbox = outbox  # Every message to this client goes through here
+        self.speaker_name = "Unknown"
+        self.user_id: Optional[int] = None
+        self.sample_rate = settings.STREAM_SAMPLE_RATE  # Of binary AUDIO_CHUNK frames
+        self.channels = 1
+        self.languages: FrozenSet[str] = frozenset(LANGUAGE_NAMES)  # Translations it wants to read
+        self.tts_languages: Set[str] = set()  # Languages it wants synthesized speech for
+        self.binary_audio = False  # Receive speech as binary frames instead of URLs
+        self.resume_from: Optional[int] = None  # Reconnecting: journaled events after this seq wait for resume()
+        self.codec: Codec = JSON  # Encoding of its messages, negotiated at connect
 
 
 class ConnectionManager:
-    """Manage WebSocket connections for meeting sessions"""
+    """
+    Manage WebSocket connections for meeting sessions
+    
+    Clients of one meeting may be connected to different processes. Every
+    broadcast is delivered to this process's clients directly and published
+    on the meeting bus for the others, which deliver it to theirs. Processes
+    also tell each other which languages their clients want to hear, so
+    speech is synthesized when a listener is on any of them. They repeat
+    that every BUS_LISTENERS_HEARTBEAT_SECONDS, and what a process said is
+    forgotten BUS_LISTENERS_TTL_SECONDS after it last said it, so a process
+    that died stops counting.
     
-    def __init__(self):
+    Transcript and translation events are numbered and kept in the
+    meeting's journal as they are delivered, so reconnecting clients can
+    resume where they left off.
+    """
+    
+    def __init__(self, bus: Optional[MessageBus] = None):
         # session_code -> list of WebSocket connections
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # connection -> per-client state
+        self.clients: Dict[WebSocket, ClientState] = {}
+        self.node_id = uuid.uuid4().hex[:12]
+        self.bus = bus or create_bus()
+        self.bus.set_handler(self._on_bus_message)
+        # session_code -> node -> (tts languages, binary tts languages) of its clients, monotonic time heard
+        self.remote_listeners: Dict[str, Dict[str, Tuple[FrozenSet[str], FrozenSet[str], float]]] = {}
+        # session_code -> what this node last announced
+        self._announced: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        # Recent transcript and translation events per session, for resuming clients
+        self.journal = SessionJournal()
+        self._heartbeat: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Listen for news about sessions from other processes (needs a running event loop)"""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._announce_periodically())
+        try:
+            await self.bus.subscribe(CONTROL)
+        except Exception as e:
+            print(f"Meeting bus unavailable: {e}")
+    
+    async def stop(self):
+        """Stop announcing and close the bus connections"""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        await self.bus.close()
+    
+    async def _announce_periodically(self):
+        """Keep other processes' record of our listeners from expiring"""
+        while True:
+            await asyncio.sleep(settings.BUS_LISTENERS_HEARTBEAT_SECONDS)
+            for session_code in list(self._announced):
+                if session_code in self.active_connections:
+                    await self.announce_listeners(session_code, force=True)
+    
+    async def end_session(self, session_code: str):
+        """A session was ended: close its clients here and have the other processes do the same"""
+        self._session_ended(session_code)
+        await self._publish(CONTROL, {"kind": "session_ended", "session_code": session_code})
+    
+    async def project_changed(self, project_id: int):
+        """A project's glossary changed: have every process reload its meetings"""
+        session_registry.forget_project(project_id)
+        await self._publish(CONTROL, {"kind": "project_changed", "project_id": project_id})
+    
+    def _session_ended(self, session_code: str):
+        """Forget the session and close its clients once they have been told"""
+        session_registry.invalidate(session_code)
+        self.journal.discard(session_code)
+        encoded = Encoded({
+            "type": "session_ended",
+            "session_code": session_code,
+            "message": "The session has ended"
+        })
+        for connection in self.active_connections.get(session_code, []):
+            client = self.clients.get(connection)
+            if client is not None:
+                client.outbox.put(encoded.get(client.codec))
+                client.outbox.finish(SESSION_ENDED_CLOSE_CODE, "Session ended")
     
-    async def connect(self, websocket: WebSocket, session_code: str):
-        """Connect a client to a session"""
-        await websocket.accept()
-        if session_code not in self.active_connections:
+    async def connect(self, websocket: WebSocket, session_code: str, resuming: bool = False):
+        """
+        Connect a client to a session
+        
+        A resuming client gets no transcript or translation events until
+        resume() has replayed what it missed, so nothing arrives twice or
+        out of order.
+        """
+        codec, subprotocol = negotiate(websocket)
+        await websocket.accept(subprotocol=subprotocol)
+        joined = session_code not in self.active_connections
+        if joined:
             self.active_connections[session_code] = []
         self.active_connections[session_code].append(websocket)
+        outbox = Outbox(websocket)
+        outbox.start()
+        client = self.clients[websocket] = ClientState(outbox)
+        client.codec = codec
+        ring = self.journal.open(session_code)
+        if resuming:
+            client.resume_from = ring.seq
+        if joined:
+            # Hear the meeting's broadcasts from other processes, and ask who listens where
+            try:
+                await self.bus.subscribe(session_code)
+            except Exception as e:
+                print(f"Meeting bus unavailable for session {session_code}: {e}")
+            await self._publish(session_code, {"kind": "listeners", "query": True, **self._listening(session_code)})
     
-    def disconnect(self, websocket: WebSocket, session_code: str):
+    async def disconnect(self, websocket: WebSocket, session_code: str):
         """Disconnect a client from a session"""
-        if session_code in self.active_connections:
-            self.active_connections[session_code].remove(websocket)
-            if not self.active_connections[session_code]:
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.outbox.close()
+        connections = self.active_connections.get(session_code)
+        if connections and websocket in connections:
+            connections.remove(websocket)
+            if not connections:
                 del self.active_connections[session_code]
-    
-    async def broadcast(self, session_code: str, message: dict):
-        """Broadcast message to all clients in a session"""
-        if session_code in self.active_connections:
-            for connection in self.active_connections[session_code]:
+                self.remote_listeners.pop(session_code, None)
+                self.journal.idle(session_code)
                 try:
-                    await connection.send_json(message)
+                    await self.bus.unsubscribe(session_code)
                 except Exception as e:
-                    print(f"Error broadcasting to client: {e}")
+                    print(f"Meeting bus unavailable for session {session_code}: {e}")
+        await self.announce_listeners(session_code)
+    
+    async def set_tts_languages(self, websocket: WebSocket, session_code: str, languages) -> Set[str]:
+        """Record which languages a client wants audio for (unknown codes are ignored)"""
+        wanted = {lang for lang in languages or [] if lang in TTS_LANGUAGES}
+        self.clients[websocket].tts_languages = wanted
+        await self.announce_listeners(session_code)
+        return wanted
+    
+    def set_languages(self, websocket: WebSocket, languages) -> FrozenSet[str]:
+        """Record which translations a client wants (all of them if none are valid)"""
+        wanted = frozenset(lang for lang in languages or [] if lang in LANGUAGE_NAMES)
+        self.clients[websocket].languages = wanted or frozenset(LANGUAGE_NAMES)
+        return self.clients[websocket].languages
+    
+    def subscription_groups(self, session_code: str) -> Dict[FrozenSet[str], List[WebSocket]]:
+        """
+        This process's clients of a session grouped by the translations they subscribe to
+        
+        Clients still waiting for their resume() replay are left out.
+        """
+        groups: Dict[FrozenSet[str], List[WebSocket]] = {}
+        for connection in self.active_connections.get(session_code, []):
+            client = self.clients.get(connection)
+            if client is not None and client.resume_from is None:
+                groups.setdefault(client.languages, []).append(connection)
+        return groups
+    
+    def resume(self, websocket: WebSocket, session_code: str, epoch: Optional[str], last_seq: Optional[int]) -> dict:
+        """
+        Queue the journaled events a reconnecting client missed
+        
+        Returns:
+            The "resumed" message, or "resync" if the journal can't tell what
+            was missed or it is more than fits the client's send queue: the
+            client then fetches the transcripts it lacks over HTTP. Its
+            "reason" is one of other_epoch (the client's position is from
+            another process, or from before this one restarted; see
+            services/session_journal.py), too_old (events no longer kept)
+            or too_many
+        """
+        client = self.clients[websocket]
+        ring = self.journal.ring(session_code)
+        reason = None
+        if epoch != ring.epoch or last_seq is None:
+            reason = "other_epoch"
+            events = None
+        else:
+            events = ring.since(last_seq)
+            if events is None:
+                reason = "too_old"
+        missed = self._tailor_events(events or [], client.languages)
+        if events is not None and len(missed) >= client.outbox.max_queue // 2:
+            reason = "too_many"
+        resumed = reason is None
+        if not resumed:
+            # Still replay what was held back since connect(); older events come from the API
+            missed = self._tailor_events(ring.since(client.resume_from) or [], client.languages)
+        client.resume_from = None
+        
+        if resumed:
+            reply = {"type": "resumed", "epoch": ring.epoch, "seq": ring.seq, "replayed": len(missed)}
+        else:
+            reply = {"type": "resync", "epoch": ring.epoch, "seq": ring.seq, "reason": reason}
+            print(f"Client of session {session_code} resyncs instead of resuming: {reason}")
+        client.outbox.put(client.codec.encode(reply))
+        for event in missed:
+            client.outbox.put(client.codec.encode(event))
+        return reply
+    
+    @staticmethod
+    def _tailor_events(events: List[dict], languages: FrozenSet[str]) -> List[dict]:
+        """Journaled events as a client subscribed to languages would have received them"""
+        tailored = []
+        for event in events:
+            if event["type"] == "translation":
+                if event["language"] not in languages:
+                    continue
+            elif "translations" in event:
+                event = {
+                    **event,
+                    "translations": {lang: text for lang, text in event["translations"].items() if lang in languages}
+                }
+            tailored.append(event)
+        return tailored
+    
+    def _listening(self, session_code: str) -> dict:
+        """Audio languages this process's clients of a session want, by delivery"""
+        tts, binary = set(), set()
+        for connection in self.active_connections.get(session_code, []):
+            client = self.clients.get(connection)
+            if client is not None:
+                tts |= client.tts_languages
+                if client.binary_audio:
+                    binary |= client.tts_languages
+        return {"tts": sorted(tts), "binary": sorted(binary)}
+    
+    async def announce_listeners(self, session_code: str, force: bool = False):
+        """Tell other processes which languages our clients listen to, if that changed"""
+        listening = self._listening(session_code)
+        current = (frozenset(listening["tts"]), frozenset(listening["binary"]))
+        if not force and self._announced.get(session_code, (frozenset(), frozenset())) == current:
+            return
+        if current == (frozenset(), frozenset()):
+            self._announced.pop(session_code, None)
+        else:
+            self._announced[session_code] = current
+        await self._publish(session_code, {"kind": "listeners", **listening})
+    
+    def wanted_tts_languages(self, session_code: str) -> Set[str]:
+        """Languages at least one client in the session (on any process) wants audio for"""
+        wanted = set(self._listening(session_code)["tts"])
+        for tts, _ in self._remote_listening(session_code):
+            wanted |= tts
+        return wanted
+    
+    def wants_binary_audio(self, session_code: str, language: str) -> bool:
+        """Whether any client in the session (on any process) takes language as binary frames"""
+        if self.listeners(session_code, language, binary=True):
+            return True
+        return any(language in binary for _, binary in self._remote_listening(session_code))
+    
+    def _remote_listening(self, session_code: str) -> List[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """(tts, binary) languages of other processes' clients, forgetting processes gone quiet"""
+        nodes = self.remote_listeners.get(session_code)
+        if not nodes:
+            return []
+        cutoff = time.monotonic() - settings.BUS_LISTENERS_TTL_SECONDS
+        for node in [node for node, (_, _, heard) in nodes.items() if heard < cutoff]:
+            del nodes[node]
+        return [(tts, binary) for tts, binary, _ in nodes.values()]
+    
+    async def send(self, websocket: WebSocket, message: Union[dict, bytes]) -> bool:
+        """Queue a message (or a binary frame) for one client, in its encoding"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return False
+        return client.outbox.put(message if isinstance(message, bytes) else client.codec.encode(message))
+    
+    async def broadcast(
+        self,
+        session_code: str,
+        message: dict,
+        key: Optional[str] = None,
+        supersedes: Optional[str] = None
+    ):
+        """
+        Broadcast message to all clients in a session
+        
+        The message is encoded once and queued per client, so a slow client
+        never holds up the others.
+        
+        Args:
+            key: Makes the message droppable for slow clients (see Outbox.put)
+            supersedes: Key of a droppable message this one makes stale
+        """
+        await self._fan_out(session_code, {"kind": "all", "key": key, "supersedes": supersedes}, encode_message(message))
+    
+    async def broadcast_tailored(self, session_code: str, message: dict, supersedes: Optional[str] = None):
+        """
+        Broadcast a message with its "translations" cut down to each client's subscription
+        
+        Encoded once per distinct subscription, not once per client. Journaled for resuming clients.
+        """
+        await self._fan_out(
+            session_code, {"kind": "tailored", "supersedes": supersedes}, encode_message(message), message
+        )
+    
+    async def broadcast_to_subscribers(self, session_code: str, language: str, message: dict):
+        """Send message to the clients in a session subscribed to language (journaled for resuming clients)"""
+        await self._fan_out(session_code, {"kind": "subscribers", "language": language}, encode_message(message))
+    
+    def listeners(self, session_code: str, language: str, binary: bool) -> List[WebSocket]:
+        """This process's clients of a session that want audio in language, as binary frames or not"""
+        return [
+            connection for connection in self.active_connections.get(session_code, [])
+            if connection in self.clients
+            and language in self.clients[connection].tts_languages
+            and self.clients[connection].binary_audio == binary
+        ]
+    
+    async def broadcast_to_listeners(self, session_code: str, language: str, message: dict):
+        """Send message to the clients in a session that want audio URLs in language"""
+        await self._fan_out(session_code, {"kind": "listeners_url", "language": language}, encode_message(message))
+    
+    async def broadcast_bytes(self, session_code: str, data: bytes, language: str):
+        """Send a binary frame to the clients in a session that want binary audio in language"""
+        await self._fan_out(session_code, {"kind": "listeners_binary", "language": language}, data)
+    
+    async def _fan_out(
+        self,
+        session_code: str,
+        header: dict,
+        payload: Union[str, bytes],
+        message: Optional[dict] = None
+    ):
+        """Deliver to this process's clients, then publish for the other processes"""
+        self._deliver(session_code, header, payload, message)
+        if isinstance(payload, str):
+            header, payload = {**header, "text": True}, payload.encode("utf-8")
+        await self._publish(session_code, header, payload)
+    
+    def _deliver(
+        self,
+        session_code: str,
+        header: dict,
+        payload: Union[str, bytes],
+        message: Optional[dict] = None
+    ):
+        """
+        Queue a broadcast for this process's clients of a session
+        
+        JSON payloads are re-encoded (once) for clients that negotiated
+        another encoding; binary frames go to everyone as they are.
+        """
+        kind = header["kind"]
+        language = header.get("language")
+        
+        if kind == "tailored":
+            message = self.journal.ring(session_code).append(message or json.loads(payload))
+            for languages, connections in self.subscription_groups(session_code).items():
+                translations = {lang: text for lang, text in message["translations"].items() if lang in languages}
+                encoded = Encoded({**message, "translations": translations})
+                for connection in connections:
+                    client = self.clients[connection]
+                    client.outbox.put(encoded.get(client.codec), supersedes=header.get("supersedes"))
+            return
+        
+        encoded = Encoded(text=payload) if isinstance(payload, str) else None
+        if kind == "all":
+            connections = self.active_connections.get(session_code, [])
+        elif kind == "subscribers":
+            encoded = Encoded(self.journal.ring(session_code).append(json.loads(payload)))
+            connections = [
+                connection for languages, group in self.subscription_groups(session_code).items()
+                if language in languages for connection in group
+            ]
+        else:
+            connections = self.listeners(session_code, language, binary=kind == "listeners_binary")
+        
+        for connection in connections:
+            client = self.clients.get(connection)
+            if client is not None:
+                client.outbox.put(
+                    encoded.get(client.codec) if encoded is not None else payload,
+                    key=header.get("key"), supersedes=header.get("supersedes")
+                )
+    
+    async def _publish(self, session_code: str, header: dict, payload: bytes = b""):
+        """Put a message on the meeting bus (best effort: local clients are already served)"""
+        try:
+            await self.bus.publish(session_code, pack({**header, "node": self.node_id}, payload))
+        except Exception as e:
+            print(f"Meeting bus publish failed for session {session_code}: {e}")
+    
+    async def _on_bus_message(self, session_code: str, data: bytes):
+        """A broadcast or listener update from another process"""
+        header, payload = unpack(data)
+        node = header.get("node")
+        if node == self.node_id:
+            return  # Already delivered locally
+        
+        if session_code == CONTROL:
+            if header["kind"] == "session_ended":
+                self._session_ended(header["session_code"])
+            elif header["kind"] == "project_changed":
+                session_registry.forget_project(header["project_id"])
+            return
+        
+        if header["kind"] == "listeners":
+            nodes = self.remote_listeners.setdefault(session_code, {})
+            if header["tts"] or header["binary"]:
+                nodes[node] = (frozenset(header["tts"]), frozenset(header["binary"]), time.monotonic())
+            else:
+                nodes.pop(node, None)
+            if header.get("query") and session_code in self.active_connections:
+                await self.announce_listeners(session_code, force=True)
+            return
+        
+        self._deliver(session_code, header, payload.decode("utf-8") if header.get("text") else payload)
+    
+    def stats(self) -> dict:
+        """Per-connection send queue depth, drops and lag, by session"""
+        return {
+            session_code: [
+                {"speaker_name": self.clients[connection].speaker_name, **self.clients[connection].outbox.stats()}
+                for connection in connections if connection in self.clients
+            ]
+            for session_code, connections in self.active_connections.items()
+        }
 
 
 manager = ConnectionManager()
 
+# Fire-and-forget work (speech synthesis) kept referenced until it finishes
+background_tasks: Set[asyncio.Task] = set()
 
-async def handle_websocket(
-    websocket: WebSocket,
-    session_code: str,
-    db: Session
-):
-    """Handle WebSocket connection for a meeting session"""
+
+def spawn_background(coro) -> asyncio.Task:
+    """Run coro without blocking the caller"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+class Utterance:
+    """One spoken or typed utterance moving through a meeting's pipeline"""
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        speaker_name: str,
+        user_id: Optional[int],
+        audio_bytes: Optional[bytes] = None,
+        audio=None,
+        text: Optional[str] = None,
+        language: str = "auto",
+        segment_id: Optional[str] = None
+    ):
+        self.websocket = websocket  # The speaker, told if their audio is shed
+        self.speaker_name = speaker_name
+        self.user_id = user_id
+        self.audio_bytes = audio_bytes  # Encoded clip, decoded by the STT stage
+        self.audio = audio  # 16 kHz mono samples
+        self.text = text
+        self.language = language
+        self.spoken = text is None  # Typed text is also read out in its own language
+        self.segment_id = segment_id  # Streamed utterances: ties the final to its partials
+        self.translations: Dict[str, str] = {}
+        self.transcript_id: Optional[int] = None
+        self.speech: List[asyncio.Task] = []  # Per-language TTS, started as each text is ready
+
+
+class MeetingPipeline(SessionPipeline):
+    """
+    STT -> publish -> translate -> TTS for every utterance in one meeting
+    
+    Results go out as soon as each is ready, keyed by transcript_id: the
+    "transcript" right after STT, a "translation" per language as it
+    arrives, then that language's "tts_chunk"s. Utterances overlap across
+    stages, but publish (persist and broadcast) is ordered, so transcripts
+    appear in the order they were spoken.
+    """
+    
+    def __init__(self, session_code: str, session: ActiveSession):
+        workers = settings.PIPELINE_STAGE_WORKERS
+        super().__init__(f"session {session_code}", [
+            Stage("stt", self.transcribe, workers),
+            Stage("publish", self.publish, ordered=True),
+            Stage("translate", self.translate, workers),
+            Stage("tts", self.speak, workers),
+        ])
+        self.session_code = session_code
+        self.session_id = session.id
+        self.retain_audio = session.retain_audio
+        self.stt_scheduler = get_stt_scheduler()
+        self.tts_service = get_tts_service()
+        self.translation_service = TranslationService()
+        self.transcripts = get_transcript_writer()
+    
+    async def transcribe(self, utterance: Utterance) -> Optional[Utterance]:
+        """STT stage (typed text passes straight through)"""
+        if not utterance.spoken:
+            return utterance
+        
+        try:
+            if utterance.audio is None:
+                utterance.audio = await self.stt_scheduler.decode(utterance.audio_bytes)
+                utterance.audio_bytes = None
+            if utterance.audio is None:
+                text, language = "", "unknown"
+            else:
+                speaker_key = language_hints.speaker_key(self.session_code, utterance.user_id, utterance.speaker_name)
+                text, language = await transcribe_with_hint(self.stt_scheduler, utterance.audio, speaker_key)
+        except STTOverloaded as overload:
+            await send_busy(utterance.websocket, overload)
+            return None
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+            await manager.broadcast(self.session_code, {
+                "type": "error",
+                "message": f"Error processing audio: {str(e)}"
+            })
+            return None
+        print(f"Transcribed: '{text}' (language: {language})")  # Debug
+        
+        if not text:
+            if utterance.segment_id is None:  # A clip, recorded on purpose; streams just had noise
+                await manager.broadcast(self.session_code, {
+                    "type": "error",
+                    "message": "Could not transcribe audio. Please speak clearly and try again."
+                })
+            return None
+        
+        utterance.text, utterance.language = text, language
+        return utterance
+    
+    async def publish(self, utterance: Utterance) -> Utterance:
+        """Ordered stage: queue the transcript row (and save the audio if retained), then broadcast it untranslated"""
+        audio = utterance.audio
+        audio_path = None
+        if self.retain_audio and audio is not None:
+            audio_path = await asyncio.to_thread(save_utterance, self.session_code, audio, TARGET_SAMPLE_RATE)
+        
+        if utterance.language in LANGUAGE_NAMES:
+            utterance.translations[utterance.language] = utterance.text
+        timestamp = datetime.utcnow()
+        utterance.transcript_id = await self.transcripts.insert(
+            session_id=self.session_id,
+            user_id=utterance.user_id,
+            speaker_name=utterance.speaker_name,
+            original_text=utterance.text,
+            original_language=utterance.language,
+            translated_text_ko=utterance.translations.get("ko"),
+            translated_text_bn=utterance.translations.get("bn"),
+            translated_text_en=utterance.translations.get("en"),
+            timestamp=timestamp,
+            audio_duration=len(audio) * 1000 // TARGET_SAMPLE_RATE if audio is not None else None,
+            audio_path=audio_path,
+            stt_model=settings.STT_MODEL_NAME if utterance.spoken else None
+        )
+        utterance.audio = None  # Nothing after this stage needs the samples
+        print(f"Queued transcript with ID: {utterance.transcript_id}")  # Debug
+        
+        message = {
+            "type": "transcript",
+            "transcript_id": utterance.transcript_id,
+            "speaker_name": utterance.speaker_name,
+            "original_text": utterance.text,
+            "original_language": utterance.language,
+            "translations": dict(utterance.translations),  # The others follow as "translation" messages
+            "timestamp": timestamp.isoformat()
+        }
+        if utterance.segment_id:
+            message["segment_id"] = utterance.segment_id
+        await manager.broadcast_tailored(
+            self.session_code, message,
+            supersedes=partial_key(utterance.segment_id) if utterance.segment_id else None
+        )
+        return utterance
+    
+    async def translate(self, utterance: Utterance) -> Utterance:
+        """
+        Translation stage: broadcast each language as it arrives and start its speech right away
+        
+        A failed language is reported and left out; the others still go through.
+        """
+        source = LANGUAGE_NAMES.get(utterance.language, "auto")
+        session = await session_registry.find(self.session_code)  # For the project glossary, kept fresh there
+        
+        async def deliver(target: str):
+            if target == utterance.language:
+                text = utterance.text  # Already sent with the transcript
+            else:
+                try:
+                    result = await self.translation_service.translate(
+                        utterance.text, source, LANGUAGE_NAMES[target],
+                        session.glossary_terms(utterance.language, target) if session else None
+                    )
+                except Exception as e:
+                    print(f"Error translating to {target}: {e}")
+                    await manager.broadcast(self.session_code, {
+                        "type": "error",
+                        "message": f"Error translating to {LANGUAGE_NAMES[target]}: {str(e)}"
+                    })
+                    return
+                text = result["translated_text"]
+                utterance.translations[target] = text
+                await manager.broadcast_to_subscribers(self.session_code, target, {
+                    "type": "translation",
+                    "transcript_id": utterance.transcript_id,
+                    "language": target,
+                    "text": text
+                })
+            
+            # The speaker doesn't need to hear their own words read back
+            if utterance.spoken and text == utterance.text:
+                return
+            if target in manager.wanted_tts_languages(self.session_code):
+                utterance.speech.append(asyncio.create_task(speak_language(
+                    self.session_code, utterance.transcript_id, target, text, self.tts_service
+                )))
+        
+        await asyncio.gather(*(deliver(target) for target in LANGUAGE_NAMES))
+        print(f"Translations: {utterance.translations}")  # Debug
+        self.transcripts.update(utterance.transcript_id, **{
+            f"translated_text_{language}": text for language, text in utterance.translations.items()
+        })
+        return utterance
+    
+    async def speak(self, utterance: Utterance) -> Utterance:
+        """TTS stage: wait for the speech started per language, so it counts against the pipeline"""
+        await asyncio.gather(*utterance.speech)
+        return utterance
+
+
+# session_code -> pipeline, while the meeting has clients or queued work
+pipelines: Dict[str, MeetingPipeline] = {}
+
+
+def get_meeting_pipeline(session_code: str, session: ActiveSession) -> MeetingPipeline:
+    """The meeting's pipeline, started on first use"""
+    pipeline = pipelines.get(session_code)
+    if pipeline is None:
+        pipeline = pipelines[session_code] = MeetingPipeline(session_code, session)
+        pipeline.start()
+    return pipeline
+
+
+async def retire_meeting_pipeline(session_code: str):
+    """Finish a meeting's queued work after its last client left, then stop its workers"""
+    pipeline = pipelines.get(session_code)
+    if pipeline is None:
+        return
+    await pipeline.drain()
+    await pipeline.transcripts.flush()
+    if session_code not in manager.active_connections and pipelines.get(session_code) is pipeline:
+        del pipelines[session_code]
+        pipeline.close()
+        language_hints.clear_session(session_code)
+
+
+async def retire_all_pipelines(timeout: float = None):
+    """On shutdown: let every meeting's in-flight utterances finish (up to timeout), then stop them all"""
+    timeout = timeout if timeout is not None else settings.PIPELINE_SHUTDOWN_SECONDS
+    if pipelines:
+        drains = [asyncio.ensure_future(pipeline.drain()) for pipeline in pipelines.values()]
+        _, pending = await asyncio.wait(drains, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⚠️ {len(pending)} meeting pipelines still busy after {timeout}s; their utterances are dropped")
+    for session_code, pipeline in list(pipelines.items()):
+        del pipelines[session_code]
+        pipeline.close()
+
+
+async def handle_websocket(websocket: WebSocket, session_code: str):
+    """
+    Handle WebSocket connection for a meeting session
+    
+    No DB session is held for the life of the connection: the meeting
+    comes from the session registry, and transcripts are written behind
+    by the transcript writer.
+    """
     
     # Verify session exists and is active
-    session = db.query(MeetingSession).filter(
-        MeetingSession.session_code == session_code
-    ).first()
+    session = await session_registry.find(session_code)
     
     if not session:
         await websocket.close(code=1008, reason="Session not found")
@@ -67,47 +742,139 @@ async def handle_websocket(
         await websocket.close(code=1008, reason="Session is not active")
         return
     
+    # A reconnecting client says which events it already has (?epoch=...&last_seq=...)
+    last_seq = websocket.query_params.get("last_seq")
+    resuming = last_seq is not None
+    last_seq = int(last_seq) if last_seq and last_seq.isdigit() else None
+    
     # Connect client
-    await manager.connect(websocket, session_code)
+    await manager.connect(websocket, session_code, resuming=resuming)
+    
+    # Translations only go to clients subscribed to them (?languages=ko, default all),
+    # and speech is only synthesized for languages some client asked for (?tts=ko,en)
+    client = manager.clients[websocket]
+    languages = manager.set_languages(
+        websocket, (websocket.query_params.get("languages") or "").split(",")
+    )
+    tts_languages = await manager.set_tts_languages(
+        websocket, session_code, (websocket.query_params.get("tts") or "").split(",")
+    )
     
     # Send welcome message
-    await websocket.send_json({
+    ring = manager.journal.ring(session_code)
+    await manager.send(websocket, {
         "type": "connected",
         "session_code": session_code,
-        "message": "Connected to session"
+        "message": "Connected to session",
+        "languages": sorted(languages),
+        "tts_languages": sorted(tts_languages),
+        "epoch": ring.epoch,
+        "seq": ring.seq,
+        "encoding": client.codec.name
     })
+    if resuming:
+        manager.resume(websocket, session_code, websocket.query_params.get("epoch"), last_seq)
+    
+    # Utterances are processed by the meeting's pipeline; this loop only queues them
+    pipeline = get_meeting_pipeline(session_code, session)
     
-    # Get services
-    stt_service = get_stt_service()
-    tts_service = get_tts_service()
-    translation_service = TranslationService()
+    # Streaming transcription state, created on the first audio_chunk
+    audio_stream = None
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_json()
+            # Receive message from client: binary frames carry audio (or MessagePack), text frames JSON
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            if message.get("bytes") is not None and (not client.codec.binary or message["bytes"][:1] == MAGIC_BYTE):
+                try:
+                    frame = decode_frame(message["bytes"])
+                except FrameError as e:
+                    await manager.send(websocket, {"type": "error", "message": f"Invalid audio frame: {e}"})
+                    continue
+                
+                if frame.frame_type == FrameType.AUDIO_CLIP:
+                    await submit_utterance(pipeline, Utterance(
+                        websocket, client.speaker_name, client.user_id, audio_bytes=frame.payload
+                    ))
+                
+                elif frame.frame_type == FrameType.AUDIO_CHUNK:
+                    if audio_stream is None:
+                        audio_stream = AudioStream(websocket, client.speaker_name, client.user_id)
+                    audio_stream.speaker_name, audio_stream.user_id = client.speaker_name, client.user_id
+                    await feed_audio_stream(
+                        frame.payload, client.sample_rate, client.channels, audio_stream, pipeline
+                    )
+                continue
+            
+            # Other frames carry messages in the client's encoding
+            data = client.codec.decode(message["bytes"] if message.get("bytes") is not None else message["text"])
             message_type = data.get("type")
             
             print(f"Received message type: {message_type}")  # Debug log
             
-            if message_type == "audio":
+            if message_type == "identify":
+                # Speaker metadata for binary audio frames, which carry none
+                if data.get("speaker_name"):
+                    client.speaker_name = data["speaker_name"]
+                if data.get("user_id") is not None:
+                    client.user_id = data["user_id"]
+                client.sample_rate = int(data.get("sample_rate") or client.sample_rate)
+                client.channels = int(data.get("channels") or client.channels)
+                client.binary_audio = bool(data.get("binary_audio", client.binary_audio))
+                await manager.announce_listeners(session_code)
+                await manager.send(websocket, {
+                    "type": "identify",
+                    "speaker_name": client.speaker_name,
+                    "user_id": client.user_id,
+                    "sample_rate": client.sample_rate,
+                    "channels": client.channels,
+                    "binary_audio": client.binary_audio
+                })
+            
+            elif message_type == "audio":
                 # Process audio for transcription and translation
-                await process_audio_message(
-                    data, session, db, stt_service, tts_service, translation_service, session_code
-                )
+                await process_audio_message(websocket, data, pipeline)
+            
+            elif message_type == "audio_chunk":
+                # Streamed PCM16 frame: segmented server-side by VAD
+                if audio_stream is None:
+                    audio_stream = AudioStream(websocket, data.get("speaker_name", "Unknown"), data.get("user_id"))
+                await process_audio_chunk(data, audio_stream, pipeline)
+            
+            elif message_type == "audio_end":
+                # Client stopped streaming: finalize whatever is buffered
+                if audio_stream is not None:
+                    await finish_audio_stream(audio_stream, pipeline)
             
             elif message_type == "text":
                 # Process text message for translation only
-                await process_text_message(
-                    data, session, db, tts_service, translation_service, session_code
-                )
+                await process_text_message(websocket, data, pipeline)
+            
+            elif message_type == "subscribe":
+                # Translations this client wants from now on
+                languages = manager.set_languages(websocket, data.get("languages"))
+                await manager.send(websocket, {"type": "subscribe", "languages": sorted(languages)})
+            
+            elif message_type == "tts_preferences":
+                # Languages this client wants audio for from now on
+                languages = await manager.set_tts_languages(websocket, session_code, data.get("languages"))
+                await manager.send(websocket, {"type": "tts_preferences", "languages": sorted(languages)})
+            
+            elif message_type == "tts_request":
+                # Audio for one transcript, on demand
+                await process_tts_request(websocket, data, session, pipeline.tts_service)
             
             elif message_type == "ping":
                 # Keep-alive ping
-                await websocket.send_json({"type": "pong"})
+                await manager.send(websocket, {"type": "pong"})
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket, session_code)
+        await manager.disconnect(websocket, session_code)
+        if audio_stream is not None:
+            await finish_audio_stream(audio_stream, pipeline)
         await manager.broadcast(session_code, {
             "type": "user_disconnected",
             "message": "A user disconnected"
@@ -115,19 +882,31 @@ async def handle_websocket(
     
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(websocket, session_code)
+        await manager.disconnect(websocket, session_code)
+    
+    if session_code not in manager.active_connections:
+        spawn_background(retire_meeting_pipeline(session_code))
 
 
-async def process_audio_message(
-    data: dict,
-    session: MeetingSession,
-    db: Session,
-    stt_service,
-    tts_service,
-    translation_service: TranslationService,
-    session_code: str
-):
-    """Process audio message: STT -> Translation -> TTS -> Broadcast"""
+async def send_busy(websocket: WebSocket, overload: STTOverloaded):
+    """Tell the speaker their audio was shed because STT is saturated"""
+    print(f"STT shed audio: {overload.reason}")  # Debug
+    await manager.send(websocket, {
+        "type": "busy",
+        "reason": overload.reason,
+        "retry_after_ms": overload.retry_after_ms,
+        "message": "Speech recognition is busy right now. Please try again in a moment."
+    })
+
+
+async def submit_utterance(pipeline: MeetingPipeline, utterance: Utterance):
+    """Queue an utterance, telling the speaker if the meeting already has too many in flight"""
+    if not pipeline.submit(utterance):
+        await send_busy(utterance.websocket, STTOverloaded("meeting pipeline full"))
+
+
+async def process_audio_message(websocket: WebSocket, data: dict, pipeline: MeetingPipeline):
+    """Queue a base64 audio clip: STT -> Translation -> Broadcast -> TTS"""
     
     print("=== Processing audio message ===")  # Debug log
     
@@ -145,208 +924,261 @@ async def process_audio_message(
         
         audio_bytes = base64.b64decode(audio_base64)
         print(f"Decoded audio bytes: {len(audio_bytes)}")  # Debug
-        
-        # Step 1: Speech-to-Text
-        print("Starting transcription...")
-        original_text, detected_language = stt_service.transcribe_audio(audio_bytes)
-        print(f"Transcribed: '{original_text}' (language: {detected_language})")  # Debug
-        
-        if not original_text:
-            print("No text transcribed from audio!")
-            await manager.broadcast(session_code, {
-                "type": "error",
-                "message": "Could not transcribe audio. Please speak clearly and try again."
-            })
-            return
-        
-        # Step 2: Translate to all three languages
-        translations = {}
-        
-        # Map detected language
-        lang_map = {
-            "ko": "korean",
-            "bn": "bengali",
-            "en": "english",
-            "korean": "korean",
-            "bengali": "bengali",
-            "english": "english"
-        }
-        
-        source_lang = lang_map.get(detected_language, "auto")
-        
-        # Translate to Korean
-        if detected_language != "ko":
-            result = await translation_service.translate(original_text, source_lang, "korean")
-            translations["ko"] = result["translated_text"]
-        else:
-            translations["ko"] = original_text
-        
-        # Translate to Bengali
-        if detected_language != "bn":
-            result = await translation_service.translate(original_text, source_lang, "bengali")
-            translations["bn"] = result["translated_text"]
-        else:
-            translations["bn"] = original_text
-        
-        # Translate to English
-        if detected_language != "en":
-            result = await translation_service.translate(original_text, source_lang, "english")
-            translations["en"] = result["translated_text"]
-        else:
-            translations["en"] = original_text
-        
-        # Step 3: Generate TTS for translations
-        audio_files = {}
-        for lang, text in translations.items():
-            if text and text != original_text:
-                audio_bytes = tts_service.text_to_speech(text, lang)
-                audio_files[lang] = base64.b64encode(audio_bytes).decode('utf-8')
-        
-        # Step 4: Save to database
-        transcript = Transcript(
-            session_id=session.id,
-            user_id=user_id,
-            speaker_name=speaker_name,
-            original_text=original_text,
-            original_language=detected_language,
-            translated_text_ko=translations.get("ko"),
-            translated_text_bn=translations.get("bn"),
-            translated_text_en=translations.get("en"),
-            timestamp=datetime.utcnow()
-        )
-        db.add(transcript)
-        db.commit()
-        db.refresh(transcript)
-        
-        # Step 5: Broadcast to all clients
-        await manager.broadcast(session_code, {
-            "type": "transcript",
-            "transcript_id": transcript.id,
-            "speaker_name": speaker_name,
-            "original_text": original_text,
-            "original_language": detected_language,
-            "translations": translations,
-            "audio_files": audio_files,
-            "timestamp": transcript.timestamp.isoformat()
-        })
     
     except Exception as e:
         print(f"Error processing audio: {e}")
-        await manager.broadcast(session_code, {
+        await manager.broadcast(pipeline.session_code, {
             "type": "error",
             "message": f"Error processing audio: {str(e)}"
         })
+        return
+    
+    await submit_utterance(pipeline, Utterance(websocket, speaker_name, user_id, audio_bytes=audio_bytes))
 
 
-async def process_text_message(
-    data: dict,
-    session: MeetingSession,
-    db: Session,
-    tts_service,
-    translation_service: TranslationService,
-    session_code: str
+class AudioStream:
+    """Per-connection state for streaming (incremental) transcription"""
+    
+    def __init__(self, websocket: WebSocket, speaker_name: str, user_id: Optional[int]):
+        self.websocket = websocket
+        self.segmenter = StreamingSegmenter(sample_rate=TARGET_SAMPLE_RATE)
+        self.speaker_name = speaker_name
+        self.user_id = user_id
+        self.segment_id = uuid.uuid4().hex
+        self.resampler: Optional[StreamResampler] = None
+        # Held while a partial transcribes; further partials are skipped meanwhile
+        self.lock = asyncio.Lock()
+        self.tasks: Set[asyncio.Task] = set()
+    
+    def spawn(self, coro):
+        """Run coro in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+    
+    def resample(self, samples, sample_rate: int):
+        """Bring the next frame to 16 kHz, continuing the stream's resampling state"""
+        if sample_rate == TARGET_SAMPLE_RATE:
+            return samples
+        if self.resampler is None or self.resampler.src_rate != sample_rate:
+            self.resampler = StreamResampler(sample_rate, TARGET_SAMPLE_RATE)
+        return self.resampler.process(samples)
+    
+    def speaker_key(self, session_code: str):
+        """Key for this speaker's language hint"""
+        return language_hints.speaker_key(session_code, self.user_id, self.speaker_name)
+    
+    def next_segment(self) -> str:
+        """Start a new segment, returning the id of the one just closed"""
+        segment_id = self.segment_id
+        self.segment_id = uuid.uuid4().hex
+        return segment_id
+
+
+async def process_audio_chunk(data: dict, stream: AudioStream, pipeline: MeetingPipeline):
+    """Feed a streamed audio frame through VAD, scheduling partial/final STT"""
+    
+    audio_base64 = data.get("audio")
+    if not audio_base64:
+        return
+    
+    if data.get("speaker_name"):
+        stream.speaker_name = data["speaker_name"]
+    if data.get("user_id") is not None:
+        stream.user_id = data["user_id"]
+    
+    await feed_audio_stream(
+        base64.b64decode(audio_base64),
+        int(data.get("sample_rate") or settings.STREAM_SAMPLE_RATE),
+        int(data.get("channels") or 1),
+        stream, pipeline
+    )
+
+
+async def feed_audio_stream(
+    pcm: bytes,
+    sample_rate: int,
+    channels: int,
+    stream: AudioStream,
+    pipeline: MeetingPipeline
 ):
-    """Process text message: Translation -> TTS -> Broadcast"""
+    """Run PCM16 audio (from JSON base64 or a binary frame) through VAD, scheduling partial/final STT"""
     
-    print("=== Processing text message ===")  # Debug log
+    # Frames may arrive at any rate/channel count; VAD and Whisper want 16 kHz mono
+    samples = StreamingSegmenter.pcm16_to_float(pcm)
+    samples = stream.resample(to_mono(samples, channels), sample_rate)
     
-    try:
-        text = data.get("text")
-        language = data.get("language", "auto")
-        speaker_name = data.get("speaker_name", "Unknown")
-        user_id = data.get("user_id")
-        
-        print(f"Speaker: {speaker_name}, Text: '{text}', Language: {language}")  # Debug
-        
-        if not text:
-            print("No text received!")
-            return
-        
-        # Map language codes
-        lang_map = {
-            "ko": "korean",
-            "bn": "bengali",
-            "en": "english",
-            "korean": "korean",
-            "bengali": "bengali",
-            "english": "english",
-            "auto": "auto"
-        }
-        
-        source_lang = lang_map.get(language, "auto")
-        
-        # Translate to all three languages
-        translations = {}
-        
-        print(f"Translating from {source_lang}...")  # Debug
-        
-        # Translate to Korean
-        if source_lang != "korean":
-            result = await translation_service.translate(text, source_lang, "korean")
-            translations["ko"] = result["translated_text"]
-        else:
-            translations["ko"] = text
-        
-        # Translate to Bengali
-        if source_lang != "bengali":
-            result = await translation_service.translate(text, source_lang, "bengali")
-            translations["bn"] = result["translated_text"]
-        else:
-            translations["bn"] = text
-        
-        # Translate to English
-        if source_lang != "english":
-            result = await translation_service.translate(text, source_lang, "english")
-            translations["en"] = result["translated_text"]
+    for event, audio in stream.segmenter.feed_samples(samples):
+        if event == "partial":
+            # Skip partials while one is still transcribing; the next one catches up
+            if not stream.lock.locked():
+                stream.spawn(transcribe_partial(audio, stream.segment_id, stream, pipeline))
         else:
-            translations["en"] = text
-        
-        print(f"Translations: {translations}")  # Debug
-        
-        # Generate TTS
-        audio_files = {}
-        for lang, translated_text in translations.items():
-            if translated_text:
-                try:
-                    audio_bytes = tts_service.text_to_speech(translated_text, lang)
-                    audio_files[lang] = base64.b64encode(audio_bytes).decode('utf-8')
-                    print(f"Generated TTS for {lang}, size: {len(audio_files[lang])}")  # Debug
-                except Exception as e:
-                    print(f"Error generating TTS for {lang}: {e}")
-        
-        # Save to database
-        transcript = Transcript(
-            session_id=session.id,
-            user_id=user_id,
-            speaker_name=speaker_name,
-            original_text=text,
-            original_language=language,
-            translated_text_ko=translations.get("ko"),
-            translated_text_bn=translations.get("bn"),
-            translated_text_en=translations.get("en"),
-            timestamp=datetime.utcnow()
-        )
-        db.add(transcript)
-        db.commit()
-        db.refresh(transcript)
-        
-        print(f"Saved transcript with ID: {transcript.id}")  # Debug
-        
-        # Broadcast to all clients
-        await manager.broadcast(session_code, {
-            "type": "transcript",
-            "transcript_id": transcript.id,
-            "speaker_name": speaker_name,
-            "original_text": text,
-            "original_language": language,
-            "translations": translations,
-            "audio_files": audio_files,
-            "timestamp": transcript.timestamp.isoformat()
-        })
+            await submit_final(audio, stream, pipeline)
+
+
+async def finish_audio_stream(stream: AudioStream, pipeline: MeetingPipeline):
+    """Flush any open segment when the client stops streaming"""
+    
+    audio = stream.segmenter.flush()
+    if audio is not None:
+        await submit_final(audio, stream, pipeline)
+
+
+async def submit_final(audio, stream: AudioStream, pipeline: MeetingPipeline):
+    """Queue a closed segment for the full STT -> translate -> publish -> TTS run"""
+    
+    await submit_utterance(pipeline, Utterance(
+        stream.websocket, stream.speaker_name, stream.user_id,
+        audio=audio, segment_id=stream.next_segment()
+    ))
+
+
+async def transcribe_partial(
+    audio,
+    segment_id: str,
+    stream: AudioStream,
+    pipeline: MeetingPipeline
+):
+    """Transcribe the open segment so far and broadcast it as a partial"""
+    
+    async with stream.lock:
+        try:
+            text, language = await transcribe_with_hint(
+                pipeline.stt_scheduler, audio, stream.speaker_key(pipeline.session_code), learn=False
+            )
+        except STTOverloaded:
+            return  # Partials are best-effort; the final segment still goes through
+        except Exception as e:
+            print(f"Error transcribing partial: {e}")
+            return
+    
+    if text:
+        # Slow clients only need the newest partial of a segment, if any
+        await manager.broadcast(pipeline.session_code, {
+            "type": "transcript_partial",
+            "segment_id": segment_id,
+            "speaker_name": stream.speaker_name,
+            "text": text,
+            "language": language
+        }, key=partial_key(segment_id))
+
+
+def partial_key(segment_id: str) -> str:
+    """Outbox coalescing key of a segment's partials"""
+    return f"partial:{segment_id}"
+
+
+def tts_chunk(transcript_id: int, language: str, index: int, count: int, key: str) -> dict:
+    """One sentence of synthesized speech; clients play chunks in index order"""
+    return {
+        "type": "tts_chunk",
+        "transcript_id": transcript_id,
+        "language": language,
+        "index": index,
+        "count": count,
+        "audio_url": audio_url(key)
+    }
+
+
+async def speak_language(
+    session_code: str,
+    transcript_id: int,
+    language: str,
+    text: str,
+    tts_service
+):
+    """
+    Synthesize text and stream it to the clients listening in language
     
+    Sentences synthesize in parallel but are sent in order, so playback
+    starts after the first.
+    """
+    try:
+        async for index, count, key in get_tts_cache().speak_sentences(tts_service, text, language):
+            await manager.broadcast_to_listeners(
+                session_code, language, tts_chunk(transcript_id, language, index, count, key)
+            )
+            if manager.wants_binary_audio(session_code, language):
+                audio = await asyncio.to_thread(get_tts_cache().read, key)
+                await manager.broadcast_bytes(
+                    session_code,
+                    encode_frame(FrameType.TTS_AUDIO, audio, transcript_id, language, index, count),
+                    language
+                )
     except Exception as e:
-        print(f"Error processing text: {e}")
-        await manager.broadcast(session_code, {
-            "type": "error",
-            "message": f"Error processing text: {str(e)}"
-        })
+        print(f"Error generating TTS for {language}: {e}")
+
+
+async def process_tts_request(
+    websocket: WebSocket,
+    data: dict,
+    session: ActiveSession,
+    tts_service
+):
+    """Synthesize one transcript in one language for the requesting client"""
+    
+    transcript_id = data.get("transcript_id")
+    language = data.get("language")
+    if language not in TTS_LANGUAGES:
+        await manager.send(websocket, {"type": "error", "message": f"Unsupported audio language: {language}"})
+        return
+    
+    # The row may still be queued for writing
+    transcript = await get_transcript_writer().read(transcript_id) if isinstance(transcript_id, int) else None
+    if not transcript or transcript["session_id"] != session.id:
+        await manager.send(websocket, {"type": "error", "message": "Transcript not found"})
+        return
+    
+    text = transcript[f"translated_text_{language}"] or (
+        transcript["original_text"] if transcript["original_language"] == language else None
+    )
+    if not text:
+        await manager.send(websocket, {"type": "error", "message": "No text to synthesize"})
+        return
+    
+    # Synthesis can take seconds; keep reading the socket meanwhile
+    spawn_background(send_speech(websocket, transcript_id, text, language, tts_service))
+
+
+async def send_speech(websocket: WebSocket, transcript_id: int, text: str, language: str, tts_service):
+    """Stream speech for text to one client, sentence by sentence"""
+    
+    client = manager.clients.get(websocket)
+    if client is None:
+        return
+    try:
+        async for index, count, key in get_tts_cache().speak_sentences(tts_service, text, language):
+            if client.binary_audio:
+                audio = await asyncio.to_thread(get_tts_cache().read, key)
+                await manager.send(
+                    websocket, encode_frame(FrameType.TTS_AUDIO, audio, transcript_id, language, index, count)
+                )
+            else:
+                await manager.send(websocket, tts_chunk(transcript_id, language, index, count, key))
+    except Exception as e:
+        print(f"Error generating TTS for transcript {transcript_id}: {e}")
+        await manager.send(websocket, {"type": "error", "message": "Could not generate audio"})
+
+
+async def process_text_message(websocket: WebSocket, data: dict, pipeline: MeetingPipeline):
+    """Queue a typed message: Translation -> Broadcast -> TTS"""
+    
+    print("=== Processing text message ===")  # Debug log
+    
+    text = data.get("text")
+    language = data.get("language", "auto")
+    speaker_name = data.get("speaker_name", "Unknown")
+    user_id = data.get("user_id")
+    
+    print(f"Speaker: {speaker_name}, Text: '{text}', Language: {language}")  # Debug
+    
+    if not text:
+        print("No text received!")
+        return
+    
+    # Language names ("korean") and codes ("ko") are both accepted
+    await submit_utterance(pipeline, Utterance(
+        websocket, speaker_name, user_id, text=text, language=LANGUAGE_CODES.get(language, language)
+    ))
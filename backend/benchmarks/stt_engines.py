@@ -0,0 +1,172 @@
+"""
+Side-by-side benchmark for the STT engines.
+
+Runs every clip in a manifest through each engine, reporting throughput
+(real-time factor), per-clip latency and accuracy against reference
+transcripts. Exits non-zero when an engine's error rate exceeds the
+baseline engine's by more than --max-error-delta, so it can gate a switch
+to a quantized engine.
+
+Manifest is JSON Lines, one clip per line:
+    {"audio": "clips/ko_001.wav", "text": "reference transcript", "language": "ko"}
+
+Usage (from backend/):
+    python -m benchmarks.stt_engines manifest.jsonl --engines whisper faster-whisper
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.stt_service import STT_ENGINES, create_stt_engine  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """Levenshtein distance between two token sequences"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_token != hyp_token)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip punctuation so scoring ignores formatting"""
+    return "".join(ch for ch in text.lower() if ch.isalnum() or ch.isspace()).strip()
+
+
+def error_rate(reference: str, hypothesis: str, unit: str) -> float:
+    """
+    Word or character error rate
+
+    Args:
+        unit: "word" (WER) or "char" (CER, better suited to Korean/Bengali)
+    """
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    if unit == "char":
+        ref_tokens, hyp_tokens = list(reference.replace(" ", "")), list(hypothesis.replace(" ", ""))
+    else:
+        ref_tokens, hyp_tokens = reference.split(), hypothesis.split()
+    if not ref_tokens:
+        return 0.0 if not hyp_tokens else 1.0
+    return edit_distance(ref_tokens, hyp_tokens) / len(ref_tokens)
+
+
+def load_manifest(path: str) -> List[Dict]:
+    """Read the JSONL manifest, resolving audio paths relative to it"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    clips = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                clip = json.loads(line)
+                clip["audio"] = os.path.join(base_dir, clip["audio"])
+                clips.append(clip)
+    return clips
+
+
+def run_engine(engine_name: str, model_name: str, clips: List[Dict], repeat: int, unit: str, use_hint: bool) -> Dict:
+    """Benchmark one engine over all clips"""
+    print(f"\n=== {engine_name} ({model_name}) ===")
+    load_start = time.perf_counter()
+    engine = create_stt_engine(engine_name, model_name)
+    load_seconds = time.perf_counter() - load_start
+
+    # Decode once up front so timings cover inference only
+    audios = [engine.load_audio(clip["audio"]) for clip in clips]
+    audio_seconds = sum(len(audio) for audio in audios) / SAMPLE_RATE
+
+    # Warm-up pass (first call pays for lazy initialisation)
+    engine.transcribe(audios[0], clips[0].get("language") if use_hint else None)
+
+    latencies, errors, hypotheses = [], [], []
+    for clip, audio in zip(clips, audios):
+        language = clip.get("language") if use_hint else None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text, detected = engine.transcribe(audio, language)[:2]
+            latencies.append(time.perf_counter() - start)
+        hypotheses.append(text)
+        if "text" in clip:
+            errors.append(error_rate(clip["text"], text, unit))
+        print(f"  {os.path.basename(clip['audio'])}: [{detected}] {text}")
+
+    total_seconds = sum(latencies) / repeat
+    latencies.sort()
+    return {
+        "engine": engine_name,
+        "load_seconds": load_seconds,
+        "audio_seconds": audio_seconds,
+        "inference_seconds": total_seconds,
+        "rtf": total_seconds / audio_seconds if audio_seconds else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "error_rate": statistics.mean(errors) if errors else None,
+        "hypotheses": hypotheses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT engines side by side")
+    parser.add_argument("manifest", help="JSONL manifest of clips and reference transcripts")
+    parser.add_argument("--engines", nargs="+", default=list(STT_ENGINES), choices=list(STT_ENGINES))
+    parser.add_argument("--model", default="base", help="Model size for every engine")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per clip")
+    parser.add_argument("--unit", choices=["word", "char"], default="char", help="Error rate unit")
+    parser.add_argument("--use-hint", action="store_true", help="Pass the manifest language as a hint")
+    parser.add_argument(
+        "--max-error-delta", type=float, default=0.05,
+        help="Fail if an engine's error rate exceeds the first engine's by more than this"
+    )
+    args = parser.parse_args()
+
+    clips = load_manifest(args.manifest)
+    if not clips:
+        parser.error("Manifest contains no clips")
+
+    results = [
+        run_engine(name, args.model, clips, args.repeat, args.unit, args.use_hint)
+        for name in args.engines
+    ]
+
+    baseline = results[0]
+    print(f"\n{'engine':<16}{'load s':>8}{'RTF':>8}{'x RT':>8}{'p50 ms':>9}{'p95 ms':>9}{args.unit.upper() + 'ER':>8}{'agree':>8}")
+    failed = False
+    for result in results:
+        speed = 1 / result["rtf"] if result["rtf"] else 0.0
+        error = f"{result['error_rate']:.3f}" if result["error_rate"] is not None else "n/a"
+        # Agreement with the baseline engine's output, independent of references
+        agreement = 1 - statistics.mean(
+            error_rate(ref, hyp, args.unit)
+            for ref, hyp in zip(baseline["hypotheses"], result["hypotheses"])
+        )
+        print(
+            f"{result['engine']:<16}{result['load_seconds']:>8.1f}{result['rtf']:>8.3f}{speed:>8.1f}"
+            f"{result['p50_ms']:>9.0f}{result['p95_ms']:>9.0f}{error:>8}{agreement:>8.2f}"
+        )
+        if (
+            result["error_rate"] is not None
+            and baseline["error_rate"] is not None
+            and result["error_rate"] - baseline["error_rate"] > args.max_error_delta
+        ):
+            failed = True
+            print(f"  ✗ {result['engine']} error rate exceeds baseline by more than {args.max_error_delta}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput/latency curve for STT core partitionings on this machine.
+
+For each layout (e.g. 1 worker x 8 threads, 2 x 4, 4 x 2, 8 x 1) a
+PartitionedSTTPool is started and the manifest's clips are submitted with
+enough concurrency to keep every worker busy. Reports audio-seconds
+processed per wall-second, request latency percentiles and per-worker
+utilization, so STT_POOL_WORKERS can be picked from data.
+
+Usage (from backend/):
+    python -m benchmarks.stt_partitions manifest.jsonl --workers 1 2 4 8 --requests 64
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stt_engines import load_manifest  # noqa: E402
+from services.stt_pool import PartitionedSTTPool, available_cores, partition_cores  # noqa: E402
+from services.stt_service import STT_ENGINES  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def run_layout(workers: int, audios, args) -> dict:
+    """Benchmark one partitioning"""
+    partitions = partition_cores(workers)
+    print(f"\n=== {len(partitions)} workers x {len(partitions[0])} threads: {partitions} ===")
+    pool = PartitionedSTTPool(partitions, model_name=args.model, engine_name=args.engine)
+    try:
+        # Warm every worker once so model initialisation isn't timed
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            list(executor.map(lambda _: pool.transcribe_array(audios[0], args.language), partitions))
+        pool.started_at = time.monotonic()
+        for worker in pool.workers:
+            worker.busy_seconds, worker.calls = 0.0, 0
+
+        requests = [audios[i % len(audios)] for i in range(args.requests)]
+        concurrency = args.concurrency or len(partitions) * 2
+
+        def timed(audio):
+            start = time.perf_counter()
+            pool.transcribe_array(audio, args.language)
+            return time.perf_counter() - start
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = sorted(executor.map(timed, requests))
+        wall = time.perf_counter() - wall_start
+        utilization = [worker["utilization"] for worker in pool.utilization()]
+    finally:
+        pool.close()
+
+    audio_seconds = sum(len(audio) for audio in requests) / SAMPLE_RATE
+    return {
+        "layout": f"{len(partitions)}x{len(partitions[0])}",
+        "throughput": audio_seconds / wall,
+        "requests_per_s": len(requests) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "utilization": statistics.mean(utilization),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT pool core partitionings")
+    parser.add_argument("manifest", help="JSONL manifest of clips (see benchmarks.stt_engines)")
+    parser.add_argument("--workers", nargs="+", type=int, default=None, help="Worker counts to try")
+    parser.add_argument("--engine", default="whisper", choices=list(STT_ENGINES))
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--language", default=None, help="Language hint for every clip")
+    parser.add_argument("--requests", type=int, default=32, help="Clips submitted per layout")
+    parser.add_argument("--concurrency", type=int, default=0, help="Client threads (default 2 per worker)")
+    args = parser.parse_args()
+
+    cores = len(available_cores())
+    worker_counts = args.workers or [n for n in (1, 2, 4, 8, 16) if n <= cores]
+
+    engine_class = STT_ENGINES[args.engine]
+    audios = [engine_class.load_audio(clip["audio"]) for clip in load_manifest(args.manifest)]
+    if not audios:
+        parser.error("Manifest contains no clips")
+
+    results = [run_layout(workers, audios, args) for workers in worker_counts]
+
+    print(f"\n{cores} cores available")
+    print(f"{'layout':<10}{'audio s/s':>11}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'util':>7}")
+    for result in results:
+        print(
+            f"{result['layout']:<10}{result['throughput']:>11.2f}{result['requests_per_s']:>8.2f}"
+            f"{result['p50_ms']:>9.0f}{result['p95_ms']:>9.0f}{result['utilization']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Bytes on the wire and CPU per message for the meeting WebSocket encodings.
+
+Replays a synthetic meeting (per utterance: a few transcript partials,
+the transcript, a translation per language and the speech chunks) through
+each codec of services.ws_codec, with and without permessage-deflate.
+Deflate is emulated the way the server applies it: one raw-deflate stream
+per connection, synced after every message, and with context takeover
+(the default), so repeated keys compress against earlier messages.
+
+Reports average frame size and encode/decode/deflate time per message.
+
+Usage (from backend/):
+    python -m benchmarks.ws_encoding --utterances 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ws_codec import CODECS  # noqa: E402
+
+SAMPLE_TEXT = {
+    "en": "Let's review the shipment schedule for next week before the supplier call.",
+    "ko": "공급업체 통화 전에 다음 주 선적 일정을 검토합시다.",
+    "bn": "সরবরাহকারীর কলের আগে আগামী সপ্তাহের চালানের সময়সূচী পর্যালোচনা করা যাক।",
+}
+SPEAKERS = ["Kim Min-jun", "Rahim Uddin", "Sarah Lee", "Park Ji-woo"]
+
+
+def meeting_messages(utterances: int, seed: int = 7) -> List[dict]:
+    """Messages one client subscribed to every language receives during a meeting"""
+    rng = random.Random(seed)
+    messages = []
+    for transcript_id in range(1, utterances + 1):
+        language = rng.choice(list(SAMPLE_TEXT))
+        words = SAMPLE_TEXT[language].split()
+        segment_id = f"{rng.getrandbits(48):012x}"
+        for cut in range(2, len(words), max(1, len(words) // 3)):
+            messages.append({"type": "transcript_partial", "segment_id": segment_id, "text": " ".join(words[:cut])})
+        messages.append({
+            "type": "transcript",
+            "transcript_id": transcript_id,
+            "speaker_name": rng.choice(SPEAKERS),
+            "original_text": SAMPLE_TEXT[language],
+            "original_language": language,
+            "translations": {language: SAMPLE_TEXT[language]},
+            "timestamp": f"2024-05-14T09:{transcript_id // 60 % 60:02d}:{transcript_id % 60:02d}.{rng.randrange(10**6):06d}",
+            "segment_id": segment_id,
+            "seq": len(messages) + 1,
+        })
+        for target in SAMPLE_TEXT:
+            if target != language:
+                messages.append({
+                    "type": "translation",
+                    "transcript_id": transcript_id,
+                    "language": target,
+                    "text": SAMPLE_TEXT[target],
+                    "seq": len(messages) + 1,
+                })
+        for index in range(2):
+            messages.append({
+                "type": "tts_chunk",
+                "transcript_id": transcript_id,
+                "language": "ko",
+                "index": index,
+                "count": 2,
+                "audio_url": f"/api/tts/{rng.getrandbits(256):064x}",
+            })
+    return messages
+
+
+def as_bytes(payload) -> bytes:
+    return payload.encode("utf-8") if isinstance(payload, str) else payload
+
+
+def deflate_stream(level: int) -> Callable[[bytes], bytes]:
+    """One connection's permessage-deflate compressor (context takeover)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    def compress(data: bytes) -> bytes:
+        frame = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return frame[:-4]  # The 00 00 ff ff tail is implied by the extension
+
+    return compress
+
+
+def per_message_us(function: Callable, items: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def run_codec(codec, messages: List[dict], args) -> Dict[str, float]:
+    payloads = [codec.encode(message) for message in messages]
+    raw = [as_bytes(payload) for payload in payloads]
+
+    compress = deflate_stream(args.level)
+    deflated = [compress(data) for data in raw]
+    deflate_us = per_message_us(deflate_stream(args.level), raw, 1)
+
+    return {
+        "codec": codec.name,
+        "bytes": sum(map(len, raw)) / len(raw),
+        "deflated": sum(map(len, deflated)) / len(deflated),
+        "encode_us": per_message_us(codec.encode, messages, args.repeat),
+        "decode_us": per_message_us(codec.decode, payloads, args.repeat),
+        "deflate_us": deflate_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare meeting WebSocket message encodings")
+    parser.add_argument("--utterances", type=int, default=500, help="Utterances in the synthetic meeting")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per measurement (best is kept)")
+    parser.add_argument("--level", type=int, default=zlib.Z_DEFAULT_COMPRESSION, help="Deflate level")
+    args = parser.parse_args()
+
+    messages = meeting_messages(args.utterances)
+    if "msgpack" not in CODECS:
+        print("msgpack is not installed; only JSON is measured (pip install msgpack)")
+
+    results = [run_codec(codec, messages, args) for codec in CODECS.values()]
+    baseline = results[0]
+
+    print(f"\n{len(messages)} messages from {args.utterances} utterances")
+    print(
+        f"{'codec':<9}{'bytes/msg':>10}{'vs json':>9}{'deflated':>10}{'vs json':>9}"
+        f"{'encode us':>11}{'decode us':>11}{'deflate us':>12}"
+    )
+    for result in results:
+        print(
+            f"{result['codec']:<9}{result['bytes']:>10.1f}{result['bytes'] / baseline['bytes']:>9.2f}"
+            f"{result['deflated']:>10.1f}{result['deflated'] / baseline['deflated']:>9.2f}"
+            f"{result['encode_us']:>11.2f}{result['decode_us']:>11.2f}{result['deflate_us']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
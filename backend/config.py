@@ -20,7 +20,96 @@ class Settings(BaseSettings):
     # App Settings
     APP_NAME: str = "Korean Translation Service"
     DEBUG: bool = True
-    
+
+    # Speech-to-Text
+    STT_ENGINE: str = "whisper"  # "whisper" (PyTorch FP32) or "faster-whisper" (CTranslate2)
+    STT_MODEL_NAME: str = "base"
+    STT_COMPUTE_TYPE: str = "int8"  # faster-whisper quantization
+    STT_CPU_THREADS: int = 0  # faster-whisper intra-op threads (0 = auto)
+    STT_IDLE_TIMEOUT_SECONDS: int = 0  # Unload the model after this long without audio (0 = never)
+    STT_WORKER_ADDRESS: Optional[str] = None  # Shared speech worker (socket path or host:port)
+    STT_POOL_WORKERS: int = 1  # >1 runs a pool of core-pinned inference processes
+    STT_POOL_CORES: Optional[str] = None  # Explicit partitions, e.g. "0-3;4-7"
+    STT_BATCH_WINDOW_MS: int = 75  # Cross-session micro-batching window
+    STT_MAX_BATCH_SIZE: int = 8
+
+    # STT admission control and load shedding
+    STT_MAX_QUEUE: int = 64  # Clips queued node-wide
+    STT_MAX_SESSION_QUEUE: int = 8  # Clips queued per meeting
+    STT_LATENCY_BUDGET_MS: int = 6000
+    STT_FALLBACK_MODEL: Optional[str] = None  # e.g. "tiny"; downgrade instead of rejecting (not with a speech worker)
+    STT_FALLBACK_MAX_QUEUE: int = 4  # Downgraded clips waiting for the fallback model
+
+    # Per-speaker language hints (skip Whisper language detection)
+    LANGUAGE_HINT_MIN_CONFIDENT: int = 2  # Agreeing detections before a hint is used
+    LANGUAGE_HINT_CONFIDENCE: float = 0.8
+    LANGUAGE_HINT_REDETECT_LOGPROB: float = -1.0
+    LANGUAGE_HINT_SWITCH_AFTER: int = 2
+
+    # Audio preprocessing before STT
+    AUDIO_SILENCE_THRESHOLD_DBFS: float = -45.0
+    AUDIO_TARGET_DBFS: float = -20.0
+    AUDIO_TRIM_PAD_MS: int = 150
+    AUDIO_MIN_SPEECH_MS: int = 200  # Shorter clips are rejected without a model call
+
+    # Streaming STT (PCM16 frames over the meeting WebSocket)
+    STREAM_SAMPLE_RATE: int = 16000  # Assumed when an audio_chunk doesn't say
+    STREAM_PARTIAL_INTERVAL_MS: int = 1000
+    STREAM_MAX_SEGMENT_MS: int = 15000
+    VAD_FRAME_MS: int = 30
+    VAD_ENERGY_THRESHOLD: float = 0.01  # RMS on a [-1, 1] scale
+    VAD_SILENCE_MS: int = 600
+    VAD_MIN_SPEECH_MS: int = 250
+
+    # Meeting audio retention (opt-in per session) and archive re-transcription
+    AUDIO_ARCHIVE_BITRATE: str = "24k"  # Opus bitrate for retained utterances
+    ARCHIVE_STT_MODEL: str = "medium"
+    ARCHIVE_STT_ENGINE: Optional[str] = None  # Defaults to STT_ENGINE
+    ARCHIVE_CPU_THREADS: int = 1
+    ARCHIVE_DUTY_CYCLE: float = 0.5  # Largest share of wall time spent inferring
+    ARCHIVE_LIVE_IDLE_MINUTES: int = 10  # Pause while a live session had speech this recently
+    ARCHIVE_MAX_LOAD: float = 0.5  # Pause while the 1-minute load per core is above this
+
+    # Text-to-Speech
+    TTS_ENGINE: str = "gtts"  # "gtts" (network), "piper" or "espeak" (local, offline)
+    TTS_FALLBACK_ENGINE: Optional[str] = "gtts"  # For languages the engine has no voice for
+    TTS_PIPER_VOICES: Optional[str] = None  # e.g. "en=/voices/en_US-lessac-medium.onnx;ko=..."
+    TTS_ESPEAK_VOICES: str = "en=en-us;ko=ko;bn=bn"
+
+    # Text-to-Speech audio cache
+    TTS_CACHE_DIR: Optional[str] = None  # Defaults to uploads/tts_cache
+    TTS_CACHE_MAX_MB: int = 512  # Across all worker processes sharing the directory
+    TTS_CACHE_RESCAN_SECONDS: int = 60  # How often a process recounts the shared directory
+    TTS_MAX_CONCURRENCY: int = 8  # Synthesis calls in flight at once
+
+    # Meeting WebSocket fan-out (per-connection send queues)
+    WS_SEND_QUEUE_SIZE: int = 256  # Messages queued per client before it counts as slow
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0  # One send blocking this long disconnects the client
+    WS_MAX_LAG_SECONDS: float = 15.0  # A message waiting this long disconnects the client
+    WS_RESUME_BUFFER_EVENTS: int = 512  # Transcript/translation events kept per meeting for reconnects
+    WS_RESUME_IDLE_SECONDS: int = 600  # How long they are kept once the meeting's last client left
+
+    # Per-meeting utterance pipeline (STT -> translate -> persist -> TTS)
+    PIPELINE_MAX_PENDING: int = 32  # Utterances in flight per meeting before speakers get "busy"
+    PIPELINE_STAGE_WORKERS: int = 2  # Concurrent utterances per unordered stage
+    PIPELINE_SHUTDOWN_SECONDS: int = 30  # How long shutdown waits for utterances in flight
+
+    # Write-behind transcript persistence (meeting WebSocket)
+    TRANSCRIPT_FLUSH_INTERVAL_MS: int = 250  # Longest a transcript row waits to be written
+    TRANSCRIPT_FLUSH_ROWS: int = 64  # Queued rows and updates that trigger a write sooner
+    TRANSCRIPT_ID_BLOCK: int = 100  # Ids reserved per database round trip
+
+    # Active meetings cached in memory (WebSocket and session endpoints)
+    SESSION_REGISTRY_TTL_SECONDS: int = 300  # Reload an entry (and its glossary) after this long
+
+    # Meeting broadcast bus between API processes
+    BUS_BACKEND: str = "local"  # "local" (single process) or "redis" (any Redis-protocol server)
+    BUS_REDIS_URLS: str = "redis://localhost:6379"  # Comma-separated, one per shard
+    BUS_TIMEOUT_SECONDS: float = 2.0  # Connect and reply timeout
+    BUS_PUBLISH_QUEUE: int = 1024  # Messages waiting to be published per shard before new ones are dropped
+    BUS_LISTENERS_HEARTBEAT_SECONDS: int = 30  # How often a process re-announces its listeners
+    BUS_LISTENERS_TTL_SECONDS: int = 90  # Another process's listeners are forgotten this long after its last announcement
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
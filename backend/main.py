@@ -1,8 +1,9 @@
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from database import init_db, get_db
-from api import auth, translation, glossary, projects, admin, analytics, sessions, archive, documents
-from api.websocket import handle_websocket
+from database import init_db
+from api import auth, translation, glossary, projects, admin, analytics, sessions, archive, documents, recordings, tts
+from api.websocket import handle_websocket, manager, retire_all_pipelines
+from services.transcript_writer import get_transcript_writer
 from config import settings
 
 # Initialize FastAPI app
@@ -37,6 +38,20 @@ def on_startup():
     print(f"✅ {settings.APP_NAME} is running")
 
 
+@app.on_event("startup")
+async def start_meeting_bus():
+    """Listen for session news (e.g. a session ended) from other API processes"""
+    await manager.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Finish utterances in flight, write queued transcripts, then close the meeting bus connections"""
+    await retire_all_pipelines()
+    await get_transcript_writer().close()
+    await manager.stop()
+
+
 # Health check endpoint
 @app.get("/")
 def root():
@@ -64,17 +79,15 @@ app.include_router(analytics.router)
 app.include_router(sessions.router)
 app.include_router(archive.router)
 app.include_router(documents.router)
+app.include_router(recordings.router)
+app.include_router(tts.router)
 
 
 # WebSocket endpoint for real-time translation
 @app.websocket("/ws/session/{session_code}")
 async def websocket_endpoint(websocket: WebSocket, session_code: str):
     """WebSocket endpoint for real-time meeting translation"""
-    db = next(get_db())
-    try:
-        await handle_websocket(websocket, session_code, db)
-    finally:
-        db.close()
+    await handle_websocket(websocket, session_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+"""
+Database migration script to add meeting audio retention.
+This script adds the retain_audio flag to sessions and the audio_path /
+stt_model columns to transcripts.
+"""
+from sqlalchemy import inspect, text
+
+from database import engine, init_db
+
+NEW_COLUMNS = {
+    "meeting_sessions": {"retain_audio": "BOOLEAN DEFAULT 0"},
+    "transcripts": {"audio_path": "VARCHAR(255)", "stt_model": "VARCHAR(50)"},
+}
+
+
+def migrate():
+    """Run database migrations"""
+    print("Starting database migration...")
+
+    # Create any missing tables first
+    init_db()
+
+    # create_all() doesn't alter existing tables, so add the columns by hand
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, columns in NEW_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, column_type in columns.items():
+                if name not in existing:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+                    print(f"✓ Added {table}.{name}")
+
+    print("✓ Database migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
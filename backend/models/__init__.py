@@ -6,6 +6,8 @@ from .activity_log import ActivityLog
 from .session import MeetingSession, SessionStatus, ModuleType
 from .transcript import Transcript
 from .document import Document
+from .id_sequence import IdSequence
 
 __all__ = ["User", "Project", "ProjectUser", "Translation", "Glossary", "ActivityLog", 
-           "MeetingSession", "SessionStatus", "ModuleType", "Transcript", "Document"]
+           "MeetingSession", "SessionStatus", "ModuleType", "Transcript", "Document",
+           "IdSequence"]
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+
+class IdSequence(Base):
+    """Next unreserved primary key of a table, for handing out ids in blocks"""
+    
+    __tablename__ = "id_sequences"
+    
+    name = Column(String(50), primary_key=True)  # Table name
+    next_id = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<IdSequence {self.name} at {self.next_id}>"
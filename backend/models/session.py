@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -27,6 +27,7 @@ class MeetingSession(Base):
     status = Column(Enum(SessionStatus), default=SessionStatus.active)
     created_at = Column(DateTime, default=datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
+    retain_audio = Column(Boolean, default=False)  # Keep utterance audio for archive re-transcription
     
     # Relationships
     project = relationship("Project", back_populates="sessions")
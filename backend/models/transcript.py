@@ -25,6 +25,10 @@ class Transcript(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     audio_duration = Column(Integer, nullable=True)  # Duration in milliseconds
     
+    # Retained audio (sessions with retain_audio) and the model that transcribed it
+    audio_path = Column(String(255), nullable=True)  # Relative to uploads/meeting_audio
+    stt_model = Column(String(50), nullable=True)
+    
     # Relationships
     session = relationship("MeetingSession", back_populates="transcripts")
     user = relationship("User", back_populates="transcripts")
@@ -6,6 +6,7 @@ from typing import Optional
 class SessionCreate(BaseModel):
     project_id: Optional[int] = None
     module_type: str = "physical_meeting"
+    retain_audio: bool = False
 
 
 class SessionResponse(BaseModel):
@@ -17,6 +18,7 @@ class SessionResponse(BaseModel):
     status: str
     created_at: datetime
     ended_at: Optional[datetime]
+    retain_audio: Optional[bool] = False
     
     class Config:
         from_attributes = True
@@ -44,6 +46,7 @@ class TranscriptResponse(BaseModel):
     translated_text_en: Optional[str]
     timestamp: datetime
     audio_duration: Optional[int]
+    stt_model: Optional[str] = None
     
     class Config:
         from_attributes = True
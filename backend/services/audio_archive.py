@@ -0,0 +1,72 @@
+"""
+Compressed storage of meeting utterance audio.
+
+Sessions created with retain_audio keep every transcribed utterance as a
+small Opus file so the archive can later be re-transcribed with a larger
+model (see retranscription_service.py). Encoding goes through ffmpeg,
+which the STT engines already need for decoding.
+"""
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import settings
+
+
+AUDIO_ARCHIVE_DIR = Path(__file__).parent.parent / "uploads" / "meeting_audio"
+
+
+def encode_opus(audio: np.ndarray, sample_rate: int = 16000, bitrate: str = None) -> bytes:
+    """
+    Encode mono float32 samples as Opus in an Ogg container
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or fails
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+        "-c:a", "libopus", "-b:a", bitrate or settings.AUDIO_ARCHIVE_BITRATE,
+        "-application", "voip", "-f", "ogg", "pipe:1",
+    ]
+    try:
+        result = subprocess.run(
+            command,
+            input=np.ascontiguousarray(audio, dtype=np.float32).tobytes(),
+            capture_output=True,
+            check=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Opus encoding failed: {e.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def save_utterance(session_code: str, audio: np.ndarray, sample_rate: int = 16000) -> Optional[str]:
+    """
+    Store one utterance for a session
+
+    Returns:
+        Path relative to AUDIO_ARCHIVE_DIR, or None if encoding failed
+        (retention is best-effort and never blocks a live transcript)
+    """
+    try:
+        data = encode_opus(audio, sample_rate)
+    except RuntimeError as e:
+        print(f"Could not retain audio for session {session_code}: {e}")
+        return None
+
+    relative_path = f"{session_code}/{uuid.uuid4().hex}.ogg"
+    path = AUDIO_ARCHIVE_DIR / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return relative_path
+
+
+def resolve(audio_path: str) -> Path:
+    """Absolute path of a stored utterance"""
+    return AUDIO_ARCHIVE_DIR / audio_path
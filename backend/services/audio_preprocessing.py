@@ -0,0 +1,264 @@
+"""
+Vectorized audio preprocessing ahead of speech-to-text.
+
+Browsers record at arbitrary sample rates with leading/trailing silence,
+and Whisper spends the same compute on silence as on speech. Everything
+here works on whole NumPy arrays: downmix to mono, resample to 16 kHz,
+trim silence by frame energy, normalize loudness, reject clips that
+are silent throughout before they ever reach the model, and split long
+recordings at pauses into chunks Whisper can take in one window.
+
+Streamed audio arrives in ~20 ms frames. Resampling each on its own
+(resample()) would zero-pad the filter and restart interpolation at every
+frame edge, a click per frame; StreamResampler carries both across calls.
+"""
+import numpy as np
+from typing import List, Optional, Tuple
+
+from config import settings
+
+
+TARGET_SAMPLE_RATE = 16000
+
+
+def to_mono(samples: np.ndarray, channels: int = 1) -> np.ndarray:
+    """
+    Downmix interleaved or (frames, channels) audio to mono
+
+    Args:
+        samples: Float32 samples, interleaved if 1-D
+        channels: Channel count of interleaved input
+    """
+    if samples.ndim == 2:
+        return samples.mean(axis=1, dtype=np.float32)
+    if channels <= 1:
+        return samples.astype(np.float32, copy=False)
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+def _lowpass_kernel(cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc FIR low-pass taps; cutoff is a fraction of the sample rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return kernel.astype(np.float32)
+
+
+def _lowpass(samples: np.ndarray, cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc FIR low-pass; cutoff is a fraction of the sample rate"""
+    return np.convolve(samples, _lowpass_kernel(cutoff, taps), mode="same")
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample mono audio with linear interpolation
+
+    Downsampling low-passes first so content above the new Nyquist
+    frequency doesn't alias into the speech band.
+    """
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    if dst_rate < src_rate:
+        samples = _lowpass(samples, 0.5 * dst_rate / src_rate)
+    duration = len(samples) / src_rate
+    n_out = int(round(duration * dst_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+class StreamResampler:
+    """
+    resample() for audio arriving in pieces, continuous across them
+
+    The low-pass keeps the last taps - 1 input samples for the next piece
+    (so its output lags the input by half the filter, about 0.6 ms at
+    48 kHz), and interpolation keeps its fractional input position and the
+    last filtered sample, so pieces join without a seam.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE, taps: int = 63):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate  # Input samples per output sample
+        self.kernel = _lowpass_kernel(0.5 * dst_rate / src_rate, taps) if dst_rate < src_rate else None
+        self._history = np.zeros(taps - 1 if self.kernel is not None else 0, dtype=np.float32)
+        self._offset = 0  # Stream index of the first sample of the next piece
+        self._position = 0.0  # Stream index of the next output sample
+        self._last = np.float32(0.0)  # Sample at stream index _offset - 1
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next piece of the stream"""
+        samples = samples.astype(np.float32, copy=False)
+        if len(samples) == 0:
+            return samples
+        if self.kernel is not None:
+            padded = np.concatenate([self._history, samples])
+            self._history = padded[len(padded) - len(self._history):]
+            samples = np.convolve(padded, self.kernel, mode="valid")
+
+        end = self._offset + len(samples) - 1  # Stream index of the last sample
+        count = int(np.floor((end - self._position) / self.step)) + 1 if end >= self._position else 0
+        positions = self._position + np.arange(count, dtype=np.float64) * self.step
+        source = np.concatenate([[self._last], samples])  # Starts at stream index _offset - 1
+        out = np.interp(positions - (self._offset - 1), np.arange(len(source)), source).astype(np.float32)
+
+        self._position += count * self.step
+        self._offset += len(samples)
+        self._last = samples[-1]
+        return out
+
+
+def frame_rms(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """RMS of each complete frame (the tail shorter than a frame is ignored)"""
+    n_frames = len(samples) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def dbfs(rms):
+    """Convert RMS on a [-1, 1] scale to dBFS"""
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    threshold_dbfs: float = None,
+    frame_ms: int = 20,
+    pad_ms: int = None
+) -> np.ndarray:
+    """
+    Cut leading and trailing silence
+
+    Frames are speech if they are above the absolute threshold and within
+    35 dB of the loudest frame, so quiet rooms and loud rooms both trim.
+
+    Returns:
+        Trimmed samples (empty if no frame qualifies as speech)
+    """
+    threshold_dbfs = settings.AUDIO_SILENCE_THRESHOLD_DBFS if threshold_dbfs is None else threshold_dbfs
+    pad_ms = settings.AUDIO_TRIM_PAD_MS if pad_ms is None else pad_ms
+    frame_size = max(1, sample_rate * frame_ms // 1000)
+
+    levels = dbfs(frame_rms(samples, frame_size))
+    if len(levels) == 0:
+        return samples[:0]
+    threshold = max(threshold_dbfs, levels.max() - 35)
+    voiced = np.flatnonzero(levels >= threshold)
+    if len(voiced) == 0:
+        return samples[:0]
+
+    pad = sample_rate * pad_ms // 1000
+    start = max(0, voiced[0] * frame_size - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame_size + pad)
+    return samples[start:end]
+
+
+def normalize_loudness(
+    samples: np.ndarray,
+    target_dbfs: float = None,
+    max_gain_db: float = 30.0,
+    peak_limit: float = 0.99
+) -> np.ndarray:
+    """
+    Scale audio to a target RMS level without clipping
+
+    Gain is capped so background hiss in a near-silent clip isn't blown up.
+    """
+    if len(samples) == 0:
+        return samples
+    target_dbfs = settings.AUDIO_TARGET_DBFS if target_dbfs is None else target_dbfs
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float32))))
+    gain_db = min(target_dbfs - float(dbfs(rms)), max_gain_db)
+    gain = 10 ** (gain_db / 20)
+    peak = float(np.max(np.abs(samples))) * gain
+    if peak > peak_limit:
+        gain *= peak_limit / peak
+    return (samples * gain).astype(np.float32)
+
+
+def preprocess_audio(
+    samples: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    channels: int = 1
+) -> Optional[np.ndarray]:
+    """
+    Full preprocessing chain: downmix, resample, trim, normalize
+
+    Args:
+        samples: Float32 audio in [-1, 1]
+        sample_rate: Sample rate of the input
+        channels: Channel count if the input is interleaved
+
+    Returns:
+        16 kHz mono float32 speech, or None if the clip is silent throughout
+        (or shorter than AUDIO_MIN_SPEECH_MS once trimmed)
+    """
+    samples = resample(to_mono(samples, channels), sample_rate, TARGET_SAMPLE_RATE)
+    samples = trim_silence(samples, TARGET_SAMPLE_RATE)
+    if len(samples) < TARGET_SAMPLE_RATE * settings.AUDIO_MIN_SPEECH_MS // 1000:
+        return None
+    return normalize_loudness(samples)
+
+
+def split_on_silence(
+    samples: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    max_chunk_s: float = 28.0,
+    min_silence_ms: int = 400,
+    threshold_dbfs: float = None,
+    frame_ms: int = 20
+) -> List[Tuple[int, int]]:
+    """
+    Split a long recording into chunks at pauses, each at most max_chunk_s
+
+    Chunks are cut in the middle of silent runs of at least min_silence_ms,
+    greedily packing speech up to the length limit so Whisper sees whole
+    phrases. A stretch of speech with no usable pause is cut at its
+    quietest frame instead. Chunks that are silent throughout are dropped.
+
+    Returns:
+        (start, end) sample offsets of each chunk, in order
+    """
+    threshold_dbfs = settings.AUDIO_SILENCE_THRESHOLD_DBFS if threshold_dbfs is None else threshold_dbfs
+    frame_size = max(1, sample_rate * frame_ms // 1000)
+    levels = dbfs(frame_rms(samples, frame_size))
+    if len(levels) == 0:
+        return []
+
+    silent = levels < max(threshold_dbfs, levels.max() - 35)
+    max_frames = max(1, int(max_chunk_s * 1000) // frame_ms)
+    min_silence = max(1, min_silence_ms // frame_ms)
+
+    # Candidate cut points: the middle frame of every long enough silent run
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+    cuts = [(start + end) // 2 for start, end in runs if end - start >= min_silence]
+
+    chunks = []
+    start = 0
+    n_frames = len(levels)
+    while start < n_frames:
+        limit = start + max_frames
+        if limit >= n_frames:
+            end = n_frames
+        else:
+            usable = [cut for cut in cuts if start < cut <= limit]
+            # No pause in range: cut at the quietest frame of the last third
+            end = usable[-1] if usable else start + max_frames * 2 // 3 + int(
+                np.argmin(levels[start + max_frames * 2 // 3:limit])
+            )
+            end = max(end, start + 1)
+        if not silent[start:end].all():
+            chunks.append((int(start * frame_size), int(min(len(samples), end * frame_size))))
+        start = end
+
+    if chunks:
+        # Hand the sub-frame tail to the last chunk
+        last_start, last_end = chunks[-1]
+        if n_frames * frame_size - last_end < frame_size:
+            chunks[-1] = (last_start, len(samples))
+    return chunks
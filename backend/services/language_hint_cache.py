@@ -0,0 +1,152 @@
+"""
+Per-speaker language hints for meeting transcription.
+
+Whisper runs a language-detection pass whenever it is called without a
+language, which costs time and can flip between Korean and Bengali from
+one utterance to the next. This cache learns each speaker's language from
+their first confident utterances within a session and hands it back as
+the hint, re-detecting only when a hinted decode looks wrong.
+"""
+from collections import Counter
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from config import settings
+from services.stt_scheduler import STTOverloaded
+from services.stt_service import TranscriptionResult
+
+
+SpeakerKey = Tuple[str, Union[int, str]]  # (session_code, user_id or speaker_name)
+
+
+class SpeakerLanguage:
+    """What we know about one speaker's language"""
+
+    def __init__(self):
+        self.language: Optional[str] = None  # Locked hint, once learned
+        self.votes: Counter = Counter()  # Confident detections before locking
+        self.misses = 0  # Consecutive confident re-detections disagreeing with the hint
+
+
+class SpeakerLanguageCache:
+    """Learn and serve per-speaker language hints within a session"""
+
+    def __init__(
+        self,
+        min_confident: int = None,
+        confidence_threshold: float = None,
+        redetect_logprob: float = None,
+        switch_after: int = None
+    ):
+        """
+        Initialize the cache (defaults come from settings)
+
+        Args:
+            min_confident: Agreeing confident detections needed to lock a language
+            confidence_threshold: Language probability that counts as confident
+            redetect_logprob: Hinted decodes below this avg log-prob are re-detected
+            switch_after: Consecutive disagreeing re-detections before switching hint
+        """
+        self.min_confident = min_confident or settings.LANGUAGE_HINT_MIN_CONFIDENT
+        self.confidence_threshold = confidence_threshold or settings.LANGUAGE_HINT_CONFIDENCE
+        self.redetect_logprob = redetect_logprob if redetect_logprob is not None else settings.LANGUAGE_HINT_REDETECT_LOGPROB
+        self.switch_after = switch_after or settings.LANGUAGE_HINT_SWITCH_AFTER
+        self._speakers: Dict[SpeakerKey, SpeakerLanguage] = {}
+
+    @staticmethod
+    def speaker_key(session_code: str, user_id: Optional[int], speaker_name: Optional[str]) -> SpeakerKey:
+        """Key a speaker by user id when known, otherwise by display name"""
+        return (session_code, user_id if user_id is not None else (speaker_name or "Unknown"))
+
+    def hint(self, key: SpeakerKey) -> Optional[str]:
+        """Return the learned language for a speaker, if any"""
+        state = self._speakers.get(key)
+        return state.language if state else None
+
+    def needs_redetect(self, result: TranscriptionResult) -> bool:
+        """Whether a hinted decode is weak enough to warrant language re-detection"""
+        if not result.text:
+            return True
+        return result.avg_logprob is not None and result.avg_logprob < self.redetect_logprob
+
+    def observe(self, key: SpeakerKey, result: TranscriptionResult):
+        """
+        Record a detection result (one where the engine chose the language)
+
+        Only detections with a language probability above the threshold
+        count; a locked hint is replaced after switch_after consecutive
+        confident detections of a different language.
+        """
+        probability = result.language_probability
+        if not result.text or probability is None or probability < self.confidence_threshold:
+            return
+
+        state = self._speakers.setdefault(key, SpeakerLanguage())
+        if state.language is None:
+            state.votes[result.language] += 1
+            if state.votes[result.language] >= self.min_confident:
+                state.language = result.language
+                state.votes.clear()
+                print(f"Language hint for {key}: {state.language}")  # Debug
+        elif result.language == state.language:
+            state.misses = 0
+        else:
+            state.misses += 1
+            if state.misses >= self.switch_after:
+                print(f"Language hint for {key}: {state.language} -> {result.language}")  # Debug
+                state.language = result.language
+                state.misses = 0
+
+    def clear_session(self, session_code: str):
+        """Forget every speaker of a session"""
+        for key in [key for key in self._speakers if key[0] == session_code]:
+            del self._speakers[key]
+
+
+async def transcribe_with_hint(
+    stt_scheduler,
+    audio: np.ndarray,
+    key: SpeakerKey,
+    learn: bool = True
+) -> Tuple[str, str]:
+    """
+    Transcribe a speaker's utterance using (and refining) their language hint
+
+    Args:
+        stt_scheduler: Scheduler exposing transcribe_detailed()
+        audio: Float32 16 kHz mono samples
+        key: Speaker key from SpeakerLanguageCache.speaker_key()
+        learn: False for partial transcripts, which shouldn't vote
+
+    Returns:
+        Tuple of (transcribed_text, detected_language)
+
+    Raises:
+        STTOverloaded: If the scheduler shed the clip
+    """
+    session_code = key[0]
+    hint = language_hints.hint(key)
+    result = await stt_scheduler.transcribe_detailed(audio, hint, session_code, best_effort=not learn)
+
+    if hint is None:
+        if learn:
+            language_hints.observe(key, result)
+    elif learn and language_hints.needs_redetect(result):
+        # Low confidence under the hint: let the engine pick the language again
+        try:
+            redetected = await stt_scheduler.transcribe_detailed(audio, None, session_code, best_effort=True)
+        except STTOverloaded:
+            return result.text, result.language
+        language_hints.observe(key, redetected)
+        if redetected.text and (
+            not result.text
+            or (redetected.avg_logprob or float("-inf")) > (result.avg_logprob or float("-inf"))
+        ):
+            result = redetected
+
+    return result.text, result.language
+
+
+# Global instance
+language_hints = SpeakerLanguageCache()
@@ -0,0 +1,445 @@
+"""
+Pub/sub bus carrying meeting broadcasts between API processes.
+
+ConnectionManager only knows the WebSockets of its own process, so with
+several uvicorn workers or nodes, participants of one meeting who landed
+on different processes never saw each other. Every broadcast is now also
+published on the meeting's channel; each process subscribes to the
+channels of the meetings it has clients in and fans what it receives out
+to them.
+
+Backends (BUS_BACKEND):
+    local  Channels within this process (one worker; the default)
+    redis  Any Redis-protocol server. BUS_REDIS_URLS lists one URL per
+           shard; a meeting's channel lives on shard crc32(code) % shards,
+           so meetings spread across servers and one meeting's messages
+           stay ordered on one connection.
+
+Publishing never waits on the server: messages go into a bounded queue
+per shard (BUS_PUBLISH_QUEUE) that a background task drains, and are
+dropped, and counted, when it is full. Local clients have already been
+served by then, so a slow or unreachable server costs other processes'
+clients some messages rather than stalling every meeting here. Every
+connect and command gives up after BUS_TIMEOUT_SECONDS.
+
+For development, services/pubsub_server.py is a stand-in server that
+speaks enough of the protocol (PUBLISH/SUBSCRIBE/UNSUBSCRIBE/PING).
+"""
+import asyncio
+import json
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from config import settings
+
+
+CHANNEL_PREFIX = "meeting:"
+
+# Pseudo session code of the channel every process subscribes to, for news about
+# meetings they may have no clients in (a session ended)
+CONTROL = "_control"
+
+# (session_code, message) -> None
+Handler = Callable[[str, bytes], Awaitable[None]]
+
+
+def shard_for(session_code: str, shards: int) -> int:
+    """Shard index of a meeting's channel"""
+    return zlib.crc32(session_code.encode("utf-8")) % shards
+
+
+def pack(header: dict, payload: bytes = b"") -> bytes:
+    """Bus message: a JSON header line, then the payload as is (JSON text or a binary frame)"""
+    return json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + payload
+
+
+def unpack(data: bytes) -> Tuple[dict, bytes]:
+    """Split a bus message into header and payload"""
+    header, _, payload = data.partition(b"\n")
+    return json.loads(header), payload
+
+
+class MessageBus(ABC):
+    """Per-meeting channels: publish to one, receive from those subscribed to"""
+
+    def __init__(self):
+        self.handler: Optional[Handler] = None
+        self.published = 0
+        self.received = 0
+
+    def set_handler(self, handler: Handler):
+        """Coroutine called with (session_code, message) for every message received"""
+        self.handler = handler
+
+    @abstractmethod
+    async def publish(self, session_code: str, data: bytes):
+        ...
+
+    @abstractmethod
+    async def subscribe(self, session_code: str):
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, session_code: str):
+        ...
+
+    async def close(self):
+        pass
+
+    async def _receive(self, session_code: str, data: bytes):
+        self.received += 1
+        if self.handler is not None:
+            try:
+                await self.handler(session_code, data)
+            except Exception as e:
+                print(f"Error handling bus message for session {session_code}: {e}")
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "published": self.published, "received": self.received}
+
+
+class InProcessBus(MessageBus):
+    """Channels shared by the bus instances of this process"""
+
+    # session_code -> subscribed buses
+    _channels: Dict[str, Set["InProcessBus"]] = {}
+
+    async def publish(self, session_code: str, data: bytes):
+        self.published += 1
+        for bus in list(self._channels.get(session_code, ())):
+            await bus._receive(session_code, data)
+
+    async def subscribe(self, session_code: str):
+        self._channels.setdefault(session_code, set()).add(self)
+
+    async def unsubscribe(self, session_code: str):
+        subscribers = self._channels.get(session_code)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self._channels[session_code]
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+def encode_command(*args) -> bytes:
+    """A command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """
+    Read one RESP2 reply
+
+    Error replies are returned as RespError instances rather than raised,
+    so they can be handed to whichever command they answer.
+    """
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        return RespError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind in (b"*", b">"):
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply {line[:32]!r}")
+
+
+class RespConnection:
+    """
+    One connection to a Redis-protocol server
+
+    Replies are matched to commands in the order they were sent, so
+    commands from many coroutines pipeline over the one connection. In
+    subscriber mode, pushed messages go to on_message instead.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_message: Optional[Callable[[bytes, bytes], Awaitable[None]]] = None,
+        on_close: Optional[Callable[[], None]] = None,
+        timeout: float = None
+    ):
+        self.url = url
+        self.on_message = on_message
+        self.on_close = on_close
+        self.timeout = timeout or settings.BUS_TIMEOUT_SECONDS
+        self.closed = True
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._waiting: Deque[asyncio.Future] = deque()
+        self._read_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        """
+        Raises:
+            ConnectionError: If the server can't be reached within the timeout
+        """
+        parsed = urlparse(self.url)
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379), self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Connecting to {self.url} timed out")
+        self.closed = False
+        self._read_task = asyncio.create_task(self._read_loop())
+        if parsed.password:
+            if parsed.username:
+                await self.command("AUTH", unquote(parsed.username), unquote(parsed.password))
+            else:
+                await self.command("AUTH", unquote(parsed.password))
+
+    def send(self, *args):
+        """Write a command without waiting for its reply (subscriber mode)"""
+        if self.closed:
+            raise ConnectionError("Not connected")
+        self._writer.write(encode_command(*args))
+
+    async def command(self, *args):
+        """
+        Send a command and return its reply
+
+        Raises:
+            RespError: On an error reply
+            ConnectionError: If the connection is lost first, or no reply comes within the timeout
+        """
+        if self.closed:
+            raise ConnectionError("Not connected")
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(future)
+        self._writer.write(encode_command(*args))
+        try:
+            await asyncio.wait_for(self._writer.drain(), self.timeout)
+            reply = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._shutdown()  # Later replies would no longer line up with their commands
+            raise ConnectionError(f"No reply from {self.url} within {self.timeout}s")
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _read_loop(self):
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                if self.on_message is not None and isinstance(reply, list) and reply:
+                    if reply[0] == b"message":
+                        await self.on_message(reply[1], reply[2])
+                        continue
+                    if reply[0] in (b"subscribe", b"unsubscribe"):
+                        continue
+                if self._waiting:
+                    future = self._waiting.popleft()
+                    if not future.done():
+                        future.set_result(reply)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            print(f"Bus connection to {self.url} lost: {e}")
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        if self.closed and self._writer is None:
+            return
+        self.closed = True
+        while self._waiting:
+            future = self._waiting.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("Connection lost"))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.on_close is not None:
+            self.on_close()
+
+    async def close(self):
+        self.on_close = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+        self._shutdown()
+
+
+class RedisShard:
+    """A publisher and a subscriber connection to one server"""
+
+    def __init__(self, url: str, on_message: Callable[[bytes, bytes], Awaitable[None]]):
+        self.url = url
+        self.on_message = on_message
+        self.channels: Set[str] = set()
+        self.publisher = RespConnection(url)
+        self.subscriber = RespConnection(url, on_message=on_message, on_close=self._subscriber_lost)
+        self._connecting = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._outgoing: "asyncio.Queue[Tuple[str, bytes]]" = asyncio.Queue(maxsize=max(1, settings.BUS_PUBLISH_QUEUE))
+        self._publish_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0  # Monotonic time before which a down server isn't tried again
+        self.dropped = 0  # Messages not published: queue full, or the server failed them
+
+    async def publish(self, channel: str, data: bytes):
+        """Queue a message for the publisher task (dropped if the queue is full)"""
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.create_task(self._publish_queued())
+        try:
+            self._outgoing.put_nowait((channel, data))
+        except asyncio.QueueFull:
+            self._drop(f"publish queue full ({self._outgoing.maxsize})")
+
+    def _drop(self, reason: str):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 100 == 0:
+            print(f"Bus messages to {self.url} dropped ({self.dropped} so far): {reason}")
+
+    async def _publish_queued(self):
+        """Send queued messages in order, one at a time"""
+        while True:
+            channel, data = await self._outgoing.get()
+            if self.publisher.closed and time.monotonic() < self._retry_at:
+                self._drop("server unavailable")
+                continue
+            try:
+                if self.publisher.closed:
+                    await self.publisher.connect()
+                await self.publisher.command("PUBLISH", channel, data)
+            except (OSError, RespError) as e:
+                self._retry_at = time.monotonic() + 1.0
+                self._drop(str(e) or type(e).__name__)
+
+    async def subscribe(self, channel: str):
+        """
+        Subscribe to a channel; if the server can't be reached, keep retrying in the background
+
+        Raises:
+            OSError: If the server can't be reached (the subscription still takes effect once it can)
+        """
+        self.channels.add(channel)
+        if not self.subscriber.closed:
+            self.subscriber.send("SUBSCRIBE", channel)
+            return
+        try:
+            await self._connect_subscriber()  # Subscribes to every channel
+        except OSError:
+            self._subscriber_lost()  # on_close never fires for a connection that never opened
+            raise
+
+    async def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+        if not self.subscriber.closed:
+            self.subscriber.send("UNSUBSCRIBE", channel)
+
+    async def _connect_subscriber(self):
+        async with self._connecting:
+            if self.subscriber.closed:
+                await self.subscriber.connect()
+                if self.channels:
+                    self.subscriber.send("SUBSCRIBE", *sorted(self.channels))
+
+    def _subscriber_lost(self):
+        if not self._closing and self.channels and self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        """Resubscribe with backoff; messages published meanwhile are lost"""
+        delay = 0.5
+        try:
+            while not self._closing and self.channels and self.subscriber.closed:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect_subscriber()
+                    print(f"Bus connection to {self.url} restored")
+                except OSError as e:
+                    print(f"Bus reconnect to {self.url} failed: {e}")
+                    delay = min(delay * 2, 10.0)
+        finally:
+            self._reconnect_task = None
+
+    async def close(self):
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._publish_task is not None:
+            self._publish_task.cancel()
+        await self.publisher.close()
+        await self.subscriber.close()
+
+
+class RedisBus(MessageBus):
+    """Channels on Redis-protocol servers, sharded by session code"""
+
+    def __init__(self, urls: List[str]):
+        super().__init__()
+        if not urls:
+            raise ValueError("RedisBus needs at least one server URL")
+        self.shards = [RedisShard(url, self._on_message) for url in urls]
+
+    def shard(self, session_code: str) -> RedisShard:
+        return self.shards[shard_for(session_code, len(self.shards))]
+
+    async def publish(self, session_code: str, data: bytes):
+        self.published += 1
+        await self.shard(session_code).publish(CHANNEL_PREFIX + session_code, data)
+
+    async def subscribe(self, session_code: str):
+        await self.shard(session_code).subscribe(CHANNEL_PREFIX + session_code)
+
+    async def unsubscribe(self, session_code: str):
+        await self.shard(session_code).unsubscribe(CHANNEL_PREFIX + session_code)
+
+    async def _on_message(self, channel: bytes, data: bytes):
+        channel = channel.decode("utf-8")
+        if channel.startswith(CHANNEL_PREFIX):
+            await self._receive(channel[len(CHANNEL_PREFIX):], data)
+
+    async def close(self):
+        for shard in self.shards:
+            await shard.close()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "shards": [
+                {
+                    "server": f"{urlparse(shard.url).hostname}:{urlparse(shard.url).port or 6379}",  # No credentials
+                    "channels": len(shard.channels),
+                    "connected": not shard.subscriber.closed,
+                    "publish_queue": shard._outgoing.qsize(),
+                    "dropped": shard.dropped
+                }
+                for shard in self.shards
+            ]
+        }
+
+
+def create_bus() -> MessageBus:
+    """The bus selected by BUS_BACKEND"""
+    if settings.BUS_BACKEND == "redis":
+        return RedisBus([url.strip() for url in settings.BUS_REDIS_URLS.split(",") if url.strip()])
+    if settings.BUS_BACKEND != "local":
+        raise ValueError(f"Unknown BUS_BACKEND: {settings.BUS_BACKEND}")
+    return InProcessBus()
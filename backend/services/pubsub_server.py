@@ -0,0 +1,103 @@
+"""
+Stand-in Redis-protocol pub/sub server for development and tests.
+
+Speaks just enough RESP for the meeting bus: PUBLISH, SUBSCRIBE,
+UNSUBSCRIBE, PING, AUTH (accepted, not checked) and QUIT. Lets several
+local API workers share meetings without installing Redis:
+
+    python -m services.pubsub_server --port 6379 &
+    BUS_BACKEND=redis uvicorn main:app --workers 4
+
+Run one per port to try sharding, e.g.
+BUS_REDIS_URLS=redis://localhost:6379,redis://localhost:6380
+"""
+import argparse
+import asyncio
+from typing import Dict, Set
+
+from services.pubsub import read_reply
+
+
+def bulk(value: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def push(*items) -> bytes:
+    """A RESP array of bulk strings and integers"""
+    parts = [b"*%d\r\n" % len(items)]
+    for item in items:
+        parts.append(b":%d\r\n" % item if isinstance(item, int) else bulk(item))
+    return b"".join(parts)
+
+
+class PubSubServer:
+    """Channels -> subscribed client writers, all in one event loop"""
+
+    def __init__(self):
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                try:
+                    command = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR expected a command array\r\n")
+                    continue
+
+                name, args = command[0].upper(), command[1:]
+                if name == b"PUBLISH" and len(args) == 2:
+                    receivers = self.channels.get(args[0], set())
+                    message = push(b"message", args[0], args[1])
+                    for receiver in receivers:
+                        receiver.write(message)
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == b"SUBSCRIBE" and args:
+                    for channel in args:
+                        self.channels.setdefault(channel, set()).add(writer)
+                        subscribed.add(channel)
+                        writer.write(push(b"subscribe", channel, len(subscribed)))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in args or list(subscribed):
+                        self._leave(channel, writer)
+                        subscribed.discard(channel)
+                        writer.write(push(b"unsubscribe", channel, len(subscribed)))
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name == b"AUTH":
+                    writer.write(b"+OK\r\n")
+                elif name == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name)
+                await writer.drain()
+        finally:
+            for channel in subscribed:
+                self._leave(channel, writer)
+            writer.close()
+
+    def _leave(self, channel: bytes, writer: asyncio.StreamWriter):
+        receivers = self.channels.get(channel)
+        if receivers is not None:
+            receivers.discard(writer)
+            if not receivers:
+                del self.channels[channel]
+
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(PubSubServer().handle, host, port)
+    print(f"Pub/sub stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minimal Redis-protocol pub/sub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
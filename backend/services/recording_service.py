@@ -0,0 +1,230 @@
+"""
+Batch transcription of uploaded meeting recordings.
+
+A recording of an hour-long meeting is far too long for one Whisper call,
+and transcribing it window by window on one core leaves the rest of the
+STT pool idle. The recording is decoded once, split at pauses into
+chunks of at most 30 seconds, and the chunks are transcribed in parallel
+batches across the STT workers, at background priority so live meetings
+go first. Results are stitched back in order with their offsets,
+translated in bulk and stored as Transcript rows. A segment that can't be
+translated keeps None for that language, and the job reports how many.
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from database import SessionLocal
+from models.transcript import Transcript
+from services.audio_preprocessing import TARGET_SAMPLE_RATE, normalize_loudness, split_on_silence
+from services.stt_scheduler import get_stt_scheduler
+from services.stt_service import STT_ENGINES
+from services.transcript_writer import get_transcript_writer
+from services.translation_service import translation_service
+
+
+# Whisper language codes -> names accepted by the translator
+LANGUAGE_NAMES = {"ko": "korean", "bn": "bengali", "en": "english"}
+
+# Recording jobs are kept this long after finishing so clients can poll them
+JOB_RETENTION = timedelta(hours=6)
+
+
+class RecordingJob:
+    """Progress and outcome of one recording upload"""
+
+    def __init__(self, session_id: int, filename: str, speaker_name: str, language: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.filename = filename
+        self.speaker_name = speaker_name
+        self.language = language
+        self.status = "queued"  # queued -> decoding -> transcribing -> translating -> completed | failed
+        self.error: Optional[str] = None
+        self.audio_seconds = 0.0
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.translations_failed = 0  # Segment translations stored as None
+        self.transcript_ids: List[int] = []
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.processing_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "filename": self.filename,
+            "status": self.status,
+            "error": self.error,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "chunks_total": self.chunks_total,
+            "chunks_done": self.chunks_done,
+            "translations_failed": self.translations_failed,
+            "transcript_ids": self.transcript_ids,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "processing_seconds": round(self.processing_seconds, 1),
+            # Audio seconds transcribed per wall second
+            "speed": round(self.audio_seconds / self.processing_seconds, 2) if self.processing_seconds else None,
+        }
+
+
+class RecordingTranscriptionService:
+    """Run recording jobs: decode, chunk, transcribe in parallel, translate, store"""
+
+    def __init__(self, max_chunk_seconds: float = 28.0):
+        """
+        Args:
+            max_chunk_seconds: Longest chunk handed to Whisper (its window is 30 s)
+        """
+        self.max_chunk_seconds = max_chunk_seconds
+        self.jobs: Dict[str, RecordingJob] = {}
+
+    def create_job(self, session_id: int, filename: str, speaker_name: str, language: Optional[str]) -> RecordingJob:
+        """Register a new job (finished jobs past their retention are forgotten)"""
+        cutoff = datetime.utcnow() - JOB_RETENTION
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+        job = RecordingJob(session_id, filename, speaker_name, language)
+        self.jobs[job.id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[RecordingJob]:
+        return self.jobs.get(job_id)
+
+    async def _transcribe_chunks(self, job: RecordingJob, audio: np.ndarray, chunks) -> List:
+        """
+        Transcribe chunks in batches through the scheduler's background lane
+
+        Returns:
+            TranscriptionResult per chunk, in chunk order
+        """
+        scheduler = get_stt_scheduler()
+        # With one worker slot, live clips wait behind a whole batch; keep it to one chunk
+        batch_size = max(1, settings.STT_MAX_BATCH_SIZE) if scheduler.concurrency > 1 else 1
+        batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+
+        async def run(batch):
+            audios = await asyncio.to_thread(
+                lambda: [normalize_loudness(audio[start:end]) for start, end in batch]
+            )
+            results = await scheduler.transcribe_background(audios, job.language)
+            job.chunks_done += len(batch)
+            return results
+
+        batch_results = await asyncio.gather(*[run(batch) for batch in batches])
+        return [result for results in batch_results for result in results]
+
+    async def _translate(self, segments: List[Dict[str, object]]) -> int:
+        """
+        Fill in ko/bn/en for every segment, one concurrent batch per language pair
+
+        Returns:
+            How many translations failed (left as None)
+        """
+        failures = [0]
+        by_language: Dict[str, List[Dict[str, object]]] = {}
+        for segment in segments:
+            by_language.setdefault(segment["language"], []).append(segment)
+
+        async def translate_group(source: str, group: List[Dict[str, object]], target: str):
+            texts = [segment["text"] for segment in group]
+            if source == target:
+                translated = texts
+            else:
+                translated = await translation_service.translate_batch(
+                    texts, LANGUAGE_NAMES.get(source, "auto"), LANGUAGE_NAMES[target]
+                )
+            for segment, text in zip(group, translated):
+                segment[f"translated_text_{target}"] = text
+                failures[0] += text is None
+
+        await asyncio.gather(*[
+            translate_group(source, group, target)
+            for source, group in by_language.items()
+            for target in LANGUAGE_NAMES
+        ])
+        return failures[0]
+
+    async def run_job(self, job: RecordingJob, audio_path: Path, recorded_at: datetime, user_id: Optional[int]):
+        """Process an uploaded recording end to end (runs as a background task), then delete the upload"""
+        started = time.perf_counter()
+        try:
+            job.status = "decoding"
+            audio = await asyncio.to_thread(STT_ENGINES[settings.STT_ENGINE].load_audio, str(audio_path))
+            job.audio_seconds = len(audio) / TARGET_SAMPLE_RATE
+
+            chunks = await asyncio.to_thread(
+                split_on_silence, audio, TARGET_SAMPLE_RATE, self.max_chunk_seconds
+            )
+            job.chunks_total = len(chunks)
+            job.status = "transcribing"
+            results = await self._transcribe_chunks(job, audio, chunks)
+
+            segments = [
+                {
+                    "offset_ms": start * 1000 // TARGET_SAMPLE_RATE,
+                    "duration_ms": (end - start) * 1000 // TARGET_SAMPLE_RATE,
+                    "text": result.text,
+                    "language": result.language or job.language or "en",
+                }
+                for (start, end), result in zip(chunks, results)
+                if result.text
+            ]
+
+            job.status = "translating"
+            job.translations_failed = await self._translate(segments)
+
+            # Ids from the same sequence as live transcripts, which are written behind
+            ids = await asyncio.to_thread(get_transcript_writer().ids.reserve, len(segments)) if segments else []
+            db = SessionLocal()
+            try:
+                transcripts = [
+                    Transcript(
+                        id=transcript_id,
+                        session_id=job.session_id,
+                        user_id=user_id,
+                        speaker_name=job.speaker_name,
+                        original_text=segment["text"],
+                        original_language=segment["language"],
+                        translated_text_ko=segment["translated_text_ko"],
+                        translated_text_bn=segment["translated_text_bn"],
+                        translated_text_en=segment["translated_text_en"],
+                        timestamp=recorded_at + timedelta(milliseconds=segment["offset_ms"]),
+                        audio_duration=segment["duration_ms"],
+                        stt_model=settings.STT_MODEL_NAME,
+                    )
+                    for transcript_id, segment in zip(ids, segments)
+                ]
+                db.add_all(transcripts)
+                db.commit()
+                job.transcript_ids = [transcript.id for transcript in transcripts]
+            finally:
+                db.close()
+
+            job.status = "completed"
+            if job.translations_failed:  # Partly failed: the rows are stored without those translations
+                job.error = f"{job.translations_failed} translations failed"
+        except Exception as e:
+            print(f"Recording job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.processing_seconds = time.perf_counter() - started
+            job.finished_at = datetime.utcnow()
+            try:
+                os.unlink(audio_path)
+            except FileNotFoundError:
+                pass
+
+
+# Global service instance
+recording_service = RecordingTranscriptionService()
@@ -0,0 +1,209 @@
+"""
+Low-priority re-transcription of archived meetings with a larger model.
+
+Live meetings run the small, fast STT model. For sessions that retained
+their audio, this job re-transcribes every utterance of each ended
+session with ARCHIVE_STT_MODEL, re-translates the ones whose text
+changed, and updates the Transcript rows in place.
+
+It runs as its own process so it never shares threads with the API:
+niced to the lowest priority, one inference thread, a duty cycle that
+sleeps in proportion to the work done, and a full pause whenever a live
+session has had speech recently or the machine is loaded.
+
+Usage (from backend/):
+    python -m services.retranscription_service            # Poll forever
+    python -m services.retranscription_service --once     # Drain and exit
+    python -m services.retranscription_service --session 123456
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+
+from config import settings
+
+
+def limit_threads(threads: int):
+    """Cap BLAS/OpenMP pools; only takes effect before torch, CTranslate2 or numpy is imported"""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["OPENBLAS_NUM_THREADS"] = str(threads)
+
+
+if __name__ == "__main__":
+    limit_threads(max(1, settings.ARCHIVE_CPU_THREADS))
+
+from database import SessionLocal  # noqa: E402
+from models.session import MeetingSession, SessionStatus  # noqa: E402
+from models.transcript import Transcript  # noqa: E402
+from services.audio_archive import resolve  # noqa: E402
+from services.stt_service import STT_ENGINES, SpeechToTextService  # noqa: E402
+from services.translation_service import translation_service  # noqa: E402
+
+
+# Whisper language codes -> names accepted by the translator
+LANGUAGE_NAMES = {"ko": "korean", "bn": "bengali", "en": "english"}
+
+
+class ArchiveRetranscriber:
+    """Re-transcribe retained meeting audio without competing with live traffic"""
+
+    def __init__(self, model_name: str = None, engine_name: str = None):
+        self.model_name = model_name or settings.ARCHIVE_STT_MODEL
+        self.engine_name = engine_name or settings.ARCHIVE_STT_ENGINE or settings.STT_ENGINE
+        self._service: Optional[SpeechToTextService] = None
+
+    @property
+    def service(self) -> SpeechToTextService:
+        """The archive model, loaded on first use and unloaded when idle"""
+        if self._service is None:
+            self._service = SpeechToTextService(
+                model_name=self.model_name,
+                engine_name=self.engine_name,
+                idle_timeout=300
+            )
+        return self._service
+
+    def live_traffic(self, db) -> bool:
+        """Whether a live session had speech recently or the CPU is busy"""
+        since = datetime.utcnow() - timedelta(minutes=settings.ARCHIVE_LIVE_IDLE_MINUTES)
+        recent = db.query(Transcript.id).join(MeetingSession).filter(
+            MeetingSession.status == SessionStatus.active,
+            Transcript.timestamp >= since
+        ).first()
+        if recent is not None:
+            return True
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):  # Not available on Windows
+            return False
+        return load > settings.ARCHIVE_MAX_LOAD
+
+    def wait_for_quiet(self, db, poll_seconds: float = 30.0):
+        """Block until live traffic stops"""
+        while self.live_traffic(db):
+            db.rollback()  # End the read transaction so the next poll sees new rows
+            time.sleep(poll_seconds)
+
+    def pending_query(self, db, session_code: str = None, skip: Collection[int] = ()):
+        """Retained utterances of ended sessions not yet done with the archive model"""
+        query = db.query(Transcript).join(MeetingSession).filter(
+            MeetingSession.retain_audio.is_(True),
+            MeetingSession.status != SessionStatus.active,
+            Transcript.audio_path.isnot(None),
+            (Transcript.stt_model.is_(None)) | (Transcript.stt_model != self.model_name)
+        )
+        if session_code:
+            query = query.filter(MeetingSession.session_code == session_code)
+        if skip:
+            query = query.filter(Transcript.id.notin_(skip))
+        return query.order_by(Transcript.session_id, Transcript.timestamp)
+
+    def retranscribe(self, transcript: Transcript) -> Optional[bool]:
+        """
+        Re-transcribe one utterance and update its row (not committed)
+
+        Returns:
+            True if the text changed, None if it couldn't be translated
+            (the row is left untouched and unstamped, to be retried)
+        """
+        path = resolve(transcript.audio_path)
+        if not path.exists():
+            print(f"Archived audio missing for transcript {transcript.id}: {path}")
+            transcript.stt_model = self.model_name  # Don't retry it forever
+            return False
+
+        audio = STT_ENGINES[self.engine_name].load_audio(str(path))
+        text, language = self.service.transcribe_array(audio)
+        if not text or (text == transcript.original_text and language == transcript.original_language):
+            transcript.stt_model = self.model_name
+            return False
+
+        source = LANGUAGE_NAMES.get(language, "auto")
+        translations = {}
+        for target, target_name in LANGUAGE_NAMES.items():
+            if target == language:
+                translations[target] = text
+                continue
+            try:
+                translations[target] = translation_service.translate_sync(text, source, target_name)["translated_text"]
+            except Exception as e:
+                print(f"Archive translation failed for transcript {transcript.id}: {e}")
+                return None
+
+        # All or nothing, so the row never mixes old and new text
+        transcript.original_text = text
+        transcript.original_language = language
+        for target, translated in translations.items():
+            setattr(transcript, f"translated_text_{target}", translated)
+        transcript.stt_model = self.model_name
+        return True
+
+    def run(self, session_code: str = None, once: bool = False, poll_seconds: float = 300.0):
+        """Process pending utterances, throttled; poll for more unless once"""
+        duty_cycle = min(max(settings.ARCHIVE_DUTY_CYCLE, 0.05), 1.0)
+        while True:
+            db = SessionLocal()
+            processed = changed = 0
+            deferred = set()  # Ids whose translation failed; retried on the next poll
+            try:
+                while True:
+                    self.wait_for_quiet(db)
+                    transcript = self.pending_query(db, session_code, skip=deferred).first()
+                    if transcript is None:
+                        break
+
+                    started = time.monotonic()
+                    try:
+                        result = self.retranscribe(transcript)
+                        if result is None:
+                            deferred.add(transcript.id)
+                        changed += bool(result)
+                    except Exception as e:
+                        print(f"Archive re-transcription failed for transcript {transcript.id}: {e}")
+                        transcript.stt_model = self.model_name
+                    db.commit()
+                    processed += 1
+
+                    # Sleep so inference takes at most duty_cycle of wall time
+                    busy = time.monotonic() - started
+                    time.sleep(busy * (1 - duty_cycle) / duty_cycle)
+            finally:
+                db.close()
+
+            if processed:
+                print(
+                    f"Archive re-transcription: {processed} utterances, {changed} updated, "
+                    f"{len(deferred)} to retry ({self.model_name})"
+                )
+            if once:
+                return
+            time.sleep(poll_seconds)
+
+
+def lower_priority(threads: int):
+    """Run this process at the lowest CPU priority with few inference threads"""
+    limit_threads(threads)  # Child processes; this one was capped before its imports
+    try:
+        os.nice(19)
+    except (AttributeError, OSError):
+        pass
+    settings.STT_CPU_THREADS = threads  # faster-whisper engine
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-transcribe retained meeting audio with a larger model")
+    parser.add_argument("--session", default=None, help="Only this session code")
+    parser.add_argument("--model", default=None, help=f"STT model (default {settings.ARCHIVE_STT_MODEL})")
+    parser.add_argument("--once", action="store_true", help="Exit when nothing is pending")
+    args = parser.parse_args()
+
+    lower_priority(max(1, settings.ARCHIVE_CPU_THREADS))
+    ArchiveRetranscriber(model_name=args.model).run(session_code=args.session, once=args.once)
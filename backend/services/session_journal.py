@@ -0,0 +1,99 @@
+"""
+Recent meeting events kept in memory, so reconnecting clients can resume.
+
+A client that dropped off (venue Wi-Fi) used to have nothing to catch up
+with but the whole transcript from the database. Now each meeting keeps
+its last WS_RESUME_BUFFER_EVENTS transcript and translation events in an
+EventRing, numbered by seq as this process delivers them. The events go
+out with their seq, and the "connected" message carries the ring's epoch
+and latest seq. A client reconnecting with ?epoch=...&last_seq=... is
+sent just the events it missed.
+
+If the ring no longer reaches back that far, or the epoch differs (the
+client landed on another process, or this one restarted), the client is
+told to resync, with the reason, and pages through
+GET /api/sessions/{code}/transcripts?after_id=...&limit=... instead.
+
+Resuming only works within one process. Each process journals every
+event of its meetings, including those that reached it over the meeting
+bus, but numbers them itself under its own epoch: speakers on different
+processes publish independently, so there is no meeting-wide order to
+share without a central sequencer. With several API processes, a client
+resumes cheaply only if it reconnects to the same one (sticky sessions
+at the load balancer); otherwise it always resyncs (reason
+"other_epoch"), which is correct, just slower.
+"""
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from config import settings
+
+
+class EventRing:
+    """The latest events of one meeting, numbered from 1"""
+
+    def __init__(self, size: int = None):
+        self.epoch = uuid.uuid4().hex[:12]  # Tells seqs of this ring from those of any other
+        self.events: Deque[dict] = deque(maxlen=size or settings.WS_RESUME_BUFFER_EVENTS)
+        self.seq = 0  # Of the latest event
+        self.idle_since: Optional[float] = None  # Monotonic time the last client left
+
+    def append(self, event: dict) -> dict:
+        """Number an event and keep it; returns the numbered copy"""
+        self.seq += 1
+        event = {**event, "seq": self.seq}
+        self.events.append(event)
+        return event
+
+    def since(self, last_seq: int) -> Optional[List[dict]]:
+        """Events after last_seq, or None if some of them are no longer kept"""
+        first = self.seq - len(self.events) + 1  # Seq of the oldest event kept
+        if last_seq > self.seq or last_seq + 1 < first:
+            return None
+        return list(self.events)[last_seq + 1 - first:]
+
+
+class SessionJournal:
+    """Event rings of the meetings this process serves, kept a while after their last client leaves"""
+
+    def __init__(self, idle_seconds: float = None):
+        self.idle_seconds = idle_seconds or settings.WS_RESUME_IDLE_SECONDS
+        self.rings: Dict[str, EventRing] = {}
+
+    def ring(self, session_code: str) -> EventRing:
+        """The meeting's ring, created on first use (idle until a client opens it)"""
+        ring = self.rings.get(session_code)
+        if ring is None:
+            ring = self.rings[session_code] = EventRing()
+            ring.idle_since = time.monotonic()
+        return ring
+
+    def open(self, session_code: str) -> EventRing:
+        """A client connected: keep the ring, and forget rings idle too long"""
+        self.sweep()
+        ring = self.ring(session_code)
+        ring.idle_since = None
+        return ring
+
+    def idle(self, session_code: str):
+        """The meeting's last client here left; its ring stays for those who reconnect"""
+        ring = self.rings.get(session_code)
+        if ring is not None:
+            ring.idle_since = time.monotonic()
+
+    def discard(self, session_code: str):
+        self.rings.pop(session_code, None)
+
+    def sweep(self):
+        now = time.monotonic()
+        for session_code, ring in list(self.rings.items()):
+            if ring.idle_since is not None and now - ring.idle_since > self.idle_seconds:
+                del self.rings[session_code]
+
+    def stats(self) -> dict:
+        return {
+            session_code: {"epoch": ring.epoch, "seq": ring.seq, "kept": len(ring.events)}
+            for session_code, ring in self.rings.items()
+        }
@@ -0,0 +1,143 @@
+"""
+Staged, ordered processing of a meeting's utterances.
+
+The meeting WebSocket used to run STT, translation, persistence and TTS
+inline in its receive loop, so while one utterance was processed that
+client's socket went unread: pings went unanswered and later audio piled
+up in kernel buffers. Now the receive loop only submits jobs to the
+meeting's SessionPipeline, where each stage has its own queue and
+workers, so STT of one utterance overlaps translation of the previous
+one.
+
+Every job gets a sequence number when submitted. Unordered stages run
+jobs as soon as a worker is free; an ordered stage has a single worker
+behind a reorder buffer and sees jobs strictly in submission order, so
+results are published in the order utterances were spoken however the
+stages before it interleave.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from config import settings
+
+
+class Stage(NamedTuple):
+    """
+    One step of a pipeline
+
+    The handler returns the job for the next stage, or None to drop it
+    (a dropped job still advances the sequence for ordered stages).
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[Any]]]
+    workers: int = 1
+    ordered: bool = False
+
+
+class SessionPipeline:
+    """Jobs flow through the stages in turn; ordered stages see them in submission order"""
+
+    def __init__(self, name: str, stages: List[Stage], max_pending: int = None):
+        """
+        Args:
+            name: For log messages
+            stages: Steps every job goes through, in order
+            max_pending: Jobs in flight at once; submit() refuses more
+        """
+        self.name = name
+        self.stages = stages
+        self.max_pending = max_pending or settings.PIPELINE_MAX_PENDING
+        self._queues: List[asyncio.Queue] = [asyncio.Queue() for _ in stages]
+        self._tasks: List[asyncio.Task] = []
+        self._next_seq = 0
+        self._pending = 0  # Submitted, not yet out of the last stage
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stats: Dict[str, Dict[str, float]] = {
+            stage.name: {"processed": 0, "dropped": 0, "failed": 0, "busy_seconds": 0.0} for stage in stages
+        }
+
+    def start(self):
+        """Start the stage workers (needs a running event loop)"""
+        for index, stage in enumerate(self.stages):
+            workers = 1 if stage.ordered else max(1, stage.workers)
+            for _ in range(workers):
+                self._tasks.append(asyncio.create_task(self._work(index)))
+
+    def submit(self, job: Any) -> bool:
+        """
+        Queue a job at the first stage
+
+        Returns:
+            False if the pipeline already has max_pending jobs in flight
+        """
+        if self._pending >= self.max_pending:
+            return False
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending += 1
+        self._idle.clear()
+        self._queues[0].put_nowait((seq, job))
+        return True
+
+    async def _work(self, index: int):
+        stage = self.stages[index]
+        queue = self._queues[index]
+        reorder: Dict[int, Any] = {}  # Ordered stages: seq -> job that arrived early
+        next_seq = 0
+        while True:
+            seq, job = await queue.get()
+            if not stage.ordered:
+                await self._run(index, seq, job)
+                continue
+            reorder[seq] = job
+            while next_seq in reorder:
+                await self._run(index, next_seq, reorder.pop(next_seq))
+                next_seq += 1
+
+    async def _run(self, index: int, seq: int, job: Any):
+        """Run one job through a stage and hand it on"""
+        stage = self.stages[index]
+        stats = self._stats[stage.name]
+        if job is not None:
+            started = time.monotonic()
+            try:
+                job = await stage.handler(job)
+            except Exception as e:
+                print(f"Pipeline {self.name}: {stage.name} failed on job {seq}: {e}")
+                stats["failed"] += 1
+                job = None
+            else:
+                stats["processed" if job is not None else "dropped"] += 1
+            stats["busy_seconds"] += time.monotonic() - started
+
+        if index + 1 < len(self.stages):
+            self._queues[index + 1].put_nowait((seq, job))
+        else:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+
+    async def drain(self):
+        """Wait until every submitted job is through the last stage"""
+        await self._idle.wait()
+
+    def close(self):
+        """Stop the workers; queued jobs are abandoned"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "submitted": self._next_seq,
+            "stages": {
+                stage.name: {
+                    "queued": self._queues[index].qsize(),
+                    **{name: round(value, 3) for name, value in self._stats[stage.name].items()}
+                }
+                for index, stage in enumerate(self.stages)
+            }
+        }
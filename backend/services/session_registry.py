@@ -0,0 +1,151 @@
+"""
+Active meetings kept in memory, so hot paths don't query them per call.
+
+Every WebSocket connect and reconnect, and every session lookup, join
+and transcript fetch, used to look the meeting up by code in the
+database. Active meetings are now snapshotted as ActiveSession entries,
+along with their project's glossary, when they are created or first
+looked up. The entry is dropped when the meeting ends; ConnectionManager
+tells the other processes over the meeting bus. Entries are also
+reloaded after SESSION_REGISTRY_TTL_SECONDS, which picks up changes made
+any other way, and a glossary edit drops the project's entries in every
+process (also told over the meeting bus).
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models.glossary import Glossary
+from models.session import MeetingSession, ModuleType, SessionStatus
+
+
+class ActiveSession:
+    """Snapshot of a meeting, with the same attributes as MeetingSession for SessionResponse"""
+
+    def __init__(
+        self,
+        session: MeetingSession,
+        glossary: Dict[Tuple[str, str], List[Dict[str, str]]]
+    ):
+        self.id: int = session.id
+        self.session_code: str = session.session_code
+        self.project_id: Optional[int] = session.project_id
+        self.created_by: int = session.created_by
+        self.module_type: ModuleType = session.module_type
+        self.status: SessionStatus = session.status
+        self.created_at: datetime = session.created_at
+        self.ended_at: Optional[datetime] = session.ended_at
+        self.retain_audio: bool = bool(session.retain_audio)
+        self.glossary = glossary  # (source, target) language codes -> terms
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, session: MeetingSession, db: Session) -> "ActiveSession":
+        """Snapshot a session and, while it is active, its project's glossary"""
+        glossary: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        if session.project_id is not None and session.status == SessionStatus.active:
+            entries = db.query(Glossary).filter(Glossary.project_id == session.project_id).all()
+            for entry in entries:
+                glossary.setdefault((entry.source_lang, entry.target_lang), []).append({
+                    "source_term": entry.source_term,
+                    "target_term": entry.target_term
+                })
+        return cls(session, glossary)
+
+    def glossary_terms(self, source_lang: str, target_lang: str) -> Optional[List[Dict[str, str]]]:
+        """The project's terms for a language pair, in the form TranslationService takes"""
+        return self.glossary.get((source_lang, target_lang))
+
+
+class SessionRegistry:
+    """Session code -> ActiveSession for the active meetings this process has seen"""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl = ttl_seconds or settings.SESSION_REGISTRY_TTL_SECONDS
+        self._sessions: Dict[str, ActiveSession] = {}
+        self._generation = 0  # Bumped by every invalidation, so a lookup racing one isn't cached
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_code: str) -> Optional[ActiveSession]:
+        """The entry, if there is a fresh one"""
+        entry = self._sessions.get(session_code)
+        if entry is not None and time.monotonic() - entry.loaded_at > self.ttl:
+            if self._sessions.get(session_code) is entry:
+                del self._sessions[session_code]
+            return None
+        return entry
+
+    def lookup(self, session_code: str, db: Optional[Session] = None) -> Optional[ActiveSession]:
+        """
+        A session by code: from memory if active, else from the database
+
+        Args:
+            db: Session to query with on a miss (a short-lived one otherwise)
+        """
+        entry = self.get(session_code)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        generation = self._generation
+        own_db = db is None
+        if own_db:
+            db = SessionLocal()
+        try:
+            session = db.query(MeetingSession).filter(
+                MeetingSession.session_code == session_code
+            ).first()
+            if session is None:
+                return None
+            entry = ActiveSession.load(session, db)
+        finally:
+            if own_db:
+                db.close()
+        if generation == self._generation:
+            self._keep(entry)
+        return entry
+
+    async def find(self, session_code: str) -> Optional[ActiveSession]:
+        """lookup() that doesn't block the event loop on a miss"""
+        entry = self.get(session_code)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        return await asyncio.to_thread(self.lookup, session_code)
+
+    def put(self, session: MeetingSession, db: Session) -> ActiveSession:
+        """Register a session just created (or changed) through db"""
+        entry = ActiveSession.load(session, db)
+        self._keep(entry)
+        return entry
+
+    def _keep(self, entry: ActiveSession):
+        if entry.status == SessionStatus.active:
+            self._sessions[entry.session_code] = entry
+        else:
+            self._sessions.pop(entry.session_code, None)
+
+    def invalidate(self, session_code: str):
+        """Forget a session (it ended, or changed)"""
+        self._generation += 1
+        self._sessions.pop(session_code, None)
+
+    def forget_project(self, project_id: int):
+        """Forget the sessions of a project whose glossary changed"""
+        self._generation += 1
+        for session_code, entry in list(self._sessions.items()):
+            if entry.project_id == project_id:
+                self._sessions.pop(session_code, None)
+
+    def stats(self) -> dict:
+        return {"active": len(self._sessions), "hits": self.hits, "misses": self.misses}
+
+
+session_registry = SessionRegistry()
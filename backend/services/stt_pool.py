@@ -0,0 +1,270 @@
+"""
+CPU-partitioned pool of STT inference workers.
+
+Running several transcriptions at once with torch's default threading
+makes every call grab all cores, so they oversubscribe and thrash. The
+pool instead starts one process per core set, pins it there with
+sched_setaffinity and sizes its intra-op threads to match, then hands
+each transcription to whichever worker is free.
+
+Each worker holds its own copy of the model, so on a node serving many
+API workers run the pool inside the shared speech worker (stt_worker.py).
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(workers: int, cores: List[int] = None) -> List[List[int]]:
+    """
+    Split the available cores into contiguous sets, one per worker, whose
+    sizes differ by at most one (every core is used)
+
+    Args:
+        workers: Number of partitions
+        cores: Cores to split (defaults to this process's affinity)
+    """
+    cores = cores or available_cores()
+    workers = max(1, min(workers, len(cores)))
+    size, extra = divmod(len(cores), workers)
+    partitions, start = [], 0
+    for i in range(workers):
+        end = start + size + (i < extra)
+        partitions.append(cores[start:end])
+        start = end
+    return partitions
+
+
+def parse_partitions(spec: str) -> List[List[int]]:
+    """
+    Parse an explicit partition spec such as "0-3;4-7" or "0,2;1,3"
+
+    Partitions are separated by ';', each a comma list of cores or ranges.
+    """
+    partitions = []
+    for part in spec.split(";"):
+        cores = []
+        for item in part.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            if "-" in item:
+                start, end = item.split("-")
+                cores.extend(range(int(start), int(end) + 1))
+            else:
+                cores.append(int(item))
+        if cores:
+            partitions.append(cores)
+    return partitions
+
+
+def _pool_worker(cores: List[int], model_name: str, engine_name: str, connection):
+    """Worker process: pin to cores, size threads, load the model, serve calls"""
+    threads = str(len(cores))
+    # Must be set before torch/CTranslate2 create their thread pools
+    os.environ["OMP_NUM_THREADS"] = threads
+    os.environ["MKL_NUM_THREADS"] = threads
+    try:
+        os.sched_setaffinity(0, cores)
+    except (AttributeError, OSError) as e:
+        print(f"STT pool worker could not pin to cores {cores}: {e}")
+
+    import torch  # type: ignore
+    from config import settings
+    from services.stt_service import SpeechToTextService
+
+    torch.set_num_threads(len(cores))
+    torch.set_num_interop_threads(1)
+    settings.STT_CPU_THREADS = len(cores)  # faster-whisper engine
+
+    service = SpeechToTextService(model_name=model_name, engine_name=engine_name)
+    connection.send(("ready", None))
+
+    while True:
+        try:
+            method, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send(("ok", getattr(service, method)(*args)))
+        except Exception as e:
+            connection.send(("error", str(e)))
+
+
+class PoolWorker:
+    """Parent-side handle for one pinned worker process"""
+
+    def __init__(self, index: int, cores: List[int], process, connection, restarts: int = 0):
+        self.index = index
+        self.cores = cores
+        self.process = process
+        self.connection = connection
+        self.busy_seconds = 0.0
+        self.calls = 0
+        self.busy_since: Optional[float] = None
+        self.restarts = restarts  # Times this slot's process died and was replaced
+
+
+class PartitionedSTTPool:
+    """Drop-in SpeechToTextService that spreads calls over pinned worker processes"""
+
+    # Calls forwarded to a worker; everything else runs in the parent
+    WORKER_METHODS = {
+        "transcribe_audio",
+        "transcribe_from_file",
+        "transcribe_array",
+        "transcribe_array_detailed",
+        "transcribe_batch",
+        "transcribe_batch_detailed",
+    }
+
+    def __init__(self, partitions: List[List[int]], model_name: str = "base", engine_name: str = "whisper"):
+        """
+        Start one worker per partition and wait for their models to load
+
+        Args:
+            partitions: Core ids for each worker
+            model_name: Whisper model size
+            engine_name: Inference backend
+        """
+        self.model_name = model_name
+        self.engine_name = engine_name
+        self.started_at = time.monotonic()
+        self.workers: List[PoolWorker] = []
+        self._idle: "queue.Queue[PoolWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+
+        self.workers = [self._spawn(index, cores) for index, cores in enumerate(partitions)]
+        for worker in self.workers:
+            worker.connection.recv()  # Wait for "ready"
+            self._idle.put(worker)
+        print(f"✅ STT pool ready: {len(self.workers)} workers on cores {partitions}")
+
+    def _spawn(self, index: int, cores: List[int], restarts: int = 0) -> PoolWorker:
+        """Start a worker process (it sends "ready" once its model is loaded)"""
+        # spawn, not fork: forking a process with live torch/OpenMP threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_pool_worker,
+            args=(cores, self.model_name, self.engine_name, child_conn),
+            name=f"stt-pool-{index}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()  # So recv() sees EOF if the child dies
+        return PoolWorker(index, cores, process, parent_conn, restarts)
+
+    def _respawn(self, dead: PoolWorker):
+        """Replace a worker whose process died; drop its slot if the new one can't start"""
+        print(f"⚠️ STT pool worker {dead.index} died (exit code {dead.process.exitcode}), restarting")
+        dead.connection.close()
+        dead.process.join(timeout=1)
+        try:
+            worker = self._spawn(dead.index, dead.cores, dead.restarts + 1)
+            worker.connection.recv()  # Wait for "ready"
+        except (EOFError, OSError) as e:
+            print(f"❌ STT pool worker {dead.index} could not restart, removing it: {e}")
+            with self._lock:
+                self.workers.remove(dead)
+                if not self.workers:
+                    self._idle.put(None)  # Wake callers waiting for a worker
+            return
+        with self._lock:
+            self.workers[self.workers.index(dead)] = worker
+        self._idle.put(worker)
+
+    @property
+    def worker_count(self) -> int:
+        return len(self.workers)
+
+    def _call(self, method: str, *args):
+        """Run a call on the next free worker"""
+        if not self.workers:
+            raise RuntimeError("STT pool has no workers left")
+        worker = self._idle.get()
+        if worker is None:
+            self._idle.put(None)
+            raise RuntimeError("STT pool has no workers left")
+        with self._lock:
+            worker.busy_since = time.monotonic()
+        alive = True
+        try:
+            worker.connection.send((method, args))
+            status, payload = worker.connection.recv()
+        except (EOFError, OSError) as e:  # The process died (BrokenPipeError is an OSError)
+            alive = False
+            raise RuntimeError(f"STT pool worker {worker.index} died: {e!r}")
+        finally:
+            with self._lock:
+                worker.busy_seconds += time.monotonic() - worker.busy_since
+                worker.busy_since = None
+                worker.calls += 1
+            if alive:
+                self._idle.put(worker)
+            else:
+                # Loading the model takes a while; don't hold up this caller for it
+                threading.Thread(target=self._respawn, args=(worker,), daemon=True).start()
+
+        if status == "error":
+            raise RuntimeError(f"STT pool worker {worker.index} error: {payload}")
+        return payload
+
+    def __getattr__(self, method: str):
+        if method not in self.WORKER_METHODS:
+            raise AttributeError(method)
+        return lambda *args: self._call(method, *args)
+
+    def load_audio(self, audio_data: bytes):
+        """Decode audio in the calling thread; it doesn't need a model"""
+        from services.stt_service import STT_ENGINES, decode_audio_bytes
+        return decode_audio_bytes(audio_data, STT_ENGINES[self.engine_name])
+
+    def utilization(self) -> List[Dict[str, object]]:
+        """Per-worker share of wall time spent inferring since the pool started"""
+        now = time.monotonic()
+        uptime = max(now - self.started_at, 1e-9)
+        with self._lock:
+            return [
+                {
+                    "worker": worker.index,
+                    "cores": worker.cores,
+                    "calls": worker.calls,
+                    "busy": worker.busy_since is not None,
+                    "utilization": round(
+                        (worker.busy_seconds + (now - worker.busy_since if worker.busy_since else 0)) / uptime, 3
+                    ),
+                    "alive": worker.process.is_alive(),
+                    "restarts": worker.restarts,
+                }
+                for worker in self.workers
+            ]
+
+    def memory_stats(self) -> Dict[str, object]:
+        """Pool layout and utilization, in the same shape as SpeechToTextService"""
+        from services.stt_service import current_rss_mb, peak_rss_mb
+        return {
+            "engine": self.engine_name,
+            "model": self.model_name,
+            "loaded": True,
+            "rss_mb": round(current_rss_mb(), 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "pool": self.utilization(),
+        }
+
+    def close(self):
+        """Stop every worker process"""
+        for worker in self.workers:
+            worker.connection.close()
+            worker.process.terminate()
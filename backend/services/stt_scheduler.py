@@ -0,0 +1,400 @@
+"""
+Cross-session micro-batching scheduler for speech-to-text.
+
+Utterances from every meeting are queued here; the scheduler collects
+whatever arrives within a short window, runs them through Whisper as one
+batch and routes each result back to the caller that submitted it.
+
+Admission is bounded: the node-wide and per-session queues have caps, and
+a clip whose estimated completion would blow the latency budget is either
+downgraded to a smaller fallback model or rejected with STTOverloaded so
+the client can be told the service is busy. Downgraded clips count
+against the same caps, wait in their own short queue
+(STT_FALLBACK_MAX_QUEUE) and are dropped once past their deadline. With
+a shared speech worker there is no fallback: it would load a second
+model into every API process, so over-budget clips are shed instead.
+
+Offline work (uploaded recordings) goes through transcribe_background:
+it takes a free worker slot only while no live clip is waiting, and
+never more than all but one of the slots, so live meetings keep theirs.
+"""
+import asyncio
+import math
+import time
+import numpy as np
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from services.audio_preprocessing import preprocess_audio
+from services.stt_pool import parse_partitions
+from services.stt_service import SpeechToTextService, TranscriptionResult, get_stt_service
+
+
+class STTOverloaded(Exception):
+    """Raised when a clip is shed instead of transcribed"""
+
+    def __init__(self, reason: str, retry_after_ms: int = 1000):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_ms = retry_after_ms
+
+
+class STTRequest:
+    """A single clip waiting to be transcribed"""
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        future: asyncio.Future,
+        session_code: Optional[str] = None,
+        deadline: float = math.inf
+    ):
+        self.audio = audio
+        self.language = language
+        self.future = future
+        self.session_code = session_code
+        self.deadline = deadline  # Loop time after which the result is useless
+
+
+class BatchingSTTScheduler:
+    """Collect utterances across sessions and transcribe them in batches"""
+
+    def __init__(self, window_ms: int = None, max_batch_size: int = None):
+        """
+        Initialize the scheduler (defaults come from settings)
+
+        Args:
+            window_ms: How long to wait for more clips after the first arrives
+            max_batch_size: Largest number of clips run in one batch
+        """
+        self.window = (window_ms if window_ms is not None else settings.STT_BATCH_WINDOW_MS) / 1000
+        self.max_batch_size = max(1, max_batch_size or settings.STT_MAX_BATCH_SIZE)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # One batch in flight per core partition (a single one uses every core)
+        if settings.STT_WORKER_ADDRESS:
+            self.concurrency = 1  # The speech worker paces its own partitions
+        elif settings.STT_POOL_CORES:
+            self.concurrency = len(parse_partitions(settings.STT_POOL_CORES))
+        else:
+            self.concurrency = max(1, settings.STT_POOL_WORKERS)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._background_slots: Optional[asyncio.Semaphore] = None
+        self.background_concurrency = max(1, self.concurrency - 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="stt-batch")
+
+        # Admission control
+        self.max_queue = settings.STT_MAX_QUEUE
+        self.max_session_queue = settings.STT_MAX_SESSION_QUEUE
+        self.latency_budget = settings.STT_LATENCY_BUDGET_MS / 1000
+        self._pending = 0  # Batched and downgraded clips
+        self._fallback_pending = 0  # Of which downgraded
+        self._session_pending: Counter = Counter()
+        self._batch_seconds = 0.0  # EWMA of batch inference time
+        self.counters: Counter = Counter()
+
+        # Smaller model for downgraded clips, loaded on first use (never with a speech worker)
+        self.fallback_model = None if settings.STT_WORKER_ADDRESS else settings.STT_FALLBACK_MODEL
+        self.max_fallback_queue = max(1, settings.STT_FALLBACK_MAX_QUEUE)
+        self._fallback: Optional[SpeechToTextService] = None
+        self._fallback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-fallback")
+
+    def _ensure_worker(self):
+        """Start the batching loop on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._background_slots = asyncio.Semaphore(self.background_concurrency)
+            self._worker = asyncio.create_task(self._run())
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str = None,
+        session_code: str = None,
+        best_effort: bool = False
+    ) -> Tuple[str, str]:
+        """
+        Queue decoded audio for batched transcription
+
+        Args:
+            audio: Float32 mono samples at 16 kHz
+            language: Optional language hint
+            session_code: Meeting the clip belongs to (for the per-session cap)
+            best_effort: Shed earlier and never downgrade (e.g. partial transcripts)
+
+        Returns:
+            Tuple of (transcribed_text, detected_language)
+
+        Raises:
+            STTOverloaded: If the clip was shed
+        """
+        return (await self.transcribe_detailed(audio, language, session_code, best_effort))[:2]
+
+    async def transcribe_detailed(
+        self,
+        audio: np.ndarray,
+        language: str = None,
+        session_code: str = None,
+        best_effort: bool = False
+    ) -> TranscriptionResult:
+        """
+        Queue decoded audio, returning the engine's confidence signals too
+
+        Returns:
+            TranscriptionResult (empty text, without a model call, for silent clips)
+
+        Raises:
+            STTOverloaded: If the clip was shed
+        """
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+
+        # Trim and normalize; all-silence clips never reach the model
+        audio = preprocess_audio(audio)
+        if audio is None:
+            self.counters["skipped_silent"] += 1
+            return TranscriptionResult("", "unknown")
+
+        if self._pending >= self.max_queue:
+            self._shed("queue_full")
+        if session_code and self._session_pending[session_code] >= self.max_session_queue:
+            self._shed("session_queue_full")
+
+        budget = self.latency_budget / 2 if best_effort else self.latency_budget
+        if self.estimate_wait() > budget:
+            if best_effort or not self.fallback_model:
+                self._shed("over_budget")
+            if self._fallback_pending >= self.max_fallback_queue:
+                self._shed("fallback_full")
+            return await self._transcribe_fallback(audio, language, session_code, budget)
+
+        future = loop.create_future()
+        self._track(future, session_code)
+        self.counters["admitted"] += 1
+        await self._queue.put(STTRequest(audio, language, future, session_code, loop.time() + budget))
+        return await future
+
+    async def transcribe_background(
+        self,
+        audios: List[np.ndarray],
+        language: Optional[str] = None
+    ) -> List[TranscriptionResult]:
+        """
+        Transcribe a batch of offline clips at the lowest priority
+
+        Waits until no live clip is queued and a worker slot is free. At
+        most background_concurrency such batches run at once, so with
+        several slots live traffic always has one to itself; with a single
+        slot, keep the batches short (live clips wait for one to finish).
+
+        Returns:
+            TranscriptionResult per clip, in order
+        """
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        async with self._background_slots:
+            while True:
+                while self._pending > self._fallback_pending:  # Live clips queued or in flight
+                    await asyncio.sleep(self.window or 0.05)
+                await self._slots.acquire()
+                if self._pending == self._fallback_pending:
+                    break
+                self._slots.release()  # A live clip arrived meanwhile; let it go first
+            self.counters["background_batches"] += 1
+            try:
+                return await loop.run_in_executor(
+                    self._executor, get_stt_service().transcribe_batch_detailed, audios, language
+                )
+            finally:
+                self._slots.release()
+
+    def estimate_wait(self) -> float:
+        """Estimated seconds until a clip queued now would finish"""
+        per_round = self.max_batch_size * self.concurrency
+        rounds = (self._pending - self._fallback_pending) // per_round + 1
+        return self.window + rounds * self._batch_seconds
+
+    def _shed(self, reason: str):
+        """Count and raise a rejection"""
+        self.counters[f"shed_{reason}"] += 1
+        retry_after_ms = int(max(self.estimate_wait(), self.window) * 1000)
+        raise STTOverloaded(reason, retry_after_ms)
+
+    def _track(self, future: asyncio.Future, session_code: Optional[str], fallback: bool = False):
+        """Count a queued clip until its future resolves"""
+        self._pending += 1
+        self._fallback_pending += fallback
+        if session_code:
+            self._session_pending[session_code] += 1
+
+        def release(_):
+            self._pending -= 1
+            self._fallback_pending -= fallback
+            if session_code:
+                self._session_pending[session_code] -= 1
+                if self._session_pending[session_code] <= 0:
+                    del self._session_pending[session_code]
+
+        future.add_done_callback(release)
+
+    async def _transcribe_fallback(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        session_code: Optional[str],
+        budget: float
+    ) -> TranscriptionResult:
+        """Downgrade path: transcribe with the small fallback model, one clip at a time"""
+        self.counters["downgraded"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + budget
+
+        def run():
+            if time.monotonic() > deadline:
+                return None  # Waited behind other downgraded clips for too long
+            if self._fallback is None:
+                self._fallback = SpeechToTextService(
+                    model_name=self.fallback_model,
+                    engine_name=settings.STT_ENGINE
+                )
+            return self._fallback.transcribe_array_detailed(audio, language)
+
+        future = loop.run_in_executor(self._fallback_executor, run)
+        self._track(future, session_code, fallback=True)
+        result = await future
+        if result is None:
+            self.counters["shed_expired"] += 1
+            raise STTOverloaded("expired", int(self.window * 1000))
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        """Queue depth, latency estimate and shed/downgrade counters"""
+        return {
+            "queue_depth": self._pending,
+            "max_queue": self.max_queue,
+            "fallback_queue_depth": self._fallback_pending,
+            "max_fallback_queue": self.max_fallback_queue if self.fallback_model else 0,
+            "session_queue_depths": dict(self._session_pending),
+            "max_session_queue": self.max_session_queue,
+            "concurrency": self.concurrency,
+            "background_concurrency": self.background_concurrency,
+            "batch_ms_ewma": round(self._batch_seconds * 1000, 1),
+            "estimated_wait_ms": round(self.estimate_wait() * 1000, 1),
+            "latency_budget_ms": round(self.latency_budget * 1000),
+            "counters": dict(self.counters),
+        }
+
+    async def decode(self, audio_data: bytes) -> Optional[np.ndarray]:
+        """
+        Decode encoded audio (WebM, WAV, ...) to samples off the event loop
+
+        Returns:
+            Float32 16 kHz mono samples, or None if the audio can't be decoded
+        """
+        try:
+            return await asyncio.to_thread(get_stt_service().load_audio, audio_data)
+        except Exception as e:
+            print(f"Audio decode error: {e}")
+            return None
+
+    async def transcribe_bytes(self, audio_data: bytes, language: str = None, session_code: str = None) -> Tuple[str, str]:
+        """
+        Decode encoded audio off the event loop and queue it
+
+        Returns:
+            Tuple of (transcribed_text, detected_language)
+
+        Raises:
+            STTOverloaded: If the clip was shed
+        """
+        audio = await self.decode(audio_data)
+        if audio is None:
+            return "", "unknown"
+        return await self.transcribe(audio, language, session_code)
+
+    async def _collect(self) -> List[STTRequest]:
+        """Wait for one request, then gather more until the window closes"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Batching loop: collect, group by language hint, dispatch to free workers"""
+        while True:
+            batch = await self._collect()
+
+            # A batch decodes with one language setting, so split by hint
+            groups: Dict[Optional[str], List[STTRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.language, []).append(request)
+
+            for language, requests in groups.items():
+                # While every worker is busy, new clips keep queueing for the next batch
+                await self._slots.acquire()
+                asyncio.create_task(self._infer(language, requests))
+
+    async def _infer(self, language: Optional[str], requests: List[STTRequest]):
+        """Run one batch on the executor and route results back to callers"""
+        loop = asyncio.get_running_loop()
+
+        # Drop clips that waited past their deadline instead of spending compute on them
+        now = loop.time()
+        live = []
+        for request in requests:
+            if request.deadline < now:
+                self.counters["shed_expired"] += 1
+                if not request.future.done():
+                    request.future.set_exception(STTOverloaded("expired", int(self.window * 1000)))
+            else:
+                live.append(request)
+        requests = live
+        if not requests:
+            self._slots.release()
+            return
+
+        started = loop.time()
+        try:
+            results = await loop.run_in_executor(
+                self._executor,
+                get_stt_service().transcribe_batch_detailed,
+                [request.audio for request in requests],
+                language
+            )
+            elapsed = loop.time() - started
+            self._batch_seconds = elapsed if not self._batch_seconds else 0.8 * self._batch_seconds + 0.2 * elapsed
+        except Exception as e:
+            print(f"STT batch error: {e}")
+            results = [TranscriptionResult("", "unknown")] * len(requests)
+        finally:
+            self._slots.release()
+
+        for request, result in zip(requests, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+
+# Global instance (lazy loaded)
+_stt_scheduler = None
+
+
+def get_stt_scheduler() -> BatchingSTTScheduler:
+    """Get or create the STT batching scheduler"""
+    global _stt_scheduler
+    if _stt_scheduler is None:
+        _stt_scheduler = BatchingSTTScheduler()
+    return _stt_scheduler
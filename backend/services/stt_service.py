@@ -2,31 +2,385 @@ import whisper  # type: ignore
 import io
 import tempfile
 import os
-from typing import Tuple
+import gc
+import ctypes
+import resource
+import threading
+import time
+import numpy as np
+import torch  # type: ignore
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
+from config import settings
+
+
+AudioInput = Union[str, np.ndarray]  # File path or float32 16 kHz mono samples
+
+
+class TranscriptionResult(NamedTuple):
+    """Engine output with the confidence signals used for language hinting"""
+    text: str
+    language: str
+    language_probability: Optional[float] = None  # Only set when the engine detected the language
+    avg_logprob: Optional[float] = None  # Mean token log-probability of the decode
+
+
+def _mean_logprob(segments) -> Optional[float]:
+    """Average avg_logprob over decoded segments"""
+    values = [segment["avg_logprob"] if isinstance(segment, dict) else segment.avg_logprob for segment in segments]
+    return sum(values) / len(values) if values else None
+
+
+class WhisperEngine:
+    """STT engine backed by openai-whisper (PyTorch, FP32 on CPU)"""
+
+    name = "whisper"
 
-class SpeechToTextService:
-    """Speech-to-Text service using OpenAI Whisper"""
-    
     def __init__(self, model_name: str = "base"):
         """
-        Initialize Whisper model
-        
+        Load the Whisper model
+
         Args:
             model_name: Whisper model size (tiny, base, small, medium, large)
         """
-        print(f"Loading Whisper model: {model_name}")
         self.model = whisper.load_model(model_name)
-        print("Whisper model loaded successfully")
-    
+
+    @staticmethod
+    def load_audio(path: str) -> np.ndarray:
+        """Decode an audio file to 16 kHz mono float32 samples (uses ffmpeg)"""
+        return whisper.load_audio(path)
+
+    def transcribe(self, audio: AudioInput, language: str = None) -> TranscriptionResult:
+        """
+        Transcribe one clip
+
+        Returns:
+            TranscriptionResult (language probability is not reported on this path)
+        """
+        if isinstance(audio, np.ndarray):
+            audio = audio.astype(np.float32, copy=False)
+
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            fp16=False  # Use FP32 on CPU
+        )
+
+        return TranscriptionResult(
+            text=result["text"].strip(),
+            language=result.get("language", language or "unknown"),
+            avg_logprob=_mean_logprob(result.get("segments", []))
+        )
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = None) -> List[TranscriptionResult]:
+        """
+        Transcribe several clips with one batched encoder/decoder pass
+
+        Clips that fit in Whisper's 30 second window are padded into a single
+        mel batch; longer clips fall back to sequential transcription.
+
+        Returns:
+            List of TranscriptionResult, in input order
+        """
+        results: List[TranscriptionResult] = [TranscriptionResult("", "unknown")] * len(audios)
+        short_indices = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+
+        for i, audio in enumerate(audios):
+            if len(audio) > whisper.audio.N_SAMPLES:
+                results[i] = self.transcribe(audio, language)
+
+        if not short_indices:
+            return results
+
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audios[i].astype(np.float32, copy=False)),
+                n_mels=self.model.dims.n_mels
+            )
+            for i in short_indices
+        ]).to(self.model.device)
+
+        options = whisper.DecodingOptions(
+            task="transcribe",
+            language=language,
+            without_timestamps=True,
+            fp16=False  # Use FP32 on CPU
+        )
+        decoded = whisper.decode(self.model, mels, options)
+
+        for i, result in zip(short_indices, decoded):
+            detected_language = result.language or language or "unknown"
+            # language_probs is only populated when the decoder detected the language
+            probability = result.language_probs.get(detected_language) if result.language_probs else None
+            # Same silence filter whisper.transcribe applies per window
+            silent = result.no_speech_prob > 0.6 and result.avg_logprob < -1.0
+            results[i] = TranscriptionResult(
+                text="" if silent else result.text.strip(),
+                language=detected_language,
+                language_probability=probability,
+                avg_logprob=result.avg_logprob
+            )
+
+        return results
+
+
+class FasterWhisperEngine:
+    """STT engine backed by faster-whisper (CTranslate2, int8 on CPU by default)"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str = "base", compute_type: str = "int8", cpu_threads: int = 0):
+        """
+        Load the CTranslate2 Whisper model
+
+        Args:
+            model_name: Whisper model size or path to a converted CTranslate2 model
+            compute_type: CTranslate2 quantization (int8, int8_float32, float32, ...)
+            cpu_threads: Intra-op threads (0 lets CTranslate2 decide)
+        """
+        try:
+            from faster_whisper import WhisperModel  # type: ignore
+        except ImportError:
+            raise RuntimeError(
+                "STT_ENGINE=faster-whisper requires the faster-whisper package "
+                "(pip install faster-whisper)"
+            )
+
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads
+        )
+
+    @staticmethod
+    def load_audio(path: str) -> np.ndarray:
+        """Decode an audio file to 16 kHz mono float32 samples (uses PyAV)"""
+        from faster_whisper import decode_audio  # type: ignore
+        return decode_audio(path, sampling_rate=16000)
+
+    def transcribe(self, audio: AudioInput, language: str = None) -> TranscriptionResult:
+        """
+        Transcribe one clip
+
+        Returns:
+            TranscriptionResult
+        """
+        if isinstance(audio, np.ndarray):
+            audio = audio.astype(np.float32, copy=False)
+
+        segments, info = self.model.transcribe(audio, language=language, task="transcribe")
+        # Segments are generated lazily; materializing them runs the decoder
+        segments = list(segments)
+        return TranscriptionResult(
+            text="".join(segment.text for segment in segments).strip(),
+            language=info.language or language or "unknown",
+            language_probability=None if language else info.language_probability,
+            avg_logprob=_mean_logprob(segments)
+        )
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = None) -> List[TranscriptionResult]:
+        """
+        Transcribe several clips
+
+        CTranslate2 already spreads a single clip across its CPU threads, so
+        clips are decoded one after another.
+
+        Returns:
+            List of TranscriptionResult, in input order
+        """
+        return [self.transcribe(audio, language) for audio in audios]
+
+
+STT_ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def create_stt_engine(engine_name: str, model_name: str):
+    """
+    Instantiate an STT engine by name
+
+    Args:
+        engine_name: One of STT_ENGINES ("whisper", "faster-whisper")
+        model_name: Model size or path passed to the engine
+    """
+    if engine_name not in STT_ENGINES:
+        raise ValueError(
+            f"Unknown STT engine '{engine_name}'. Must be one of: {', '.join(STT_ENGINES)}"
+        )
+
+    if engine_name == FasterWhisperEngine.name:
+        return FasterWhisperEngine(
+            model_name,
+            compute_type=settings.STT_COMPUTE_TYPE,
+            cpu_threads=settings.STT_CPU_THREADS
+        )
+    return WhisperEngine(model_name)
+
+
+def decode_audio_bytes(audio_data: bytes, engine_class) -> np.ndarray:
+    """
+    Decode encoded audio bytes with an engine's decoder
+
+    Args:
+        audio_data: Encoded audio file bytes (WebM, WAV, MP3, ...)
+        engine_class: Engine class whose static load_audio() does the decoding
+
+    Returns:
+        Float32 16 kHz mono samples in [-1, 1]
+    """
+    temp_fd, temp_audio_path = tempfile.mkstemp(suffix='.webm')
+    try:
+        with os.fdopen(temp_fd, 'wb') as temp_file:
+            temp_file.write(audio_data)
+        return engine_class.load_audio(temp_audio_path)
+    finally:
+        try:
+            os.remove(temp_audio_path)
+        except OSError as e:
+            print(f"Error removing temp file: {e}")
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def release_allocator_memory():
+    """Hand freed model memory back to the OS instead of keeping it in the heap"""
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    try:
+        # glibc keeps freed arenas around; malloc_trim returns them
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class SpeechToTextService:
+    """Speech-to-Text service on top of a pluggable Whisper engine"""
+
+    def __init__(self, model_name: str = "base", engine_name: str = "whisper", idle_timeout: int = None):
+        """
+        Initialize the STT engine
+
+        Args:
+            model_name: Whisper model size (tiny, base, small, medium, large)
+            engine_name: Inference backend ("whisper" or "faster-whisper")
+            idle_timeout: Seconds without audio before the model is unloaded (0 disables)
+        """
+        if engine_name not in STT_ENGINES:
+            raise ValueError(
+                f"Unknown STT engine '{engine_name}'. Must be one of: {', '.join(STT_ENGINES)}"
+            )
+        self.model_name = model_name
+        self.engine_name = engine_name
+        self.idle_timeout = settings.STT_IDLE_TIMEOUT_SECONDS if idle_timeout is None else idle_timeout
+
+        self._engine = None
+        self._lock = threading.Lock()
+        self._active_calls = 0
+        self._last_used = time.monotonic()
+        self.load_count = 0
+        self.unload_count = 0
+
+        self._load()
+
+        if self.idle_timeout > 0:
+            threading.Thread(target=self._idle_reaper, name="stt-idle-reaper", daemon=True).start()
+
+    def _load(self):
+        """Load the engine (caller holds no lock; loading is idempotent)"""
+        with self._lock:
+            if self._engine is not None:
+                return
+            print(f"Loading STT engine: {self.engine_name} (model: {self.model_name})")
+            rss_before = current_rss_mb()
+            self._engine = create_stt_engine(self.engine_name, self.model_name)
+            self.load_count += 1
+            self._last_used = time.monotonic()
+            print(f"STT model loaded successfully (+{current_rss_mb() - rss_before:.0f} MB resident)")
+
+    def unload(self) -> bool:
+        """
+        Free the model if no transcription is running
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            if self._engine is None or self._active_calls:
+                return False
+            rss_before = current_rss_mb()
+            self._engine = None
+            release_allocator_memory()
+            self.unload_count += 1
+        print(f"STT model unloaded after idle timeout (-{rss_before - current_rss_mb():.0f} MB resident)")
+        return True
+
+    def _idle_reaper(self):
+        """Background thread: unload the model once it has been idle long enough"""
+        interval = max(1, min(60, self.idle_timeout // 4))
+        while True:
+            time.sleep(interval)
+            if self._engine is not None and time.monotonic() - self._last_used >= self.idle_timeout:
+                self.unload()
+
+    @property
+    def engine(self):
+        """The loaded engine, reloading it on demand"""
+        if self._engine is None:
+            self._load()
+        return self._engine
+
+    @contextmanager
+    def _engine_in_use(self):
+        """Pin the engine for one call so the idle reaper can't unload it mid-inference"""
+        with self._lock:
+            self._active_calls += 1
+        try:
+            yield self.engine
+        finally:
+            with self._lock:
+                self._active_calls -= 1
+                self._last_used = time.monotonic()
+
+    def memory_stats(self) -> Dict[str, object]:
+        """Report model residency and process memory"""
+        return {
+            "engine": self.engine_name,
+            "model": self.model_name,
+            "loaded": self._engine is not None,
+            "idle_seconds": round(time.monotonic() - self._last_used, 1),
+            "idle_timeout_seconds": self.idle_timeout,
+            "load_count": self.load_count,
+            "unload_count": self.unload_count,
+            "rss_mb": round(current_rss_mb(), 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
     def transcribe_audio(self, audio_data: bytes, language: str = None) -> Tuple[str, str]:
         """
         Transcribe audio bytes to text
-        
+
         Args:
             audio_data: Audio file bytes (WAV, MP3, etc.)
             language: Optional language hint (e.g., 'ko', 'bn', 'en')
-        
+
         Returns:
             Tuple of (transcribed_text, detected_language)
         """
@@ -34,33 +388,26 @@ class SpeechToTextService:
         try:
             # Create temporary file that won't be auto-deleted
             temp_fd, temp_audio_path = tempfile.mkstemp(suffix='.webm')
-            
+
             # Write audio data
             with os.fdopen(temp_fd, 'wb') as temp_file:
                 temp_file.write(audio_data)
-            
+
             print(f"Temp file created: {temp_audio_path}, size: {os.path.getsize(temp_audio_path)}")
-            
+
             # Transcribe audio
-            result = self.model.transcribe(
-                temp_audio_path,
-                language=language,
-                task="transcribe",
-                fp16=False  # Use FP32 on CPU
-            )
-            
-            transcribed_text = result["text"].strip()
-            detected_language = result.get("language", language or "unknown")
-            
+            with self._engine_in_use() as engine:
+                transcribed_text, detected_language = engine.transcribe(temp_audio_path, language)[:2]
+
             print(f"Transcription result: '{transcribed_text}'")
             return transcribed_text, detected_language
-        
+
         except Exception as e:
             print(f"Transcription error: {e}")
             import traceback
             traceback.print_exc()
             return "", "unknown"
-        
+
         finally:
             # Clean up temporary file
             if temp_audio_path and os.path.exists(temp_audio_path):
@@ -69,28 +416,112 @@ class SpeechToTextService:
                     print(f"Temp file deleted: {temp_audio_path}")
                 except Exception as e:
                     print(f"Error removing temp file: {e}")
-    
+
     def transcribe_from_file(self, file_path: str, language: str = None) -> Tuple[str, str]:
         """
         Transcribe audio from file path
-        
+
         Args:
             file_path: Path to audio file
             language: Optional language hint
-        
+
         Returns:
             Tuple of (transcribed_text, detected_language)
         """
-        result = self.model.transcribe(
-            file_path,
-            language=language,
-            task="transcribe"
+        with self._engine_in_use() as engine:
+            return engine.transcribe(file_path, language)[:2]
+
+    def transcribe_array(self, audio: np.ndarray, language: str = None) -> Tuple[str, str]:
+        """
+        Transcribe already-decoded audio samples
+
+        Args:
+            audio: Float32 mono samples at 16 kHz in [-1, 1]
+            language: Optional language hint
+
+        Returns:
+            Tuple of (transcribed_text, detected_language)
+        """
+        return self.transcribe_array_detailed(audio, language)[:2]
+
+    def transcribe_array_detailed(self, audio: np.ndarray, language: str = None) -> TranscriptionResult:
+        """
+        Transcribe decoded samples, keeping the engine's confidence signals
+
+        Returns:
+            TranscriptionResult
+        """
+        try:
+            with self._engine_in_use() as engine:
+                return engine.transcribe(audio, language)
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            return TranscriptionResult("", "unknown")
+
+    def load_audio(self, audio_data: bytes) -> np.ndarray:
+        """
+        Decode audio bytes (WebM, WAV, MP3, ...) to 16 kHz mono samples
+
+        Args:
+            audio_data: Encoded audio file bytes
+
+        Returns:
+            Float32 samples in [-1, 1]
+        """
+        # Decoding doesn't need the model, so it never triggers a reload
+        return decode_audio_bytes(audio_data, STT_ENGINES[self.engine_name])
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = None) -> List[Tuple[str, str]]:
+        """
+        Transcribe several clips in one engine call
+
+        Args:
+            audios: Float32 mono samples at 16 kHz, one array per clip
+            language: Optional language hint shared by every clip in the batch
+
+        Returns:
+            List of (transcribed_text, detected_language), in input order
+        """
+        return [result[:2] for result in self.transcribe_batch_detailed(audios, language)]
+
+    def transcribe_batch_detailed(self, audios: List[np.ndarray], language: str = None) -> List[TranscriptionResult]:
+        """
+        Batched transcription keeping the engine's confidence signals
+
+        Returns:
+            List of TranscriptionResult, in input order
+        """
+        try:
+            with self._engine_in_use() as engine:
+                return engine.transcribe_batch(audios, language)
+        except Exception as e:
+            print(f"Batched transcription error: {e}")
+            return [self.transcribe_array_detailed(audio, language) for audio in audios]
+
+
+def create_local_stt_service():
+    """
+    Build the in-process STT backend from settings
+
+    Returns a PartitionedSTTPool when STT_POOL_WORKERS > 1, otherwise a
+    single SpeechToTextService using every core.
+    """
+    if settings.STT_POOL_WORKERS > 1 or settings.STT_POOL_CORES:
+        from services.stt_pool import PartitionedSTTPool, parse_partitions, partition_cores
+        partitions = (
+            parse_partitions(settings.STT_POOL_CORES)
+            if settings.STT_POOL_CORES
+            else partition_cores(settings.STT_POOL_WORKERS)
         )
-        
-        transcribed_text = result["text"].strip()
-        detected_language = result.get("language", language or "unknown")
-        
-        return transcribed_text, detected_language
+        return PartitionedSTTPool(
+            partitions,
+            model_name=settings.STT_MODEL_NAME,
+            engine_name=settings.STT_ENGINE
+        )
+    return SpeechToTextService(
+        model_name=settings.STT_MODEL_NAME,
+        engine_name=settings.STT_ENGINE
+    )
 
 
 # Global instance (lazy loaded)
@@ -98,8 +529,30 @@ _stt_service = None
 
 
 def get_stt_service() -> SpeechToTextService:
-    """Get or create STT service instance"""
+    """
+    Get or create STT service instance
+    
+    With STT_WORKER_ADDRESS set, this is a client for the shared speech
+    worker process instead of an in-process model; with STT_POOL_WORKERS
+    set, a pool of core-pinned worker processes.
+    """
     global _stt_service
+    if _stt_service is None and settings.STT_WORKER_ADDRESS:
+        from services.stt_worker import RemoteSpeechToTextService
+        _stt_service = RemoteSpeechToTextService(settings.STT_WORKER_ADDRESS)
     if _stt_service is None:
-        _stt_service = SpeechToTextService(model_name="base")
+        _stt_service = create_local_stt_service()
     return _stt_service
+
+
+def get_stt_status() -> Dict[str, object]:
+    """STT memory/residency report that never loads the model itself"""
+    if _stt_service is None:
+        return {
+            "engine": settings.STT_ENGINE,
+            "model": settings.STT_MODEL_NAME,
+            "loaded": False,
+            "rss_mb": round(current_rss_mb(), 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+    return _stt_service.memory_stats()
@@ -0,0 +1,164 @@
+"""
+Dedicated speech worker process.
+
+Loading Whisper in every uvicorn/gunicorn worker multiplies model memory
+by the worker count. Instead, run one speech worker per node that holds
+the model, and point the API workers at it with STT_WORKER_ADDRESS; they
+then get a RemoteSpeechToTextService that forwards calls over a local
+socket.
+
+Usage (from backend/):
+    STT_WORKER_ADDRESS=/tmp/ko2bn-stt.sock python -m services.stt_worker
+    STT_WORKER_ADDRESS=/tmp/ko2bn-stt.sock uvicorn main:app --workers 4
+"""
+import hashlib
+import os
+import queue
+import sys
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings  # noqa: E402
+
+
+# Service methods a client may call, and whether they run the model
+REMOTE_METHODS = {
+    "load_audio": False,
+    "memory_stats": False,
+    "transcribe_audio": True,
+    "transcribe_from_file": True,
+    "transcribe_array": True,
+    "transcribe_array_detailed": True,
+    "transcribe_batch": True,
+    "transcribe_batch_detailed": True,
+}
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    Parse STT_WORKER_ADDRESS
+
+    "host:port" becomes a TCP address; anything else is a Unix socket path.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def worker_authkey() -> bytes:
+    """Shared secret for the worker socket, derived from SECRET_KEY"""
+    return hashlib.sha256(f"stt-worker:{settings.SECRET_KEY}".encode()).digest()
+
+
+class RemoteSpeechToTextService:
+    """Drop-in SpeechToTextService that forwards calls to the speech worker"""
+
+    def __init__(self, address: str, pool_size: int = 4):
+        """
+        Args:
+            address: Speech worker address (Unix socket path or host:port)
+            pool_size: Maximum idle connections kept for reuse
+        """
+        self.address = parse_address(address)
+        self._authkey = worker_authkey()
+        # Connections aren't thread-safe, so each call borrows one
+        self._pool: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self) -> Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return Client(self.address, authkey=self._authkey)
+
+    def _release(self, connection: Connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _call(self, method: str, *args):
+        """Send one request, retrying once on a fresh connection if the worker restarted"""
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                connection.send((method, args))
+                status, payload = connection.recv()
+            except (EOFError, OSError) as e:
+                connection.close()
+                if attempt:
+                    raise RuntimeError(f"Speech worker unavailable at {self.address}: {e}")
+                continue
+
+            self._release(connection)
+            if status == "error":
+                raise RuntimeError(f"Speech worker error: {payload}")
+            return payload
+
+    def __getattr__(self, method: str):
+        if method not in REMOTE_METHODS:
+            raise AttributeError(method)
+        return lambda *args: self._call(method, *args)
+
+
+def _serve_connection(connection: Connection, service, model_slots: threading.Semaphore):
+    """Answer requests from one API worker connection until it closes"""
+    try:
+        while True:
+            try:
+                method, args = connection.recv()
+            except EOFError:
+                return
+
+            if method not in REMOTE_METHODS:
+                connection.send(("error", f"Unknown method: {method}"))
+                continue
+
+            try:
+                if REMOTE_METHODS[method]:
+                    # One inference per core partition, so calls never oversubscribe
+                    with model_slots:
+                        result = getattr(service, method)(*args)
+                else:
+                    result = getattr(service, method)(*args)
+                connection.send(("ok", result))
+            except Exception as e:
+                print(f"Speech worker error in {method}: {e}")
+                connection.send(("error", str(e)))
+    finally:
+        connection.close()
+
+
+def serve(address: str):
+    """Load the model once and serve transcription requests forever"""
+    from services.stt_service import create_local_stt_service
+
+    parsed = parse_address(address)
+    if isinstance(parsed, str) and os.path.exists(parsed):
+        os.remove(parsed)  # Stale socket from a previous run
+
+    service = create_local_stt_service()
+    model_slots = threading.BoundedSemaphore(getattr(service, "worker_count", 1))
+
+    with Listener(parsed, authkey=worker_authkey()) as listener:
+        print(f"✅ Speech worker listening on {address}")
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception as e:
+                print(f"Speech worker rejected a connection: {e}")
+                continue
+            threading.Thread(
+                target=_serve_connection,
+                args=(connection, service, model_slots),
+                daemon=True
+            ).start()
+
+
+if __name__ == "__main__":
+    if not settings.STT_WORKER_ADDRESS:
+        sys.exit("Set STT_WORKER_ADDRESS (socket path or host:port) to run the speech worker")
+    serve(settings.STT_WORKER_ADDRESS)
@@ -0,0 +1,269 @@
+"""
+Write-behind persistence for meeting transcripts.
+
+Every utterance used to insert its Transcript row with its own commit
+(and refresh, just to learn the id) before the transcript could be
+broadcast, and update it again once translated. Now the row's id comes
+from a block reserved ahead of time, so the broadcast goes out at once,
+and rows and their translation updates queue here until a background
+task writes them, TRANSCRIPT_FLUSH_ROWS at a time or every
+TRANSCRIPT_FLUSH_INTERVAL_MS, in one short transaction from a worker
+thread.
+
+Ids come from the id_sequences table, TRANSCRIPT_ID_BLOCK at a time, so
+several API processes never hand out the same id. Anything else
+inserting transcripts must take its ids from here too (reserve()),
+rather than leave them to the database.
+
+Queued rows are written when a meeting's last client leaves, before
+the session and transcript endpoints read or end a session, and at
+shutdown (close()).
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from config import settings
+from database import SessionLocal
+from models.id_sequence import IdSequence
+from models.transcript import Transcript
+
+
+class IdAllocator:
+    """Primary keys for one table, reserved from the database in blocks"""
+
+    def __init__(self, model, block_size: int = None):
+        self.model = model
+        self.name = model.__tablename__
+        self.block_size = block_size or settings.TRANSCRIPT_ID_BLOCK
+        self._next = 0
+        self._end = 0  # Exclusive
+        self._lock = threading.Lock()
+
+    def reserve(self, count: int) -> range:
+        """Reserve count consecutive ids (one short transaction)"""
+        for _ in range(3):
+            db = SessionLocal()
+            try:
+                # The UPDATE takes the write lock first, so reservations from other processes serialize
+                updated = db.query(IdSequence).filter(IdSequence.name == self.name).update(
+                    {IdSequence.next_id: IdSequence.next_id + count}, synchronize_session=False
+                )
+                if updated:
+                    end = db.query(IdSequence.next_id).filter(IdSequence.name == self.name).scalar()
+                else:
+                    # First reservation: carry on after the rows already there
+                    end = (db.query(func.max(self.model.id)).scalar() or 0) + 1 + count
+                    db.add(IdSequence(name=self.name, next_id=end))
+                db.commit()
+                return range(end - count, end)
+            except IntegrityError:
+                db.rollback()  # Another process created the sequence first; take the UPDATE path
+            finally:
+                db.close()
+        raise RuntimeError(f"Could not reserve ids for {self.name}")
+
+    def take(self) -> Optional[int]:
+        """Next id of the current block, or None when it is used up"""
+        with self._lock:
+            if self._next >= self._end:
+                return None
+            self._next += 1
+            return self._next - 1
+
+    def next_id(self) -> int:
+        """Next id, reserving a new block when the current one is used up (may hit the database)"""
+        with self._lock:
+            if self._next >= self._end:
+                block = self.reserve(self.block_size)
+                self._next, self._end = block.start, block.stop
+            self._next += 1
+            return self._next - 1
+
+    def remaining(self) -> int:
+        return self._end - self._next
+
+
+class TranscriptWriter:
+    """Queues transcript inserts and updates and writes them in batches"""
+
+    def __init__(self, flush_interval_ms: int = None, flush_rows: int = None):
+        self.ids = IdAllocator(Transcript)
+        self.flush_interval = (flush_interval_ms or settings.TRANSCRIPT_FLUSH_INTERVAL_MS) / 1000
+        self.flush_rows = flush_rows or settings.TRANSCRIPT_FLUSH_ROWS
+        self._inserts: Dict[int, dict] = {}  # id -> row, not yet written
+        self._writing: Dict[int, dict] = {}  # Rows of the flush in progress
+        self._updates: Dict[int, dict] = {}  # id -> changed columns, applied after the inserts
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flushing: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.inserted = 0
+        self.updated = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def _ensure_worker(self):
+        """Start the flush loop on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._flushing = asyncio.Lock()
+            self._worker = asyncio.create_task(self._run())
+
+    async def insert(self, **columns) -> int:
+        """Queue a new transcript row; returns its id without waiting for the write"""
+        transcript_id = self.ids.take()
+        if transcript_id is None:
+            transcript_id = await asyncio.to_thread(self.ids.next_id)
+        self._ensure_worker()
+        self._inserts[transcript_id] = {**columns, "id": transcript_id}
+        self._queued()
+        return transcript_id
+
+    def update(self, transcript_id: int, **columns):
+        """Queue column changes (folded into the insert if the row isn't written yet)"""
+        row = self._inserts.get(transcript_id)
+        if row is not None:
+            row.update(columns)
+            return
+        self._ensure_worker()
+        self._updates.setdefault(transcript_id, {}).update(columns)
+        self._queued()
+
+    def _queued(self):
+        if len(self._inserts) + len(self._updates) >= self.flush_rows:
+            self._wakeup.set()
+
+    def pending(self, transcript_id: int) -> Optional[dict]:
+        """A row not yet in the database, as it will be written"""
+        for rows in (self._inserts, self._writing):
+            if transcript_id in rows:
+                return {**rows[transcript_id], **self._updates.get(transcript_id, {})}
+        return None
+
+    async def read(self, transcript_id: int) -> Optional[dict]:
+        """A transcript's columns, including changes still queued"""
+        row = self.pending(transcript_id)
+        if row is None:
+            row = await asyncio.to_thread(self._load, transcript_id)
+            if row is not None:
+                row.update(self._updates.get(transcript_id, {}))
+        return row
+
+    def _load(self, transcript_id: int) -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            transcript = db.get(Transcript, transcript_id)
+            if transcript is None:
+                return None
+            return {column.name: getattr(transcript, column.name) for column in Transcript.__table__.columns}
+        finally:
+            db.close()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far, and wait until it is committed"""
+        if self._flushing is None:
+            return  # Nothing was ever queued
+        async with self._flushing:
+            if not self._inserts and not self._updates:
+                return
+            self._writing, self._inserts = self._inserts, {}
+            updates, self._updates = self._updates, {}
+            rows = list(self._writing.values())
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, rows, updates)
+            except OperationalError as e:
+                # Database locked or unreachable: keep everything for the next flush
+                self.failures += 1
+                print(f"Error writing transcripts, will retry: {e}")
+                self._inserts = {**self._writing, **self._inserts}
+                for transcript_id, columns in updates.items():
+                    self._updates[transcript_id] = {**columns, **self._updates.get(transcript_id, {})}
+                return
+            except Exception as e:
+                # A bad row fails the whole batch; write the rest one by one
+                self.failures += 1
+                print(f"Error writing transcripts, retrying row by row: {e}")
+                await asyncio.to_thread(self._write_each, rows, updates)
+            else:
+                self.inserted += len(rows)
+                self.updated += len(updates)
+            finally:
+                self._writing = {}
+            self.flushes += 1
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def _write(self, rows: List[dict], updates: Dict[int, dict]):
+        """One transaction: bulk insert, then updates (runs in a worker thread)"""
+        db = SessionLocal()
+        try:
+            if rows:
+                db.execute(insert(Transcript), rows)
+            for transcript_id, columns in updates.items():
+                db.execute(update(Transcript).where(Transcript.id == transcript_id).values(**columns))
+            db.commit()
+        finally:
+            db.close()
+
+    def _write_each(self, rows: List[dict], updates: Dict[int, dict]):
+        """Write rows and updates separately, dropping those that fail"""
+        for row in rows:
+            try:
+                self._write([row], {})
+                self.inserted += 1
+            except Exception as e:
+                print(f"Dropping transcript {row['id']}: {e}")
+        for transcript_id, columns in updates.items():
+            try:
+                self._write([], {transcript_id: columns})
+                self.updated += 1
+            except Exception as e:
+                print(f"Dropping update of transcript {transcript_id}: {e}")
+
+    async def close(self):
+        """Write what is queued and stop the flush loop (at shutdown)"""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        if self._inserts or self._updates:
+            print(f"Lost {len(self._inserts)} transcripts and {len(self._updates)} updates at shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "queued_inserts": len(self._inserts),
+            "queued_updates": len(self._updates),
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "ids_reserved": self.ids.remaining(),
+        }
+
+
+_transcript_writer = None
+
+
+def get_transcript_writer() -> TranscriptWriter:
+    """Get or create the transcript writer"""
+    global _transcript_writer
+    if _transcript_writer is None:
+        _transcript_writer = TranscriptWriter()
+    return _transcript_writer
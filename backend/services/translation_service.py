@@ -1,5 +1,7 @@
 from deep_translator import GoogleTranslator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
+import asyncio
 import re
 
 
@@ -72,28 +74,19 @@ class TranslationService:
             result = result.replace(placeholder, target_term)
         return result
     
-    async def translate(
+    def translate_sync(
         self,
         text: str,
         source_lang: str,
         target_lang: str,
-        glossary_terms: Optional[List[Dict[str, str]]] = None,
-        context: Optional[str] = None
+        glossary_terms: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, any]:
         """
-        Translate text using Google Translate (free) with optional glossary.
-        
-        Args:
-            text: Text to translate
-            source_lang: Source language code (ko, bn, en)
-            target_lang: Target language code (ko, bn, en)
-            glossary_terms: List of custom terms to preserve (dict with 'source_term' and 'target_term')
-            context: Additional context for translation (not used with free API)
+        Blocking translation call (runs the HTTP request in the calling thread)
         
         Returns:
             Dictionary with translated_text and confidence score
         """
-        
         try:
             # Map language codes
             lang_map = {
@@ -125,6 +118,65 @@ class TranslationService:
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
     
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[List[Dict[str, str]]] = None,
+        context: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Translate text using Google Translate (free) with optional glossary.
+        
+        Args:
+            text: Text to translate
+            source_lang: Source language code (ko, bn, en)
+            target_lang: Target language code (ko, bn, en)
+            glossary_terms: List of custom terms to preserve (dict with 'source_term' and 'target_term')
+            context: Additional context for translation (not used with free API)
+        
+        Returns:
+            Dictionary with translated_text and confidence score
+        """
+        # The translator client blocks on the network; keep it off the event loop
+        return await asyncio.to_thread(self.translate_sync, text, source_lang, target_lang, glossary_terms)
+    
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[List[Dict[str, str]]] = None,
+        max_workers: int = 8
+    ) -> List[Optional[str]]:
+        """
+        Translate many texts at once, keeping up to max_workers requests in flight
+        
+        Each request is network-bound, so a recording's worth of segments
+        goes out concurrently instead of one round trip after another.
+        
+        Returns:
+            Translations in the same order as texts, None for those that failed
+        """
+        if not texts:
+            return []
+        
+        def translate_one(text: str) -> Optional[str]:
+            if not text or source_lang == target_lang:
+                return text
+            try:
+                return self.translate_sync(text, source_lang, target_lang, glossary_terms)["translated_text"]
+            except Exception as e:
+                print(f"Batch translation error ({source_lang}->{target_lang}): {e}")
+                return None
+        
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(texts)), thread_name_prefix="translate") as executor:
+            return list(await asyncio.gather(
+                *[loop.run_in_executor(executor, translate_one, text) for text in texts]
+            ))
+    
     async def translate_multi(
         self,
         text: str,
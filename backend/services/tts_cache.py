@@ -0,0 +1,254 @@
+"""
+Content-addressed cache for synthesized speech.
+
+Meetings repeat themselves ("yes", "thank you", "next slide"), and every
+repetition used to mean another gTTS round trip per language and a
+base64 MP3 inlined into every broadcast. Audio is now stored on disk
+under an HMAC-SHA-256 of (engine, language, normalized text) keyed with
+SECRET_KEY, served by /api/tts/{key} with immutable caching headers, and
+broadcasts carry only the URL. A key always maps to the same bytes, so
+clients and proxies can cache it forever. Being keyed, a key can't be
+computed from a guessed phrase, so fetching one doesn't reveal whether
+that phrase was spoken in some meeting.
+
+The directory is shared by every API worker process, and a clip made by
+one may be fetched through another (meeting broadcasts fan out across
+processes). So a key missing from this process's index is looked for on
+disk, and the index is rebuilt from disk every TTS_CACHE_RESCAN_SECONDS
+before evicting, so the size limit counts every worker's files and
+recency (file mtimes) is shared too.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from config import settings
+from services.tts_service import split_sentences
+
+
+TTS_CACHE_DIR = Path(__file__).parent.parent / "uploads" / "tts_cache"
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_KEY_SECRET = f"tts-cache:{settings.SECRET_KEY}".encode("utf-8")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of text for cache keys (Unicode NFC, collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, language: str, engine: str = "gtts") -> str:
+    """Content address of the speech for text in language"""
+    material = f"{engine}\0{language}\0{normalize_text(text)}"
+    return hmac.new(_KEY_SECRET, material.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class TTSCache:
+    """Disk store of synthesized audio with least-recently-used eviction by size"""
+
+    def __init__(self, directory: Path = None, max_bytes: int = None):
+        """
+        Load the index of what's already on disk
+
+        Args:
+            directory: Where audio files are kept
+            max_bytes: Total size above which the least recently used files go
+        """
+        self.directory = Path(directory or settings.TTS_CACHE_DIR or TTS_CACHE_DIR)
+        self.max_bytes = max_bytes or settings.TTS_CACHE_MAX_MB * 1024 * 1024
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._scanned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._inflight: Dict[str, asyncio.Future] = {}  # key -> synthesis in progress
+        # Bounded so a burst of long messages can't open unlimited gTTS connections
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.TTS_MAX_CONCURRENCY), thread_name_prefix="tts"
+        )
+
+        self.scan()
+
+    def scan(self):
+        """Rebuild the index from what is on disk, written by any process"""
+        entries = []
+        for path in self.directory.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Evicted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        with self._lock:
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total = sum(size for _, _, size in entries)
+            self._scanned_at = time.monotonic()
+
+    def path(self, key: str) -> Path:
+        """File location for a key (two-level fan-out keeps directories small)"""
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Path of a cached entry, marking it recently used; None on a miss"""
+        path = self.path(key)
+        try:
+            os.utime(path)  # Recency survives restarts, and is shared with other processes, via mtime
+            size = path.stat().st_size
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._index.pop(key, 0)
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:  # Made by another process since the last scan
+                self._index[key] = size
+                self._total += size
+        return path
+
+    def read(self, key: str) -> bytes:
+        """
+        Audio bytes of a cached entry
+
+        Raises:
+            KeyError: If the entry isn't cached (or was just evicted)
+        """
+        path = self.lookup(key)
+        if path is None:
+            raise KeyError(key)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def put(self, key: str, data: bytes):
+        """Store audio for a key, then evict down to the size limit"""
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)  # Readers never see a partial file
+
+        if time.monotonic() - self._scanned_at > settings.TTS_CACHE_RESCAN_SECONDS:
+            self.scan()  # Count what other processes added (and evicted) since
+        with self._lock:
+            self._total += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            evicted = []
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old_key, size = self._index.popitem(last=False)
+                self._total -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                self.path(old_key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def synthesize(self, tts_service, text: str, language: str) -> str:
+        """
+        Return the key for text spoken in language, synthesizing on a miss
+
+        Raises:
+            Whatever the TTS service raises on a miss
+        """
+        language = tts_service.language_map.get(language.lower(), "en")
+        key = cache_key(text, language, tts_service.engine_name_for(language))
+        if self.lookup(key) is not None:
+            self.hits += 1
+            return key
+        self.misses += 1
+        self.put(key, tts_service.text_to_speech(text, language))
+        return key
+
+    async def speak(self, tts_service, text: str, language: str) -> str:
+        """
+        Async synthesize(): concurrent requests for the same clip share one call
+
+        Synthesis runs on the bounded TTS executor; callers arriving while it
+        is in flight await the same future instead of calling the engine again.
+        """
+        language_code = tts_service.language_map.get(language.lower(), "en")
+        key = cache_key(text, language_code, tts_service.engine_name_for(language_code))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.synthesize, tts_service, text, language
+            )
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so lone failures aren't logged twice
+            raise
+        finally:
+            if not future.done():
+                future.cancel()  # Our caller was cancelled; don't leave waiters hanging
+            del self._inflight[key]
+
+    async def speak_sentences(self, tts_service, text: str, language: str) -> AsyncIterator[Tuple[int, int, str]]:
+        """
+        Synthesize text sentence by sentence, yielding clips in order
+
+        Every sentence is submitted at once so they synthesize in parallel,
+        but each is yielded as soon as it and all before it are ready, so
+        playback can start after the first sentence.
+
+        Yields:
+            (index, sentence_count, key)
+        """
+        sentences = split_sentences(text) or [text]
+        tasks = [asyncio.ensure_future(self.speak(tts_service, sentence, language)) for sentence in sentences]
+        for task in tasks:
+            # Clips still finish (and get cached) if the consumer stops early
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        for index, task in enumerate(tasks):
+            yield index, len(tasks), await task
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = len(self._index), self._total
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_mb": round(total / (1024 * 1024), 1),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+def audio_url(key: str) -> str:
+    """Path clients fetch cached speech from"""
+    return f"/api/tts/{key}.mp3"
+
+
+# Global instance
+_tts_cache = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Get or create the TTS cache"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
@@ -1,14 +1,241 @@
 from gtts import gTTS  # type: ignore
 import io
-from typing import Optional
+import re
+import shutil
+import subprocess
+import wave
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+
+# Sentence ends: Latin punctuation followed by space, or CJK full stop / Bengali dari
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[。！？।])\s*")
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 200) -> List[str]:
+    """
+    Split text into sentences for incremental synthesis
+    
+    Fragments shorter than min_chars are merged into the next sentence
+    (gTTS round trips dominate for tiny clips), and sentences longer than
+    max_chars are broken at the last comma or space before the limit.
+    """
+    sentences = []
+    pending = ""
+    for part in SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(sentences[-1]) + len(pending) < max_chars:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    
+    pieces = []
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(",", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut + 1 if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def encode_mp3(wav_data: bytes, bitrate: str = "48k") -> bytes:
+    """
+    Transcode WAV bytes to MP3 so every engine serves the same format (uses ffmpeg)
+    
+    Raises:
+        RuntimeError: If ffmpeg is missing or fails
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-f", "wav", "-i", "pipe:0",
+        "-codec:a", "libmp3lame", "-b:a", bitrate, "-f", "mp3", "pipe:1",
+    ]
+    try:
+        result = subprocess.run(command, input=wav_data, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"MP3 encoding failed: {e.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def parse_voices(spec: Optional[str]) -> Dict[str, str]:
+    """Parse a voice map such as "en=/voices/en.onnx;ko=/voices/ko.onnx" """
+    voices = {}
+    for item in (spec or "").split(";"):
+        if "=" in item:
+            language, voice = item.split("=", 1)
+            voices[language.strip()] = voice.strip()
+    return voices
+
+
+class GTTSEngine:
+    """TTS engine backed by Google Translate's speech endpoint (needs the network)"""
+    
+    name = "gtts"
+    
+    def supports(self, language: str) -> bool:
+        return True
+    
+    def synthesize(self, text: str, language: str) -> bytes:
+        """
+        Synthesize speech
+        
+        Returns:
+            Audio bytes (MP3 format)
+        """
+        tts = gTTS(text=text, lang=language, slow=False)
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+    
+    def synthesize_batch(self, texts: List[str], language: str) -> List[bytes]:
+        """Synthesize several clips (one request each; gTTS has no batch API)"""
+        return [self.synthesize(text, language) for text in texts]
+
+
+class PiperEngine:
+    """Local neural TTS engine backed by Piper (ONNX voices on CPU)"""
+    
+    name = "piper"
+    
+    def __init__(self, voices: Dict[str, str]):
+        """
+        Load each configured voice once
+        
+        Args:
+            voices: Language code -> path to a Piper .onnx voice model
+        """
+        try:
+            from piper.voice import PiperVoice  # type: ignore
+        except ImportError:
+            raise RuntimeError("TTS_ENGINE=piper requires the piper-tts package (pip install piper-tts)")
+        
+        self.voices = {language: PiperVoice.load(path) for language, path in voices.items()}
+    
+    def supports(self, language: str) -> bool:
+        return language in self.voices
+    
+    def synthesize(self, text: str, language: str) -> bytes:
+        """
+        Synthesize speech with the language's voice
+        
+        Returns:
+            Audio bytes (MP3 format)
+        """
+        voice = self.voices[language]
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, "wb") as wav_file:
+            # piper-tts >= 1.3 renamed synthesize() to synthesize_wav()
+            synthesize = getattr(voice, "synthesize_wav", None) or voice.synthesize
+            synthesize(text, wav_file)
+        return encode_mp3(wav_buffer.getvalue())
+    
+    def synthesize_batch(self, texts: List[str], language: str) -> List[bytes]:
+        """Synthesize several clips with the already-loaded voice"""
+        return [self.synthesize(text, language) for text in texts]
+
+
+class EspeakEngine:
+    """Local formant TTS engine backed by the espeak-ng command-line tool"""
+    
+    name = "espeak"
+    
+    def __init__(self, voices: Dict[str, str]):
+        """
+        Args:
+            voices: Language code -> espeak-ng voice name
+        """
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("TTS_ENGINE=espeak requires espeak-ng (apt-get install espeak-ng)")
+        self.voices = voices
+    
+    def supports(self, language: str) -> bool:
+        return language in self.voices
+    
+    def _start(self, text: str, language: str) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [self.binary, "-v", self.voices[language], "--stdout", "--stdin"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        process.stdin.write(text.encode("utf-8"))
+        process.stdin.close()
+        return process
+    
+    @staticmethod
+    def _finish(process: subprocess.Popen) -> bytes:
+        wav_data = process.stdout.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"espeak-ng failed: {process.stderr.read().decode(errors='replace').strip()}")
+        return encode_mp3(wav_data)
+    
+    def synthesize(self, text: str, language: str) -> bytes:
+        """
+        Synthesize speech
+        
+        Returns:
+            Audio bytes (MP3 format)
+        """
+        return self._finish(self._start(text, language))
+    
+    def synthesize_batch(self, texts: List[str], language: str) -> List[bytes]:
+        """Synthesize several clips, running one espeak-ng process per clip in parallel"""
+        processes = [self._start(text, language) for text in texts]
+        return [self._finish(process) for process in processes]
+
+
+TTS_ENGINES = {
+    GTTSEngine.name: GTTSEngine,
+    PiperEngine.name: PiperEngine,
+    EspeakEngine.name: EspeakEngine,
+}
+
+
+def create_tts_engine(engine_name: str):
+    """
+    Instantiate a TTS engine by name
+    
+    Args:
+        engine_name: One of TTS_ENGINES ("gtts", "piper", "espeak")
+    """
+    if engine_name not in TTS_ENGINES:
+        raise ValueError(
+            f"Unknown TTS engine '{engine_name}'. Must be one of: {', '.join(TTS_ENGINES)}"
+        )
+    
+    if engine_name == PiperEngine.name:
+        return PiperEngine(parse_voices(settings.TTS_PIPER_VOICES))
+    if engine_name == EspeakEngine.name:
+        return EspeakEngine(parse_voices(settings.TTS_ESPEAK_VOICES))
+    return GTTSEngine()
 
 
 class TextToSpeechService:
-    """Text-to-Speech service using Google TTS"""
+    """Text-to-Speech service with a configurable engine and per-language fallback"""
     
-    def __init__(self):
-        """Initialize TTS service"""
-        # Language mapping for gTTS
+    def __init__(self, engine_name: str = None, fallback_engine_name: str = None):
+        """
+        Load the TTS engines (defaults come from settings)
+        
+        Args:
+            engine_name: Primary engine ("gtts", "piper", "espeak")
+            fallback_engine_name: Engine for languages the primary has no voice for
+        """
+        # Language mapping for the engines
         self.language_map = {
             "ko": "ko",  # Korean
             "bn": "bn",  # Bengali/Bangla
@@ -18,6 +245,32 @@ class TextToSpeechService:
             "bangla": "bn",
             "english": "en"
         }
+        
+        engine_name = engine_name or settings.TTS_ENGINE
+        fallback_engine_name = fallback_engine_name or settings.TTS_FALLBACK_ENGINE
+        self.engine = create_tts_engine(engine_name)
+        self.fallback = None
+        if fallback_engine_name and fallback_engine_name != engine_name:
+            self.fallback = create_tts_engine(fallback_engine_name)
+        self.engine_name = self.engine.name
+        print(f"✅ TTS engine: {self.engine.name}" + (f" (fallback: {self.fallback.name})" if self.fallback else ""))
+    
+    def engine_for(self, language: str):
+        """
+        Engine that speaks a language: the primary if it has a voice, else the fallback
+        
+        Raises:
+            ValueError: If no configured engine supports the language
+        """
+        if self.engine.supports(language):
+            return self.engine
+        if self.fallback is not None and self.fallback.supports(language):
+            return self.fallback
+        raise ValueError(f"No TTS voice configured for language '{language}'")
+    
+    def engine_name_for(self, language: str) -> str:
+        """Name of the engine that speaks a language (part of the TTS cache key)"""
+        return self.engine_for(self.language_map.get(language.lower(), "en")).name
     
     def text_to_speech(self, text: str, language: str = "en") -> bytes:
         """
@@ -32,16 +285,29 @@ class TextToSpeechService:
         """
         # Normalize language code
         lang_code = self.language_map.get(language.lower(), "en")
+        return self.engine_for(lang_code).synthesize(text, lang_code)
+    
+    def text_to_speech_batch(self, items: List[Tuple[str, str]]) -> List[bytes]:
+        """
+        Convert several (text, language) pairs to speech
         
-        # Generate speech
-        tts = gTTS(text=text, lang=lang_code, slow=False)
+        Items are grouped per engine and language so local engines can
+        synthesize each group in one batch.
         
-        # Save to BytesIO
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
+        Returns:
+            Audio bytes (MP3 format), in input order
+        """
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for index, (text, language) in enumerate(items):
+            lang_code = self.language_map.get(language.lower(), "en")
+            groups.setdefault((self.engine_for(lang_code).name, lang_code), []).append(index)
         
-        return audio_buffer.read()
+        results: List[Optional[bytes]] = [None] * len(items)
+        for (_, lang_code), indices in groups.items():
+            engine = self.engine_for(lang_code)
+            for index, audio in zip(indices, engine.synthesize_batch([items[i][0] for i in indices], lang_code)):
+                results[index] = audio
+        return results
     
     def save_to_file(self, text: str, language: str, output_path: str):
         """
@@ -52,12 +318,11 @@ class TextToSpeechService:
             language: Language code
             output_path: Output file path (.mp3)
         """
-        lang_code = self.language_map.get(language.lower(), "en")
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        tts.save(output_path)
+        with open(output_path, "wb") as f:
+            f.write(self.text_to_speech(text, language))
 
 
-# Global instance
+# Global instance (one per worker process, so local voices load once)
 _tts_service = None
 
 
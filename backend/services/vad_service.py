@@ -0,0 +1,213 @@
+"""
+Voice activity detection and segmentation for streaming meeting audio.
+
+Clients stream small PCM16 frames over the meeting WebSocket; the
+segmenter buffers them, detects speech with an adaptive energy VAD and
+emits partial snapshots while someone is talking and a final segment once
+they pause.
+"""
+import numpy as np
+from typing import List, Optional, Tuple
+
+from config import settings
+
+
+class VoiceActivityDetector:
+    """Adaptive energy-based voice activity detector"""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold: float = 0.01,
+        noise_ratio: float = 3.0
+    ):
+        """
+        Initialize the detector
+
+        Args:
+            sample_rate: Sample rate of incoming audio (Hz)
+            frame_ms: Analysis frame length in milliseconds
+            energy_threshold: Minimum RMS (on a [-1, 1] scale) treated as speech
+            noise_ratio: How far above the tracked noise floor a frame must be
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.noise_floor = energy_threshold / noise_ratio
+
+    def frame_energies(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Compute per-frame RMS energy for whole frames in samples
+
+        Args:
+            samples: Float32 mono audio in [-1, 1]
+
+        Returns:
+            Array of RMS values, one per complete frame
+        """
+        n_frames = len(samples) // self.frame_size
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = samples[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+    def is_speech(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Classify each complete frame as speech or non-speech
+
+        The noise floor follows quiet frames slowly so that a noisy room
+        raises the bar for what counts as speech.
+
+        Returns:
+            Boolean array, one entry per frame
+        """
+        energies = self.frame_energies(samples)
+        decisions = np.zeros(len(energies), dtype=bool)
+        for i, energy in enumerate(energies):
+            threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+            decisions[i] = energy >= threshold
+            if not decisions[i]:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(energy)
+        return decisions
+
+
+class StreamingSegmenter:
+    """Turn a continuous stream of PCM16 frames into utterance segments"""
+
+    def __init__(
+        self,
+        sample_rate: int = None,
+        silence_ms: int = None,
+        min_speech_ms: int = None,
+        partial_interval_ms: int = None,
+        max_segment_ms: int = None,
+        pre_roll_ms: int = 200
+    ):
+        """
+        Initialize the segmenter (defaults come from settings)
+
+        Args:
+            sample_rate: Sample rate of incoming PCM16 mono audio
+            silence_ms: Trailing silence that closes a segment
+            min_speech_ms: Segments with less speech than this are dropped
+            partial_interval_ms: New speech needed before another partial is emitted
+            max_segment_ms: Force a final segment once it grows this long
+            pre_roll_ms: Audio kept from before speech onset
+        """
+        self.sample_rate = sample_rate or settings.STREAM_SAMPLE_RATE
+        self.vad = VoiceActivityDetector(
+            sample_rate=self.sample_rate,
+            frame_ms=settings.VAD_FRAME_MS,
+            energy_threshold=settings.VAD_ENERGY_THRESHOLD
+        )
+        frame_ms = settings.VAD_FRAME_MS
+        self.silence_frames = max(1, (silence_ms or settings.VAD_SILENCE_MS) // frame_ms)
+        self.min_speech_frames = max(1, (min_speech_ms or settings.VAD_MIN_SPEECH_MS) // frame_ms)
+        self.partial_frames = max(1, (partial_interval_ms or settings.STREAM_PARTIAL_INTERVAL_MS) // frame_ms)
+        self.max_segment_frames = max(1, (max_segment_ms or settings.STREAM_MAX_SEGMENT_MS) // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+
+        self._pending = np.zeros(0, dtype=np.float32)  # Samples not yet a full frame
+        self._pre_roll: List[np.ndarray] = []
+        self._segment: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self._frames_since_partial = 0
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether a segment is currently open"""
+        return bool(self._segment)
+
+    @staticmethod
+    def pcm16_to_float(pcm: bytes) -> np.ndarray:
+        """Convert little-endian PCM16 bytes to float32 samples in [-1, 1]"""
+        usable = len(pcm) - (len(pcm) % 2)
+        return np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+    def feed(self, pcm: bytes) -> List[Tuple[str, np.ndarray]]:
+        """
+        Feed a chunk of PCM16 audio
+
+        Args:
+            pcm: Little-endian PCM16 mono bytes
+
+        Returns:
+            List of (event, audio) tuples where event is "partial" or "final"
+        """
+        return self.feed_samples(self.pcm16_to_float(pcm))
+
+    def feed_samples(self, samples: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+        """Feed float32 samples; see feed()"""
+        events: List[Tuple[str, np.ndarray]] = []
+        samples = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        frame_size = self.vad.frame_size
+        n_frames = len(samples) // frame_size
+        self._pending = samples[n_frames * frame_size:]
+        if n_frames == 0:
+            return events
+
+        frames = samples[:n_frames * frame_size].reshape(n_frames, frame_size)
+        decisions = self.vad.is_speech(frames.reshape(-1))
+
+        for frame, speech in zip(frames, decisions):
+            if not self._segment:
+                if speech:
+                    # Speech onset: open a segment with the buffered pre-roll
+                    self._segment = self._pre_roll + [frame]
+                    self._pre_roll = []
+                    self._speech_frames = 1
+                    self._silent_run = 0
+                    self._frames_since_partial = 1
+                else:
+                    self._pre_roll.append(frame)
+                    if len(self._pre_roll) > self.pre_roll_frames:
+                        self._pre_roll.pop(0)
+                continue
+
+            self._segment.append(frame)
+            if speech:
+                self._speech_frames += 1
+                self._silent_run = 0
+                self._frames_since_partial += 1
+            else:
+                self._silent_run += 1
+
+            if self._silent_run >= self.silence_frames or len(self._segment) >= self.max_segment_frames:
+                final = self._close_segment()
+                if final is not None:
+                    events.append(("final", final))
+            elif self._frames_since_partial >= self.partial_frames:
+                self._frames_since_partial = 0
+                events.append(("partial", np.concatenate(self._segment)))
+
+        return events
+
+    def flush(self) -> Optional[np.ndarray]:
+        """
+        Close any open segment (e.g. when the client stops streaming)
+
+        Returns:
+            Final segment audio, or None if there was no usable speech
+        """
+        self._pending = np.zeros(0, dtype=np.float32)
+        return self._close_segment()
+
+    def _close_segment(self) -> Optional[np.ndarray]:
+        """Close the open segment, trimming trailing silence"""
+        segment = self._segment
+        speech_frames = self._speech_frames
+        trailing = self._silent_run
+        self._segment = []
+        self._pre_roll = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self._frames_since_partial = 0
+
+        if not segment or speech_frames < self.min_speech_frames:
+            return None
+        if trailing:
+            segment = segment[:len(segment) - trailing]
+        return np.concatenate(segment)
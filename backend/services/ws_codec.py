@@ -0,0 +1,117 @@
+"""
+Encodings for meeting WebSocket messages.
+
+Messages are JSON text frames unless the client negotiates MessagePack
+when it connects, either with the "ko2bn.msgpack" subprotocol or with
+?encoding=msgpack. It then gets its messages as binary MessagePack maps,
+with the same keys and values as the JSON, and may send its own that way
+too. Speech and audio keep their own binary frames (services/ws_frames.py).
+Those start with 0xC1, a byte MessagePack never uses, so a client tells
+the two apart by the first byte.
+
+A broadcast is still encoded once per encoding in use, not once per
+client (Encoded). MessagePack needs the msgpack package (a requirement;
+a build without it serves JSON to everyone). Compression is a separate
+layer: uvicorn's websockets server offers permessage-deflate by default.
+
+python -m benchmarks.ws_encoding compares bytes on the wire and encode
+cost for the two.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple, Union
+
+from fastapi import WebSocket
+
+from services.ws_outbox import encode_message
+
+try:
+    import msgpack
+except ImportError:  # Clients fall back to JSON
+    msgpack = None
+
+
+Payload = Union[str, bytes]
+
+
+class Codec(ABC):
+    """How messages to and from one client are encoded"""
+
+    name = ""
+    binary = False  # Messages travel in binary frames
+
+    @abstractmethod
+    def encode(self, message: dict) -> Payload:
+        ...
+
+    @abstractmethod
+    def decode(self, data: Payload) -> dict:
+        ...
+
+
+class JsonCodec(Codec):
+    name = "json"
+
+    def encode(self, message: dict) -> str:
+        return encode_message(message)
+
+    def decode(self, data: Payload) -> dict:
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    binary = True
+
+    def encode(self, message: dict) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data: Payload) -> dict:
+        return msgpack.unpackb(data, raw=False)
+
+
+JSON = JsonCodec()
+
+# name -> codec this server can speak
+CODECS: Dict[str, Codec] = {"json": JSON}
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+# WebSocket subprotocol -> codec name
+SUBPROTOCOLS = {"ko2bn.json": "json", "ko2bn.msgpack": "msgpack"}
+
+
+def negotiate(websocket: WebSocket) -> Tuple[Codec, Optional[str]]:
+    """
+    The encoding a connecting client asked for
+
+    Returns:
+        The codec (JSON if it asked for nothing this server speaks) and
+        the subprotocol to accept the connection with, if it offered one
+    """
+    for protocol in websocket.scope.get("subprotocols") or []:
+        name = SUBPROTOCOLS.get(protocol)
+        if name in CODECS:
+            return CODECS[name], protocol
+    return CODECS.get(websocket.query_params.get("encoding") or "json", JSON), None
+
+
+class Encoded:
+    """A message encoded at most once per codec, however many clients it goes to"""
+
+    __slots__ = ("message", "_payloads")
+
+    def __init__(self, message: Optional[dict] = None, text: Optional[str] = None):
+        """Give the message, its JSON text, or both"""
+        self.message = message
+        self._payloads: Dict[str, Payload] = {}
+        if text is not None:
+            self._payloads[JSON.name] = text
+
+    def get(self, codec: Codec) -> Payload:
+        payload = self._payloads.get(codec.name)
+        if payload is None:
+            if self.message is None:
+                self.message = json.loads(self._payloads[JSON.name])
+            payload = self._payloads[codec.name] = codec.encode(self.message)
+        return payload
@@ -0,0 +1,92 @@
+"""
+Binary WebSocket framing for meeting audio.
+
+Audio used to travel as base64 inside JSON, which adds a third to its
+size and costs a decode/encode plus a parse of multi-megabyte strings per
+message. Audio now goes in binary WebSocket frames: a fixed 12-byte
+header followed by the raw payload. JSON text frames remain for control
+messages.
+
+Header (big-endian):
+    magic          uint8   0xC1
+    frame_type     uint8   FrameType
+    transcript_id  uint32  0 when not tied to a transcript
+    language       2 ASCII bytes ("ko", "bn", "en"; two spaces when unset)
+    index          uint16  chunk position (TTS sentences), else 0
+    count          uint16  chunks in the sequence, else 0
+
+0xC1 can't start a UTF-8 JSON document and is the one byte MessagePack
+never uses, so a stray frame from another protocol is rejected early.
+"""
+import struct
+from enum import IntEnum
+from typing import NamedTuple
+
+
+MAGIC = 0xC1
+HEADER = struct.Struct(">BBI2sHH")
+
+
+class FrameType(IntEnum):
+    AUDIO_CLIP = 0x01  # Client -> server: one recorded utterance (any ffmpeg-readable format)
+    AUDIO_CHUNK = 0x02  # Client -> server: streamed PCM16 little-endian frame
+    TTS_AUDIO = 0x10  # Server -> client: MP3 speech for a transcript sentence
+
+
+class Frame(NamedTuple):
+    frame_type: FrameType
+    transcript_id: int
+    language: str
+    index: int
+    count: int
+    payload: bytes
+
+
+class FrameError(ValueError):
+    """A binary message that isn't a valid frame"""
+
+
+def encode_frame(
+    frame_type: FrameType,
+    payload: bytes,
+    transcript_id: int = 0,
+    language: str = "",
+    index: int = 0,
+    count: int = 0
+) -> bytes:
+    """Build a binary frame"""
+    header = HEADER.pack(
+        MAGIC,
+        frame_type,
+        transcript_id,
+        language.encode("ascii")[:2].ljust(2),
+        index,
+        count
+    )
+    return header + payload
+
+
+def decode_frame(data: bytes) -> Frame:
+    """
+    Parse a binary frame
+
+    Raises:
+        FrameError: If the header is short, has the wrong magic byte or an unknown type
+    """
+    if len(data) < HEADER.size:
+        raise FrameError("Frame shorter than its header")
+    magic, frame_type, transcript_id, language, index, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise FrameError(f"Bad frame magic 0x{magic:02x}")
+    try:
+        frame_type = FrameType(frame_type)
+    except ValueError:
+        raise FrameError(f"Unknown frame type 0x{frame_type:02x}")
+    return Frame(
+        frame_type,
+        transcript_id,
+        language.decode("ascii", errors="replace").strip(),
+        index,
+        count,
+        memoryview(data)[HEADER.size:].tobytes()
+    )
@@ -0,0 +1,229 @@
+"""
+Per-connection send queues for the meeting WebSocket.
+
+Broadcasting used to await send_json() on each client in turn, encoding
+the message once per participant, so one slow client delayed everyone
+behind it. Now a message is encoded once and put on every client's
+bounded Outbox, and each Outbox is drained by its own writer task, so a
+slow client only delays itself.
+
+Slow consumers:
+    - Droppable messages (transcript partials) carry a coalescing key: a
+      newer one replaces a queued one with the same key, and they are the
+      first to go when the queue is full.
+    - A full queue with nothing droppable left, a single send blocking
+      longer than WS_SEND_TIMEOUT_SECONDS, or a message waiting longer
+      than WS_MAX_LAG_SECONDS disconnects the client (close code 1013,
+      "try again later"); it can reconnect and catch up.
+
+finish() closes a connection on purpose (the meeting ended) once what
+is already queued has been sent.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple, Union
+
+from fastapi import WebSocket
+
+from config import settings
+
+
+# Close code for clients that can't keep up
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+Payload = Union[str, bytes]
+
+
+def encode_message(message: dict) -> str:
+    """Serialize a message the way WebSocket.send_json() does, once for all recipients"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Pending:
+    """A queued message; data is None once it has been dropped"""
+
+    __slots__ = ("data", "key", "queued_at")
+
+    def __init__(self, data: Payload, key: Optional[str], queued_at: float):
+        self.data = data
+        self.key = key
+        self.queued_at = queued_at
+
+
+class Outbox:
+    """Bounded send queue for one WebSocket, drained by its own writer task"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = None,
+        send_timeout: float = None,
+        max_lag: float = None
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        self.max_lag = max_lag or settings.WS_MAX_LAG_SECONDS
+        self._queue: Deque[_Pending] = deque()
+        self._latest: Dict[str, _Pending] = {}  # Coalescing key -> queued message
+        self._size = 0  # Queued messages not yet dropped
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self._finish: Optional[Tuple[int, str]] = None  # Close code and reason once the queue is sent
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.peak_depth = 0
+        self.last_lag = 0.0  # Seconds the last sent message spent queued
+        self.peak_lag = 0.0
+
+    def start(self):
+        """Start the writer task (needs a running event loop)"""
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, data: Payload, key: Optional[str] = None, supersedes: Optional[str] = None) -> bool:
+        """
+        Queue an encoded message (str for a text frame, bytes for binary)
+
+        Args:
+            data: The encoded message
+            key: Makes the message droppable; a queued message with the same key is replaced
+            supersedes: Key of a queued droppable message this one makes stale
+
+        Returns:
+            False if the message was dropped or the client disconnected
+        """
+        if self.closed or self._finish is not None:
+            return False
+
+        if supersedes is not None:
+            self._drop(self._latest.get(supersedes))
+
+        if key is not None and key in self._latest:
+            self._latest[key].data = data  # Keeps its place (and age) in the queue
+            self.dropped += 1
+            return True
+
+        if self._size >= self.max_queue:
+            if key is not None:
+                self.dropped += 1
+                return False
+            if not self._drop(next((p for p in self._queue if p.key is not None and p.data is not None), None)):
+                self.kick("send queue full")
+                return False
+
+        pending = _Pending(data, key, time.monotonic())
+        self._queue.append(pending)
+        self._size += 1
+        if key is not None:
+            self._latest[key] = pending
+        self.peak_depth = max(self.peak_depth, self._size)
+        self._wakeup.set()
+        return True
+
+    def _drop(self, pending: Optional[_Pending]) -> bool:
+        """Drop a queued message in place (the writer skips it)"""
+        if pending is None or pending.data is None:
+            return False
+        pending.data = None
+        self._latest.pop(pending.key, None)
+        self._size -= 1
+        self.dropped += 1
+        return True
+
+    async def _run(self):
+        while True:
+            while not self._queue:
+                if self._finish is not None:
+                    code, reason = self._finish
+                    await self._close(reason, code, reason)
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            pending = self._queue.popleft()
+            if pending.data is None:
+                continue
+            self._size -= 1
+            if pending.key is not None:
+                self._latest.pop(pending.key, None)
+
+            lag = time.monotonic() - pending.queued_at
+            if lag > self.max_lag:
+                await self._close(f"lagging {lag:.1f}s behind")
+                return
+
+            try:
+                if isinstance(pending.data, bytes):
+                    send = self.websocket.send_bytes(pending.data)
+                else:
+                    send = self.websocket.send_text(pending.data)
+                await asyncio.wait_for(send, self.send_timeout)
+            except asyncio.TimeoutError:
+                await self._close(f"send blocked over {self.send_timeout:g}s")
+                return
+            except Exception as e:
+                # Socket already gone; the receive loop cleans up
+                self.closed = True
+                self.close_reason = f"send failed: {e}"
+                return
+
+            self.sent += 1
+            self.last_lag = lag
+            self.peak_lag = max(self.peak_lag, lag)
+
+    def finish(self, code: int, reason: str):
+        """Close the connection with code once everything queued so far is sent"""
+        if not self.closed and self._finish is None:
+            self._finish = (code, reason)
+            self._wakeup.set()
+
+    def kick(self, reason: str):
+        """Disconnect a client that can't keep up"""
+        if self.closed:
+            return
+        self.close()
+        self._task = asyncio.create_task(self._close(reason))
+
+    async def _close(self, reason: str, code: int = SLOW_CONSUMER_CLOSE_CODE, message: str = "Client too slow"):
+        self.closed = True
+        self.close_reason = reason
+        if code == SLOW_CONSUMER_CLOSE_CODE:
+            print(f"Disconnecting slow WebSocket client: {reason}")
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=message), self.send_timeout)
+        except Exception:
+            pass
+
+    def close(self):
+        """Stop the writer; queued messages are discarded"""
+        if not self.closed and self._task is not None:
+            self._task.cancel()  # Once closed, the task is a close handshake; let it finish
+        self.closed = True
+        self._queue.clear()
+        self._latest.clear()
+        self._size = 0
+
+    def lag(self) -> float:
+        """Seconds the oldest queued message has been waiting"""
+        for pending in self._queue:
+            if pending.data is not None:
+                return time.monotonic() - pending.queued_at
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._size,
+            "peak_queued": self.peak_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_ms": round(self.lag() * 1000),
+            "last_lag_ms": round(self.last_lag * 1000),
+            "peak_lag_ms": round(self.peak_lag * 1000),
+            "closed": self.close_reason,
+        }
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings require these; tests never call the services they're for
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,165 @@
+"""
+Meeting bus against the stand-in server (services/pubsub_server.py).
+
+Run from backend/: python -m pytest tests
+"""
+import asyncio
+import socket
+import time
+
+from config import settings
+from services.pubsub import RedisBus
+from services.pubsub_server import PubSubServer
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StandIn:
+    """The stand-in server, with a stop() that also drops its open connections"""
+
+    def __init__(self):
+        self.pubsub = PubSubServer()
+        self.writers = set()
+        self.server = None
+
+    async def handle(self, reader, writer):
+        self.writers.add(writer)
+        try:
+            await self.pubsub.handle(reader, writer)
+        finally:
+            self.writers.discard(writer)
+
+    async def start(self, port: int = 0) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+
+async def start_server(port: int = 0):
+    server = StandIn()
+    return server, await server.start(port)
+
+
+async def wait_for(condition, timeout: float = 3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def collector(bus: RedisBus) -> list:
+    received = []
+
+    async def handler(session_code, data):
+        received.append((session_code, data))
+
+    bus.set_handler(handler)
+    return received
+
+
+def test_publish_reaches_subscribers_on_every_shard():
+    async def run():
+        server_a, port_a = await start_server()
+        server_b, port_b = await start_server()
+        urls = [f"redis://127.0.0.1:{port_a}", f"redis://127.0.0.1:{port_b}"]
+        publisher, subscriber = RedisBus(urls), RedisBus(urls)
+        received = collector(subscriber)
+        codes = [f"{n:06d}" for n in range(8)]  # Spread over both shards
+        try:
+            for code in codes:
+                await subscriber.subscribe(code)
+            await asyncio.sleep(0.1)
+            for code in codes:
+                await publisher.publish(code, code.encode())
+            await publisher.publish("999999", b"nobody listens")
+            await wait_for(lambda: len(received) == len(codes))
+            assert sorted(received) == [(code, code.encode()) for code in codes]
+
+            await subscriber.unsubscribe(codes[0])
+            await asyncio.sleep(0.1)
+            await publisher.publish(codes[0], b"after")
+            await publisher.publish(codes[1], b"after")
+            await wait_for(lambda: len(received) == len(codes) + 1)
+            assert received[-1] == (codes[1], b"after")
+        finally:
+            await publisher.close()
+            await subscriber.close()
+            await server_a.stop()
+            await server_b.stop()
+
+    asyncio.run(run())
+
+
+def test_subscriber_connects_once_server_comes_up():
+    async def run():
+        port = free_port()
+        url = f"redis://127.0.0.1:{port}"
+        publisher, subscriber = RedisBus([url]), RedisBus([url])
+        received = collector(subscriber)
+        server = None
+        try:
+            try:
+                await subscriber.subscribe("_control")
+            except OSError:
+                pass  # Not up yet; the shard keeps retrying
+            server, _ = await start_server(port)
+            await wait_for(lambda: not subscriber.shards[0].subscriber.closed)
+            await publisher.publish("_control", b"hello")
+            await wait_for(lambda: received == [("_control", b"hello")])
+
+            # The server restarts: the subscription comes back by itself
+            await server.stop()
+            await wait_for(lambda: subscriber.shards[0].subscriber.closed)
+            server, _ = await start_server(port)
+            await wait_for(lambda: not subscriber.shards[0].subscriber.closed, timeout=5)
+            await asyncio.sleep(0.1)
+
+            async def republish():  # The publisher drops messages until its own retry delay passes
+                while len(received) < 2:
+                    await publisher.publish("_control", b"again")
+                    await asyncio.sleep(0.2)
+
+            await asyncio.wait_for(republish(), 5)
+            assert received[-1] == ("_control", b"again")
+        finally:
+            await publisher.close()
+            await subscriber.close()
+            if server is not None:
+                await server.stop()
+
+    asyncio.run(run())
+
+
+def test_publish_does_not_wait_on_a_stalled_server(monkeypatch):
+    monkeypatch.setattr(settings, "BUS_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "BUS_PUBLISH_QUEUE", 4)
+
+    async def run():
+        async def swallow(reader, writer):
+            while await reader.read(65536):  # Accept commands, never reply
+                pass
+
+        server = await asyncio.start_server(swallow, "127.0.0.1", 0)
+        bus = RedisBus([f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}"])
+        try:
+            started = time.monotonic()
+            for n in range(10):
+                await bus.publish("123456", b"%d" % n)
+            assert time.monotonic() - started < 0.1
+            shard = bus.shards[0]
+            assert shard.dropped >= 5  # Beyond the queue
+            await wait_for(lambda: shard.dropped == 10)  # The rest time out or wait out the retry delay
+        finally:
+            await bus.close()
+            server.close()
+
+    asyncio.run(run())
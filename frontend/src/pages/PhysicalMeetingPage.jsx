@@ -1,9 +1,14 @@
 import { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, useLocation } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import axios from '../api/client';
+import axios, { API_URL } from '../api/client';
 import './PhysicalMeetingPage.css';
 
+// Transcripts fetched per request when (re)loading a session
+const TRANSCRIPT_PAGE_SIZE = 200;
+// Close code the server uses once the session has been ended
+const SESSION_ENDED_CLOSE_CODE = 4000;
+
 const PhysicalMeetingPage = () => {
   const { sessionCode } = useParams();
   const navigate = useNavigate();
@@ -16,11 +21,25 @@ const PhysicalMeetingPage = () => {
   const [error, setError] = useState(null);
   const [speakerName, setSpeakerName] = useState('');
   const [recognitionSupported, setRecognitionSupported] = useState(true);
+  // Language to hear translated speech in ('' = subtitles only)
+  const [audioLanguage, setAudioLanguage] = useState('');
   
   const isActive = (path) => location.pathname === path;
   
   const wsRef = useRef(null);
   const recognitionRef = useRef(null);
+  const audioLanguageRef = useRef('');
+  // Speech chunks waiting to play, in (transcript, sentence) order
+  const audioQueueRef = useRef([]);
+  const audioPlayingRef = useRef(false);
+  // Where we are in the session's event stream, to resume after a reconnect
+  const epochRef = useRef(null);
+  const lastSeqRef = useRef(0);
+  const transcriptsRef = useRef([]);
+
+  useEffect(() => {
+    transcriptsRef.current = transcripts;
+  }, [transcripts]);
 
   useEffect(() => {
     if (!sessionCode) {
@@ -59,15 +78,61 @@ const PhysicalMeetingPage = () => {
       setSession(response.data);
       
       // Fetch existing transcripts
-      const transcriptsResponse = await axios.get(`/api/sessions/${sessionCode}/transcripts`);
-      setTranscripts(transcriptsResponse.data);
+      await loadTranscripts();
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to load session');
     }
   };
 
+  // Fetch the transcripts after afterId a page at a time, merging them into the list
+  const loadTranscripts = async (afterId = 0) => {
+    let page;
+    do {
+      const response = await axios.get(`/api/sessions/${sessionCode}/transcripts`, {
+        params: { after_id: afterId, limit: TRANSCRIPT_PAGE_SIZE }
+      });
+      page = response.data;
+      if (page.length > 0) {
+        mergeTranscripts(page);
+        afterId = page[page.length - 1].id;
+      }
+    } while (page.length === TRANSCRIPT_PAGE_SIZE);
+  };
+
+  // Add transcripts or fill in the ones we have (fields left undefined are kept)
+  const mergeTranscripts = (incoming) => {
+    setTranscripts(prev => {
+      const byId = new Map(prev.map(transcript => [transcript.id, transcript]));
+      incoming.forEach(transcript => {
+        const known = Object.fromEntries(Object.entries(transcript).filter(([, value]) => value !== undefined));
+        byId.set(transcript.id, { ...byId.get(transcript.id), ...known });
+      });
+      return [...byId.values()].sort((a, b) => a.id - b.id);
+    });
+  };
+
+  // The server couldn't replay what we missed: refetch from the first incomplete transcript
+  const resyncTranscripts = () => {
+    const current = transcriptsRef.current;
+    const incomplete = current.find(transcript =>
+      !transcript.translated_text_ko || !transcript.translated_text_bn || !transcript.translated_text_en
+    );
+    const afterId = incomplete ? incomplete.id - 1 : (current.length > 0 ? current[current.length - 1].id : 0);
+    loadTranscripts(afterId).catch(err => console.error('Error reloading transcripts:', err));
+  };
+
   const connectWebSocket = () => {
-    const wsUrl = `ws://localhost:8000/ws/session/${sessionCode}`;
+    const params = new URLSearchParams();
+    if (audioLanguageRef.current) {
+      params.set('tts', audioLanguageRef.current);
+    }
+    if (epochRef.current) {
+      // Reconnecting: ask for just the events we missed
+      params.set('epoch', epochRef.current);
+      params.set('last_seq', lastSeqRef.current);
+    }
+    const query = params.toString();
+    const wsUrl = `ws://localhost:8000/ws/session/${sessionCode}${query ? `?${query}` : ''}`;
     const ws = new WebSocket(wsUrl);
 
     ws.onopen = () => {
@@ -87,10 +152,15 @@ const PhysicalMeetingPage = () => {
       setIsConnected(false);
     };
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
       console.log('WebSocket disconnected');
       setIsConnected(false);
       
+      if (event.code === SESSION_ENDED_CLOSE_CODE) {
+        setError('This session has ended.');
+        return;
+      }
+      
       // Don't attempt reconnect if there's already an error (session ended, etc.)
       if (!error) {
         // Attempt reconnect after 3 seconds (max 3 attempts)
@@ -114,13 +184,35 @@ const PhysicalMeetingPage = () => {
   };
 
   const handleWebSocketMessage = (data) => {
+    if (data.seq && (data.type === 'transcript' || data.type === 'translation')) {
+      lastSeqRef.current = Math.max(lastSeqRef.current, data.seq);
+    }
+    
     switch (data.type) {
       case 'connected':
         console.log('Connected to session:', data.session_code);
+        if (!epochRef.current) {
+          // First connection: the transcripts so far come from the API
+          epochRef.current = data.epoch;
+          lastSeqRef.current = data.seq;
+        }
+        break;
+      
+      case 'resumed':
+        console.log(`Resumed session, ${data.replayed} missed events follow`);
+        break;
+      
+      case 'resync':
+        // Too much was missed, or we reconnected to another server process (or it restarted):
+        // start over from its current position
+        console.log(`Resyncing transcripts (${data.reason})`);
+        epochRef.current = data.epoch;
+        lastSeqRef.current = data.seq;
+        resyncTranscripts();
         break;
       
       case 'transcript':
-        // Add new transcript
+        // Add new transcript (right after STT; translations follow separately)
         const newTranscript = {
           id: data.transcript_id,
           speaker_name: data.speaker_name,
@@ -129,22 +221,40 @@ const PhysicalMeetingPage = () => {
           translated_text_ko: data.translations.ko,
           translated_text_bn: data.translations.bn,
           translated_text_en: data.translations.en,
-          timestamp: data.timestamp,
-          audio_files: data.audio_files
+          timestamp: data.timestamp
         };
         
-        setTranscripts(prev => [...prev, newTranscript]);
-        
-        // Auto-play audio if available
-        if (data.audio_files) {
-          playTranslatedAudio(data.audio_files);
+        mergeTranscripts([newTranscript]);
+        break;
+      
+      case 'translation':
+        // One language of an earlier transcript
+        setTranscripts(prev => prev.map(transcript =>
+          transcript.id === data.transcript_id
+            ? { ...transcript, [`translated_text_${data.language}`]: data.text }
+            : transcript
+        ));
+        break;
+      
+      case 'tts_chunk':
+        // Sentences of translated speech arrive in order as they are synthesized
+        if (data.language === audioLanguageRef.current) {
+          queueAudio(data.transcript_id, data.index, data.audio_url);
         }
         break;
       
+      case 'tts_preferences':
+        console.log('Audio languages:', data.languages);
+        break;
+      
       case 'error':
         setError(data.message);
         break;
       
+      case 'session_ended':
+        setError(data.message);
+        break;
+      
       case 'user_disconnected':
         console.log(data.message);
         break;
@@ -154,14 +264,47 @@ const PhysicalMeetingPage = () => {
     }
   };
 
-  const playTranslatedAudio = (audioFiles) => {
-    // Play the first available audio translation
-    for (const [lang, audioBase64] of Object.entries(audioFiles)) {
-      if (audioBase64) {
-        const audio = new Audio(`data:audio/mp3;base64,${audioBase64}`);
-        audio.play().catch(err => console.error('Error playing audio:', err));
-        break;
-      }
+  const queueAudio = (transcriptId, index, audioUrl) => {
+    const queue = audioQueueRef.current;
+    // Keep earlier transcripts first even if their chunks arrive late
+    let position = queue.length;
+    while (position > 0 && (queue[position - 1].transcriptId > transcriptId ||
+      (queue[position - 1].transcriptId === transcriptId && queue[position - 1].index > index))) {
+      position--;
+    }
+    queue.splice(position, 0, { transcriptId, index, url: `${API_URL}${audioUrl}` });
+    playNextAudio();
+  };
+
+  const playNextAudio = () => {
+    if (audioPlayingRef.current || audioQueueRef.current.length === 0) {
+      return;
+    }
+    const { url } = audioQueueRef.current.shift();
+    const audio = new Audio(url);
+    audioPlayingRef.current = true;
+    const next = () => {
+      audioPlayingRef.current = false;
+      playNextAudio();
+    };
+    audio.onended = next;
+    audio.onerror = next;
+    audio.play().catch(err => {
+      console.error('Error playing audio:', err);
+      next();
+    });
+  };
+
+  const changeAudioLanguage = (language) => {
+    setAudioLanguage(language);
+    audioLanguageRef.current = language;
+    audioQueueRef.current = [];
+    // The server only synthesizes speech for languages someone listens to
+    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+      wsRef.current.send(JSON.stringify({
+        type: 'tts_preferences',
+        languages: language ? [language] : []
+      }));
     }
   };
 
@@ -432,6 +575,20 @@ const PhysicalMeetingPage = () => {
             />
           </div>
 
+          <div className="speaker-input">
+            <label htmlFor="audioLanguage">Listen in:</label>
+            <select
+              id="audioLanguage"
+              value={audioLanguage}
+              onChange={(e) => changeAudioLanguage(e.target.value)}
+            >
+              <option value="">Subtitles only</option>
+              <option value="ko">Korean</option>
+              <option value="bn">Bengali</option>
+              <option value="en">English</option>
+            </select>
+          </div>
+
           <button
             className={`record-button ${isRecording ? 'recording' : ''}`}
             onClick={isRecording ? stopRecording : startRecording}
@@ -456,7 +613,7 @@ const PhysicalMeetingPage = () => {
                 {transcripts.map((transcript, index) => (
                   <div key={index} className="transcript-message">
                     <div className="message-speaker">{transcript.speaker_name}</div>
-                    <div className="message-text">{transcript.translated_text_ko}</div>
+                    <div className="message-text">{transcript.translated_text_ko ?? '…'}</div>
                     <div className="message-time">
                       {new Date(transcript.timestamp).toLocaleTimeString()}
                     </div>
@@ -471,7 +628,7 @@ const PhysicalMeetingPage = () => {
                 {transcripts.map((transcript, index) => (
                   <div key={index} className="transcript-message">
                     <div className="message-speaker">{transcript.speaker_name}</div>
-                    <div className="message-text">{transcript.translated_text_bn}</div>
+                    <div className="message-text">{transcript.translated_text_bn ?? '…'}</div>
                     <div className="message-time">
                       {new Date(transcript.timestamp).toLocaleTimeString()}
                     </div>
@@ -486,7 +643,7 @@ const PhysicalMeetingPage = () => {
                 {transcripts.map((transcript, index) => (
                   <div key={index} className="transcript-message">
                     <div className="message-speaker">{transcript.speaker_name}</div>
-                    <div className="message-text">{transcript.translated_text_en}</div>
+                    <div className="message-text">{transcript.translated_text_en ?? '…'}</div>
                     <div className="message-time">
                       {new Date(transcript.timestamp).toLocaleTimeString()}
                     </div>